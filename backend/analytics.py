@@ -0,0 +1,158 @@
+import re
+from datetime import date, timedelta
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from model import ProgressSummary, CategorySummary
+
+# Questions aren't tagged by the model, so they are bucketed by wording. First match wins.
+QUESTION_CATEGORIES = [
+    ('Behavioral', r'tell me about a time|describe a (time|situation)|give an example|a time when|conflict|disagree|mistake|failure'),
+    ('Motivation', r'why do you want|why are you interested|why (this|our) company|where do you see yourself|career goals|motivat'),
+    ('System Design', r'\bdesign\b|architect|scal(e|able|ability)|distributed|microservice'),
+    ('Problem Solving', r'how would you|approach|debug|troubleshoot|optimi[sz]|solve'),
+    ('Experience', r'your (experience|role|project|cv|resume)|worked on|previous (job|role|company)|you (built|led|implemented)'),
+    ('Technical Knowledge', r'explain|what is|what are|difference between|how does|how do'),
+]
+DEFAULT_CATEGORY = 'General'
+
+_CATEGORY_PATTERNS = [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in QUESTION_CATEGORIES]
+
+def categorize_question(question):
+    for name, pattern in _CATEGORY_PATTERNS:
+        if pattern.search(question or ''):
+            return name
+    return DEFAULT_CATEGORY
+
+def _increment(model, keys, counts):
+    """INSERT the row, or add counts to it if it already exists (atomic, so concurrent grading jobs are safe)"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(model).values(**keys, **counts)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: getattr(model, name) + stmt.excluded[name] for name in counts}
+        )
+        db.session.execute(stmt)
+        return
+
+    row = db.session.execute(db.select(model).filter_by(**keys).with_for_update()).scalar_one_or_none()
+    if row is None:
+        db.session.add(model(**keys, **counts))
+    else:
+        for name, value in counts.items():
+            setattr(row, name, getattr(row, name) + value)
+    db.session.flush()
+
+def record_graded_session(session):
+    """Add a freshly graded session to the user's summaries. Called by complete_report before it commits."""
+    cv = session.cv
+    _increment(ProgressSummary,
+               {'user_id': session.user_id, 'job_role': cv.job_role, 'interview_level': cv.interview_level,
+                'day': session.completed_at.date()},
+               {'session_count': 1, 'question_count': session.question_count or 0,
+                'total_score': session.total_score or 0.0})
+
+    categories = {}
+    for item in session.items:
+        counts = categories.setdefault(categorize_question(item.question),
+                                       {'question_count': 0, 'total_score': 0.0, 'wrong_count': 0})
+        counts['question_count'] += 1
+        counts['total_score'] += item.score or 0.0
+        counts['wrong_count'] += item.status == 'Wrong'
+    for category, counts in categories.items():
+        _increment(CategorySummary, {'user_id': session.user_id, 'category': category}, counts)
+
+def _accuracy(total_score, question_count):
+    return round(total_score * 100 / question_count, 2) if question_count else None
+
+def get_user_analytics(user_id, job_role=None, interview_level=None, days=90, window=7, weakest=3):
+    """Aggregates for the analytics page, all computed in SQL from the summary tables.
+
+    The rolling accuracy covers the last `window` days on which the user practiced
+    (days without sessions are skipped rather than counted as zero).
+    """
+    filters = [ProgressSummary.user_id == user_id]
+    if job_role:
+        filters.append(ProgressSummary.job_role == job_role)
+    if interview_level:
+        filters.append(ProgressSummary.interview_level == interview_level)
+
+    sessions = db.func.sum(ProgressSummary.session_count)
+    questions = db.func.sum(ProgressSummary.question_count)
+    score = db.func.sum(ProgressSummary.total_score)
+
+    overall = db.session.execute(
+        db.select(sessions.label('sessions'), questions.label('questions'), score.label('score'),
+                  db.func.min(ProgressSummary.day).label('first_day'), db.func.max(ProgressSummary.day).label('last_day'))
+        .where(*filters)
+    ).one()
+
+    def breakdown(column):
+        rows = db.session.execute(
+            db.select(column.label('key'), sessions.label('sessions'), questions.label('questions'), score.label('score'))
+            .where(*filters)
+            .group_by(column)
+            .order_by(column)
+        ).all()
+        return [{
+            column.key: row.key,
+            'sessions': row.sessions,
+            'average_score': round(row.score / row.sessions, 2),
+            'accuracy': _accuracy(row.score, row.questions)
+        } for row in rows]
+
+    # Daily totals with a rolling window over them, then keep only the requested range
+    frame = (-(window - 1), 0)
+    daily = (
+        db.select(
+            ProgressSummary.day.label('day'),
+            sessions.label('sessions'),
+            questions.label('questions'),
+            score.label('score'),
+            db.func.sum(questions).over(order_by=ProgressSummary.day, rows=frame).label('rolling_questions'),
+            db.func.sum(score).over(order_by=ProgressSummary.day, rows=frame).label('rolling_score')
+        )
+        .where(*filters)
+        .group_by(ProgressSummary.day)
+        .subquery()
+    )
+    trend = db.session.execute(
+        db.select(daily).where(daily.c.day >= date.today() - timedelta(days=days)).order_by(daily.c.day)
+    ).all()
+
+    # Category totals aren't split by role/level, they describe the user overall
+    category_accuracy = CategorySummary.total_score * 100.0 / CategorySummary.question_count
+    categories = db.session.execute(
+        db.select(CategorySummary)
+        .where(CategorySummary.user_id == user_id, CategorySummary.question_count > 0)
+        .order_by(category_accuracy, CategorySummary.category)
+        .limit(weakest)
+    ).scalars().all()
+
+    return {
+        'overall': {
+            'sessions': overall.sessions or 0,
+            'questions': overall.questions or 0,
+            'average_score': round(overall.score / overall.sessions, 2) if overall.sessions else None,
+            'accuracy': _accuracy(overall.score, overall.questions),
+            'first_session': overall.first_day.isoformat() if overall.first_day else None,
+            'last_session': overall.last_day.isoformat() if overall.last_day else None
+        },
+        'by_role': breakdown(ProgressSummary.job_role),
+        'by_level': breakdown(ProgressSummary.interview_level),
+        'trend': [{
+            'day': row.day.isoformat(),
+            'sessions': row.sessions,
+            'accuracy': _accuracy(row.score, row.questions),
+            'rolling_accuracy': _accuracy(row.rolling_score, row.rolling_questions)
+        } for row in trend],
+        'weakest_categories': [{
+            'category': c.category,
+            'questions': c.question_count,
+            'accuracy': _accuracy(c.total_score, c.question_count),
+            'wrong': c.wrong_count
+        } for c in categories]
+    }
@@ -1,22 +1,44 @@
 import os
 import openai
-import PyPDF2
 from datetime import datetime
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
-from werkzeug.utils import secure_filename
 from dotenv import load_dotenv
 from extensions import db, jwt
-from extensions import db, jwt
-from model import User, CV, PerformanceReport, InterviewSession
-from docx import Document
+from extensions import (db, jwt, job_queue, cv_text_cache, llm_cache, cv_parser, request_timer, llm_limiter, llm_breaker,
+                        model_router)
+from analytics import record_graded_session, get_user_analytics
+from cv_parser import CVParseTimeout
+from compaction import compact_text, count_tokens
+from llm_limiter import LLMBusy, LLMLimiter, PRIORITY_INTERVIEW, PRIORITY_NEW
+from llm_limiter import prometheus_metrics as limiter_metrics
+from circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker, LLMUnavailable, is_outage
+from circuit_breaker import prometheus_metrics as breaker_metrics
+from model_routing import DEFAULT_ENDPOINT
+from timing import timed
+from question_bank import pick_questions, add_questions
+from llm_metrics import (count_attempt, acount_attempt, counting_attempts, llm_owner, llm_owned_stream,
+                         record_llm_call, prune_llm_calls, prometheus_metrics)
+from model import User, CV, PerformanceReport, InterviewSession, SessionItem
 from flask_migrate import Migrate
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 import logging
 import uuid
+from sqlalchemy.orm import defer
 import json
-from prompts import get_interview_questions_prompt, get_feedback_prompt
+import re
+import base64
+import hmac
+import time
+import tempfile
+from contextlib import ExitStack, contextmanager
+from functools import wraps
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from types import SimpleNamespace
+from prompts import (GENERAL_TAG, get_interview_questions_prompt, get_feedback_prompt, get_streaming_feedback_prompt,
+                     get_answer_grading_prompt, get_overall_feedback_prompt)
 
 # Load environment variables
 load_dotenv()
@@ -25,13 +47,17 @@ load_dotenv()
 app = Flask(__name__)
 app.config.from_object('config.Config')
 
-# Ensure the upload folder exists
-if not os.path.exists(app.config['UPLOAD_FOLDER']):
-    os.makedirs(app.config['UPLOAD_FOLDER'])
-
 # Initialize extensions
 db.init_app(app)
 jwt.init_app(app)
+job_queue.init_app(app)
+cv_text_cache.init_app(app)
+llm_cache.init_app(app)
+cv_parser.init_app(app)
+request_timer.init_app(app)
+llm_limiter.init_app(app)
+llm_breaker.init_app(app)
+model_router.init_app(app)
 migrate = Migrate(app, db)
 
 # JWT error handlers for better error messages
@@ -76,15 +102,49 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # Initialize OpenAI client with timeout and retry configuration
 import httpx
 # Create a custom HTTP client that disables SSL verification
-http_client = httpx.Client(verify=False)
+# The request hook counts attempts, so retries made by the OpenAI client can be recorded
+http_client = httpx.Client(verify=False, event_hooks={'request': [count_attempt]})
 
 client = openai.OpenAI(
     api_key=app.config['OPENAI_API_KEY'],
+    base_url=app.config['OPENAI_BASE_URL'],
     http_client=http_client, # Bypass SSL verification
     timeout=60.0,  # 60 second timeout
-    max_retries=3  # Retry up to 3 times
+    max_retries=0  # llm_limiter retries, so retries wait their turn and back off on 429s
+)
+
+# Non-blocking client for ASYNC_LLM mode. Only used from the job queue's event loop, which
+# shares one connection pool between all in-flight generations. Verifies TLS, unlike the sync client above.
+async_http_client = httpx.AsyncClient(
+    event_hooks={'request': [acount_attempt]},
+    limits=httpx.Limits(max_connections=app.config['ASYNC_JOB_CONCURRENCY'],
+                        max_keepalive_connections=app.config['ASYNC_JOB_CONCURRENCY'])
+)
+async_client = openai.AsyncOpenAI(
+    api_key=app.config['OPENAI_API_KEY'],
+    base_url=app.config['OPENAI_BASE_URL'],
+    http_client=async_http_client,
+    timeout=60.0,
+    max_retries=0
 )
 
+# Every LLM endpoint calls can be routed to (see model_routing.py) has its own clients, limiter and circuit breaker.
+# The extra endpoints share a sync HTTP client that verifies TLS, since their API keys go over it too.
+llm_endpoints = {DEFAULT_ENDPOINT: SimpleNamespace(client=client, async_client=async_client, limiter=llm_limiter, breaker=llm_breaker)}
+endpoint_http_client = httpx.Client(event_hooks={'request': [count_attempt]}) if model_router.endpoints else None
+for name, settings in model_router.endpoints.items():
+    api_key = settings.get('api_key') or 'none'  # Local servers usually don't check it, but the client wants one
+    llm_endpoints[name] = SimpleNamespace(
+        client=openai.OpenAI(api_key=api_key, base_url=settings['base_url'], http_client=endpoint_http_client,
+                             timeout=60.0, max_retries=0),
+        async_client=openai.AsyncOpenAI(api_key=api_key, base_url=settings['base_url'], http_client=async_http_client,
+                                        timeout=60.0, max_retries=0),
+        # No request/token budget unless one is given: it's our own server, the concurrency cap protects it
+        limiter=LLMLimiter(app, name, rpm=settings.get('rpm', 0), tpm=settings.get('tpm', 0),
+                           max_concurrency=settings.get('max_concurrency')),
+        breaker=CircuitBreaker(app, name)
+    )
+
 # In-memory storage for interview sessions (in production, use Redis or database)
 # Database storage for interview sessions is now used instead of in-memory dictionary
 
@@ -92,26 +152,269 @@ client = openai.OpenAI(
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
-def extract_text_from_cv(file_path):
-    text = ""
-    ext = file_path.split('.')[-1].lower()
-    try:
-        if ext == 'pdf':
-            with open(file_path, 'rb') as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text()
-        elif ext == 'docx':
-            doc = Document(file_path)
-            for para in doc.paragraphs:
-                text += para.text
-    except Exception as e:
-        logging.error(f"Error extracting text from CV: {e}")
+class QueryParamError(Exception):
+    """Invalid limit/cursor/fields query parameter; returned to the client as a 400"""
+
+def get_int_arg(name, default, maximum):
+    value = request.args.get(name, default, type=int)
+    if value < 1:
+        raise QueryParamError(f"{name} must be a positive integer")
+    return min(value, maximum)
+
+def get_limit_arg(default=20, maximum=100):
+    return get_int_arg('limit', default, maximum)
+
+def encode_cursor(*values):
+    """Opaque keyset cursor holding the sort key of the last row on a page"""
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode('ascii')
+
+def cursor_value(value, kind):
+    if kind is datetime:
+        return datetime.fromisoformat(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise ValueError
+    return value
+
+def decode_cursor(cursor, *kinds):
+    """The values of an encode_cursor cursor, checked and parsed as kinds (e.g. datetime, int, str)"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if not isinstance(values, list) or len(values) != len(kinds):
+            raise ValueError
+        return [cursor_value(value, kind) for value, kind in zip(values, kinds)]
+    except (TypeError, ValueError):
+        raise QueryParamError("Invalid cursor")
+
+def get_fields_arg(allowed, default):
+    """Parse ?fields=a,b,c against the allowed field names"""
+    raw = request.args.get('fields')
+    if not raw:
+        return list(default)
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise QueryParamError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+    return fields
+
+def select_fields(data, fields):
+    return {key: data[key] for key in fields if key in data}
+
+@contextmanager
+def spooled_upload(file):
+    """The uploaded file's bytes, or for files over UPLOAD_SPOOL_MAX_BYTES the path of a temporary copy"""
+    stream = file.stream
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+    if size <= app.config['UPLOAD_SPOOL_MAX_BYTES']:
+        yield stream.read()
+        return
+
+    # Too big to pass around in memory; the parser pool reads it from disk instead
+    with tempfile.NamedTemporaryFile(delete=False) as tmp:
+        while chunk := stream.read(1024 * 1024):
+            tmp.write(chunk)
+    try:
+        yield tmp.name
+    finally:
+        os.remove(tmp.name)
+
+def get_cv_text(source, ext):
+    """Text of a CV (bytes or file path), from the content-addressed cache or parsed on the cv_parser pool"""
+    key = cv_text_cache.key_for(source) if isinstance(source, bytes) else cv_text_cache.key_for_file(source)
+
+    text = cv_text_cache.get(key)
+    if text is None:
+        with timed('extraction'):
+            text = cv_parser.parse(source, ext)
+        # Don't cache failed extractions, the next upload should retry parsing
+        if text.strip():
+            cv_text_cache.set(key, text)
     return text
 
-def generate_interview_questions(cv_text, company_name, job_role, interview_level, job_description=None):
-    """Generate interview questions based on CV text, company, role, level and optional JD"""
-    
+def llm_slot(task, messages, params):
+    """Queue priority and token estimate of a call for llm_limiter.
+
+    Question generation is for new uploads; grading and feedback are for interviews
+    already under way, which go first when calls have to queue.
+    """
+    priority = PRIORITY_NEW if task == "questions" else PRIORITY_INTERVIEW
+    tokens = sum(count_tokens(message['content']) for message in messages) + params.get('max_tokens', 0)
+    return dict(priority=priority, tokens=tokens)
+
+def llm_cache_key(messages, endpoint, params):
+    # Endpoints other than the default can serve different models under the same name
+    return llm_cache.key_for(messages=messages, **params, **({} if endpoint == DEFAULT_ENDPOINT else {"endpoint": endpoint}))
+
+def create_chat_completion(messages, use_cache=True, validate=None, task=None, endpoint=DEFAULT_ENDPOINT, **params):
+    """Call the chat completions API of endpoint and return the message content.
+
+    Identical requests are served from llm_cache unless use_cache is False. If
+    validate is given, only content for which validate(content) is true is cached.
+    Every call, cached or not, is recorded under task for /api/metrics.
+    """
+    started = time.perf_counter()
+    llm = llm_endpoints[endpoint]
+    key = llm_cache_key(messages, endpoint, params) if use_cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            record_llm_call(task, params.get('model'), started, cached=True)
+            return cached
+
+    try:
+        with timed('llm'), counting_attempts() as attempts:
+            llm.breaker.check()
+            response = llm.limiter.call(lambda: llm.breaker.call(lambda: llm.client.chat.completions.create(messages=messages, **params)),
+                                        **llm_slot(task, messages, params))
+    except Exception as e:
+        record_llm_call(task, params.get('model'), started, attempts=attempts, error=e)
+        raise
+    record_llm_call(task, params.get('model'), started, usage=response.usage, attempts=attempts)
+    content = response.choices[0].message.content.strip()
+
+    if key and (validate is None or validate(content)):
+        llm_cache.set(key, content)
+    return content
+
+async def acreate_chat_completion(messages, use_cache=True, validate=None, task=None, endpoint=DEFAULT_ENDPOINT, **params):
+    """Async version of create_chat_completion, using the endpoint's async_client"""
+    started = time.perf_counter()
+    llm = llm_endpoints[endpoint]
+    key = llm_cache_key(messages, endpoint, params) if use_cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            record_llm_call(task, params.get('model'), started, cached=True)
+            return cached
+
+    try:
+        with counting_attempts() as attempts:
+            llm.breaker.check()
+            response = await llm.limiter.acall(
+                lambda: llm.breaker.acall(lambda: llm.async_client.chat.completions.create(messages=messages, **params)),
+                **llm_slot(task, messages, params))
+    except Exception as e:
+        record_llm_call(task, params.get('model'), started, attempts=attempts, error=e)
+        raise
+    record_llm_call(task, params.get('model'), started, usage=response.usage, attempts=attempts)
+    content = response.choices[0].message.content.strip()
+
+    if key and (validate is None or validate(content)):
+        llm_cache.set(key, content)
+    return content
+
+def submit_llm_job(fn, async_fn, *args, **kwargs):
+    """Queue a job that waits on the LLM: as a coroutine on the event loop in ASYNC_LLM mode, else on a worker thread"""
+    if app.config['ASYNC_LLM']:
+        return job_queue.submit_async(async_fn, *args, **kwargs)
+    return job_queue.submit(fn, *args, **kwargs)
+
+def fail_stuck_sessions(session_ids, status, message):
+    """Mark the sessions still in status (i.e. left there by a crashed job) failed, so polling clients stop and can retry"""
+    db.session.rollback()
+    db.session.execute(
+        db.update(InterviewSession)
+        .where(InterviewSession.id.in_(session_ids), InterviewSession.status == status)
+        .values(status='failed', error=message)
+    )
+    db.session.commit()
+
+def fails_sessions(status, action):
+    """Decorator for session jobs, whose first argument is a session id or a list of them.
+
+    If the job raises, its sessions that are still in status are marked failed with
+    an "Unable to {action}..." error rather than staying there forever. The
+    exception is re-raised for the job queue to log.
+    """
+    message = f"Unable to {action} at this time. Please try again later."
+
+    def decorator(fn):
+        def fail(sessions):
+            try:
+                fail_stuck_sessions(sessions if isinstance(sessions, list) else [sessions], status, message)
+            except Exception as e:
+                logging.error(f"Failed to mark sessions {sessions} failed: {type(e).__name__}: {e}")
+
+        if asyncio.iscoroutinefunction(fn):
+            @wraps(fn)
+            async def wrapper(sessions, *args, **kwargs):
+                try:
+                    return await fn(sessions, *args, **kwargs)
+                except Exception:
+                    fail(sessions)
+                    raise
+        else:
+            @wraps(fn)
+            def wrapper(sessions, *args, **kwargs):
+                try:
+                    return fn(sessions, *args, **kwargs)
+                except Exception:
+                    fail(sessions)
+                    raise
+        return wrapper
+    return decorator
+
+def stream_chat_completion(messages, use_cache=True, task=None, endpoint=DEFAULT_ENDPOINT, **params):
+    """Streaming counterpart of create_chat_completion; yields the content as text deltas.
+
+    A cache hit is yielded as a single chunk. The full content is cached once the
+    stream completes.
+    """
+    started = time.perf_counter()
+    llm = llm_endpoints[endpoint]
+    key = llm_cache_key(messages, endpoint, params) if use_cache else None
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            record_llm_call(task, params.get('model'), started, cached=True, stream=True)
+            yield cached
+            return
+
+    chunks = []
+    usage = None
+    attempts = None
+    try:
+        with ExitStack() as slot:
+            with timed('llm'), counting_attempts() as attempts:
+                # include_usage adds a final chunk with no choices that carries the token counts.
+                # The limiter slot is held until the stream has been read.
+                llm.breaker.check()
+                stream = iter(slot.enter_context(llm.limiter.holding(
+                    lambda: llm.breaker.call(lambda: llm.client.chat.completions.create(
+                        messages=messages, stream=True, stream_options={"include_usage": True}, **params)),
+                    **llm_slot(task, messages, params))))
+            while True:
+                # Only the wait for the next chunk is LLM time, not what the caller does with it
+                with timed('llm'):
+                    chunk = next(stream, None)
+                if chunk is None:
+                    break
+                usage = getattr(chunk, 'usage', None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+    except BaseException as e:
+        # Includes GeneratorExit when the client goes away mid-stream
+        record_llm_call(task, params.get('model'), started, usage=usage, attempts=attempts, error=e, stream=True)
+        raise
+    record_llm_call(task, params.get('model'), started, usage=usage, attempts=attempts, stream=True)
+
+    if key:
+        llm_cache.set(key, ''.join(chunks).strip())
+
+def is_json(content):
+    try:
+        json.loads(content)
+        return True
+    except json.JSONDecodeError:
+        return False
+
+def get_level_prompt(interview_level):
     if interview_level == 'Beginner':
         level_prompt = "The questions should focus on basic knowledge, entry-level skills, and general understanding of the field."
     elif interview_level == 'Intermediate':
@@ -120,60 +423,451 @@ def generate_interview_questions(cv_text, company_name, job_role, interview_leve
         level_prompt = "The questions should focus on advanced technical knowledge, leadership skills, and strategic thinking."
     else:
         level_prompt = "Please provide a balanced set of questions."
-
+    return level_prompt
+
+def llm_error_message(e, action):
+    """Log a failed OpenAI call and return the "Unable to ..." message shown to the user"""
+    if isinstance(e, LLMUnavailable):
+        logging.error(f"LLM circuit breaker open, not trying to {action}")
+        return f"Unable to {action} right now, the AI service is unavailable. Please try again in a few minutes."
+    if isinstance(e, LLMBusy):
+        logging.error(f"LLM call queue full trying to {action}")
+        return f"Unable to {action} right now, we're handling a lot of interviews. Please try again in a minute."
+    if isinstance(e, openai.APIConnectionError):
+        logging.error(f"OpenAI connection error trying to {action}: {e}")
+        return "Unable to connect to OpenAI service. Please check your internet connection and try again."
+    if isinstance(e, openai.APIError):
+        logging.error(f"OpenAI API error trying to {action}: {e}")
+        return f"Unable to {action} at this time. Please check your OpenAI API key and try again later."
+    logging.error(f"Error trying to {action}: {type(e).__name__}: {e}")
+    return f"Unable to {action} at this time. Please try again later."
+
+# Chat completion parameters for each kind of call, shared by the sync, async and streaming versions
+
+def routed_request(task, interview_level, prompt):
+    """Endpoint, model, max_tokens and timeout for a prompt, as chosen by model_router"""
+    route = model_router.route(task, interview_level, count_tokens(prompt))
+    return dict(
+        task=task,
+        endpoint=route.endpoint,
+        model=route.model,
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=route.max_tokens,
+        timeout=route.timeout
+    )
+
+def interview_questions_request(cv_text, company_name, job_role, interview_level, job_description=None, reused=None):
+    # cv_text is compacted at upload; the job description is stored as typed, so compact it here
+    if job_description:
+        job_description, _ = compact_text(job_description, app.config['JD_TOKEN_BUDGET'])
+    # With questions from the bank, only ask for the ones still missing
+    count = app.config['QUESTION_BANK_TARGET'] - len(reused) if reused else None
     # FIXED: Now includes CV text in the prompt
-    prompt = get_interview_questions_prompt(cv_text, job_role, company_name, level_prompt, job_description)
-
+    prompt = get_interview_questions_prompt(cv_text, job_role, company_name, get_level_prompt(interview_level), job_description,
+                                            count=count, existing_questions=reused)
+    return routed_request("questions", interview_level, prompt)
+
+def feedback_request(responses, questions, interview_level=None):
+    # Include questions in feedback generation for better context
+    return dict(
+        routed_request("feedback", interview_level, get_feedback_prompt(questions, responses)),
+        response_format={ "type": "json_object" }, # Enforce JSON mode
+        validate=is_json # Don't cache malformed JSON, let the next attempt retry
+    )
+
+def streaming_feedback_request(responses, questions, interview_level=None):
+    # JSON Lines as plain text, so it can be parsed line by line while streaming
+    return routed_request("feedback", interview_level, get_streaming_feedback_prompt(questions, responses))
+
+def grading_request(question, answer, interview_level=None):
+    return dict(
+        routed_request("grading", interview_level, get_answer_grading_prompt(question, answer)),
+        response_format={ "type": "json_object" },
+        validate=is_json
+    )
+
+def overall_feedback_request(questions_analysis, interview_level=None):
+    return dict(
+        routed_request("overall_feedback", interview_level, get_overall_feedback_prompt(questions_analysis)),
+        response_format={ "type": "json_object" },
+        validate=is_json
+    )
+
+def bank_query(cv_text, job_role, job_description=None):
+    return "\n".join(filter(None, [job_role, job_description, cv_text]))
+
+def bank_questions(cv_text, job_role, interview_level, job_description=None, use_cache=True):
+    """Questions for this CV from the question bank, best first. Empty when the bank is off or fresh questions were asked for.
+
+    Never the whole set: bank questions are general, so the model always writes at least one about the candidate's CV.
+    """
+    if not app.config['QUESTION_BANK'] or not use_cache:
+        return []
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=800,
-            timeout=60.0
+        return pick_questions(bank_query(cv_text, job_role, job_description), job_role, interview_level,
+                              min(app.config['QUESTION_BANK_MAX_REUSE'], app.config['QUESTION_BANK_TARGET'] - 1))
+    except Exception as e:
+        # The bank only saves work; without it we just generate everything
+        logging.error(f"Question bank lookup failed: {type(e).__name__}: {e}")
+        return []
+
+def fallback_questions(reused, cv_text, job_role, interview_level, job_description=None):
+    """Questions to hold the interview with while the LLM is down: the reused ones topped up from the bank,
+    however small it is and however loosely they match. Empty if that still makes fewer than QUESTION_BANK_FALLBACK_MIN."""
+    questions = list(reused)
+    if app.config['QUESTION_BANK']:
+        try:
+            picked = pick_questions(bank_query(cv_text, job_role, job_description), job_role, interview_level,
+                                    app.config['QUESTION_BANK_TARGET'], min_pool=1, min_score=0)
+            questions += [q for q in picked if q not in questions][:app.config['QUESTION_BANK_TARGET'] - len(questions)]
+        except Exception as e:
+            logging.error(f"Question bank fallback failed: {type(e).__name__}: {e}")
+    if len(questions) < app.config['QUESTION_BANK_FALLBACK_MIN']:
+        return []
+    logging.warning(f"LLM unavailable, using {len(questions)} question bank questions for {job_role} ({interview_level})")
+    return questions
+
+def number_questions(questions):
+    return "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+
+def new_questions(questions_text, reused):
+    """The model's questions as (question, general) pairs, minus any that repeat a reused bank question"""
+    seen = {question.lower() for question in reused}
+    return [(question, general) for question, general in parse_tagged_questions(questions_text)
+            if question.lower() not in seen]
+
+def bank_new_questions(generated, job_role, interview_level):
+    """Add the general questions to the bank. The ones about this candidate's CV stay private to their session."""
+    if app.config['QUESTION_BANK']:
+        add_questions([question for question, general in generated if general], job_role, interview_level)
+
+def merge_bank_questions(reused, questions_text, job_role, interview_level):
+    """Bank the model's general questions and list all of them after the reused ones, numbered like the model's output"""
+    generated = new_questions(questions_text, reused)
+    bank_new_questions(generated, job_role, interview_level)
+    return number_questions(reused + [question for question, _ in generated])
+
+def generate_interview_questions(cv_text, company_name, job_role, interview_level, job_description=None, use_cache=True):
+    """Generate interview questions based on CV text, company, role, level and optional JD.
+
+    Questions reused from the question bank come first; the model only writes the rest.
+    """
+    reused = []
+    try:
+        reused = bank_questions(cv_text, job_role, interview_level, job_description, use_cache)
+        questions_text = create_chat_completion(
+            use_cache=use_cache,
+            **interview_questions_request(cv_text, company_name, job_role, interview_level, job_description, reused)
         )
-        return response.choices[0].message.content.strip()
-    except openai.APIConnectionError as e:
-        logging.error(f"OpenAI connection error: {e}")
-        return "Unable to connect to OpenAI service. Please check your internet connection and try again."
-    except openai.APIError as e:
-        logging.error(f"OpenAI API error generating interview questions: {e}")
-        return "Unable to generate interview questions at this time. Please check your OpenAI API key and try again later."
+        return merge_bank_questions(reused, questions_text, job_role, interview_level)
+    except Exception as e:
+        fallback = fallback_questions(reused, cv_text, job_role, interview_level, job_description) if is_outage(e) else []
+        if fallback:
+            return number_questions(fallback)
+        return llm_error_message(e, "generate interview questions")
+
+async def agenerate_interview_questions(cv_text, company_name, job_role, interview_level, job_description=None, use_cache=True):
+    """Async version of generate_interview_questions.
+
+    The question bank work (embedding, database, the bank's lock) runs on a worker
+    thread so it doesn't stall the other coroutines on the event loop.
+    """
+    reused = []
+    try:
+        reused = await asyncio.to_thread(bank_questions, cv_text, job_role, interview_level, job_description, use_cache)
+        questions_text = await acreate_chat_completion(
+            use_cache=use_cache,
+            **interview_questions_request(cv_text, company_name, job_role, interview_level, job_description, reused)
+        )
+        return await asyncio.to_thread(merge_bank_questions, reused, questions_text, job_role, interview_level)
     except Exception as e:
-        logging.error(f"Error generating interview questions: {type(e).__name__}: {e}")
-        return "Unable to generate interview questions at this time. Please try again later."
+        fallback = []
+        if is_outage(e):
+            fallback = await asyncio.to_thread(fallback_questions, reused, cv_text, job_role, interview_level, job_description)
+        if fallback:
+            return number_questions(fallback)
+        return llm_error_message(e, "generate interview questions")
+
+def parse_tagged_questions(questions_text):
+    """Split the model's numbered list into (question, general) pairs; general questions are tagged GENERAL_TAG"""
+    # Split by newlines and filter empty lines
+    questions = [q.strip() for q in questions_text.split('\n') if q.strip() and not q.strip().startswith('#')]
+    # Remove numbering if present
+    questions = [q.split('.', 1)[-1].strip() if '.' in q[:3] else q for q in questions]
+    return [(q[len(GENERAL_TAG):].strip(), True) if q.upper().startswith(GENERAL_TAG) else (q, False) for q in questions]
+
+def parse_questions(questions_text):
+    """Split the model's numbered list into a list of question strings"""
+    return [question for question, _ in parse_tagged_questions(questions_text)]
+
+def stream_interview_questions(cv_text, company_name, job_role, interview_level, job_description=None, use_cache=True):
+    """Like generate_interview_questions, but yields each question as soon as its line is complete.
+
+    API errors are raised to the caller instead of being turned into an "Unable..." string.
+    Questions from the question bank are yielded first, straight away. If the LLM is
+    down before it wrote anything, the rest comes from the bank too (see fallback_questions).
+    """
+    reused = bank_questions(cv_text, job_role, interview_level, job_description, use_cache)
+    yield from reused
+
+    buffer = ""
+    generated = []
+    try:
+        for delta in stream_chat_completion(
+            use_cache=use_cache,
+            **interview_questions_request(cv_text, company_name, job_role, interview_level, job_description, reused)
+        ):
+            buffer += delta
+            # Everything up to the last newline is complete lines
+            if '\n' in buffer:
+                complete, buffer = buffer.rsplit('\n', 1)
+                questions = new_questions(complete, reused)
+                generated += questions
+                yield from (question for question, _ in questions)
+    except Exception as e:
+        fallback = fallback_questions(reused, cv_text, job_role, interview_level, job_description) if is_outage(e) else []
+        if generated or buffer or not fallback:
+            raise
+        yield from fallback[len(reused):]
+        return
+
+    questions = new_questions(buffer, reused)
+    generated += questions
+    yield from (question for question, _ in questions)
+    bank_new_questions(generated, job_role, interview_level)
+
+@fails_sessions('generating', "generate interview questions")
+def run_question_generation(session_id, cv_text, use_cache=True):
+    """Background job: generate questions for a session created by upload_cv"""
+    session = db.session.get(InterviewSession, session_id)
+    if not session:
+        logging.error(f"Question generation job: session {session_id} no longer exists")
+        return
+
+    cv = session.cv
+    with llm_owner(session_id, session.user_id):
+        questions_text = generate_interview_questions(cv_text, cv.company_name, cv.job_role, cv.interview_level, cv.job_description, use_cache=use_cache)
+    save_generated_questions(session, questions_text)
+
+@fails_sessions('generating', "generate interview questions")
+async def run_question_generation_async(session_id, cv_text, use_cache=True):
+    """Async version of run_question_generation, run on the job queue's event loop when ASYNC_LLM is on"""
+    session = db.session.get(InterviewSession, session_id)
+    if not session:
+        logging.error(f"Question generation job: session {session_id} no longer exists")
+        return
+
+    cv = session.cv
+    args = (cv_text, cv.company_name, cv.job_role, cv.interview_level, cv.job_description)
+    owner = (session_id, session.user_id)
+    # Don't hold a pooled connection while waiting on the model, hundreds of these can be in flight
+    db.session.rollback()
+    with llm_owner(*owner):
+        questions_text = await agenerate_interview_questions(*args, use_cache=use_cache)
+
+    session = db.session.get(InterviewSession, session_id)
+    save_generated_questions(session, questions_text)
+
+def batch_generation_targets(session_ids, cv_text):
+    """[(session_id, (session_id, user_id), generate_interview_questions args)] for the sessions that still exist"""
+    targets = []
+    for session_id in session_ids:
+        session = db.session.get(InterviewSession, session_id)
+        if not session:
+            logging.error(f"Batch question generation job: session {session_id} no longer exists")
+            continue
+        cv = session.cv
+        targets.append((session_id, (session_id, session.user_id),
+                        (cv_text, cv.company_name, cv.job_role, cv.interview_level, cv.job_description)))
+    # Don't hold a pooled connection while waiting on the model
+    db.session.rollback()
+    return targets
+
+@fails_sessions('generating', "generate interview questions")
+def run_batch_question_generation(session_ids, cv_text, use_cache=True):
+    """Background job: generate questions for the sessions of an upload_cv_batch, BATCH_CONCURRENCY at a time.
+
+    Each session is saved as soon as its questions are ready, so it can be
+    started while the rest of the batch is still generating.
+    """
+    def generate(session_id, owner, args):
+        with app.app_context(), llm_owner(*owner):
+            return generate_interview_questions(*args, use_cache=use_cache)
+
+    targets = batch_generation_targets(session_ids, cv_text)
+    with ThreadPoolExecutor(max_workers=app.config['BATCH_CONCURRENCY'], thread_name_prefix='batch') as executor:
+        futures = {executor.submit(generate, *target): target[0] for target in targets}
+        for future in as_completed(futures):
+            try:
+                questions_text = future.result()
+            except Exception as e:
+                # One bad target shouldn't leave the rest of the batch stuck in 'generating'
+                logging.error(f"Batch question generation failed for {futures[future]}: {type(e).__name__}: {e}")
+                questions_text = "Unable to generate interview questions at this time. Please try again later."
+            save_generated_questions(db.session.get(InterviewSession, futures[future]), questions_text)
+
+@fails_sessions('generating', "generate interview questions")
+async def run_batch_question_generation_async(session_ids, cv_text, use_cache=True):
+    """Async version of run_batch_question_generation, run on the job queue's event loop when ASYNC_LLM is on"""
+    semaphore = asyncio.Semaphore(app.config['BATCH_CONCURRENCY'])
+
+    async def generate(session_id, owner, args):
+        async with semaphore:
+            with llm_owner(*owner):
+                questions_text = await agenerate_interview_questions(*args, use_cache=use_cache)
+        save_generated_questions(db.session.get(InterviewSession, session_id), questions_text)
+
+    targets = batch_generation_targets(session_ids, cv_text)
+    await asyncio.gather(*(generate(*target) for target in targets))
+
+def save_generated_questions(session, questions_text):
+    """Store the generated questions on the session, or mark it failed with the "Unable..." message"""
+    if questions_text.startswith("Unable"):
+        session.status = 'failed'
+        session.error = questions_text
+    else:
+        for question in parse_questions(questions_text):
+            session.add_question(question)
+        session.status = 'active'
+    db.session.commit()
 
-def generate_personalized_feedback(responses, questions):
+def parse_feedback(content):
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        logging.error(f"Failed to decode AI JSON feedback: {content}")
+        return {
+            "overall_feedback": "Error parsing detailed feedback. " + content,
+            "questions_analysis": []
+        }
+
+def parse_grade(content):
+    grade = json.loads(content)
+    return {
+        "status": grade.get("status", "Unknown"),
+        "score": min(1.0, max(0.0, float(grade.get("score", 0)))),
+        "feedback": grade.get("feedback", "")
+    }
+
+def generate_personalized_feedback(responses, questions, use_cache=True, interview_level=None):
     """Generate personalized feedback based on user responses"""
     try:
-        # Include questions in feedback generation for better context
-        feedback_prompt = get_feedback_prompt(questions, responses)
+        return parse_feedback(create_chat_completion(use_cache=use_cache, **feedback_request(responses, questions, interview_level)))
+    except Exception as e:
+        return llm_error_message(e, "generate personalized feedback")
 
-        # Request JSON format explicitly
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": feedback_prompt}],
-            response_format={ "type": "json_object" }, # Enforce JSON mode
-            max_tokens=2500,
-            timeout=60.0
-        )
-        content = response.choices[0].message.content.strip()
+async def agenerate_personalized_feedback(responses, questions, use_cache=True, interview_level=None):
+    """Async version of generate_personalized_feedback"""
+    try:
+        return parse_feedback(await acreate_chat_completion(use_cache=use_cache,
+                                                            **feedback_request(responses, questions, interview_level)))
+    except Exception as e:
+        return llm_error_message(e, "generate personalized feedback")
+
+def grade_answer(question, answer, use_cache=True, interview_level=None):
+    """Grade a single answer. Returns {"status", "score", "feedback"} or an "Unable..." error string"""
+    try:
+        return parse_grade(create_chat_completion(use_cache=use_cache, **grading_request(question, answer, interview_level)))
+    except Exception as e:
+        return llm_error_message(e, "grade answer")
+
+async def agrade_answer(question, answer, use_cache=True, interview_level=None):
+    """Async version of grade_answer"""
+    try:
+        return parse_grade(await acreate_chat_completion(use_cache=use_cache, **grading_request(question, answer, interview_level)))
+    except Exception as e:
+        return llm_error_message(e, "grade answer")
+
+def generate_overall_feedback(questions_analysis, use_cache=True, interview_level=None):
+    """Write the overall_feedback markdown for answers that are already graded"""
+    try:
+        content = create_chat_completion(use_cache=use_cache, **overall_feedback_request(questions_analysis, interview_level))
+        return json.loads(content).get("overall_feedback", "")
+    except Exception as e:
+        return llm_error_message(e, "generate personalized feedback")
+
+async def agenerate_overall_feedback(questions_analysis, use_cache=True, interview_level=None):
+    """Async version of generate_overall_feedback"""
+    try:
+        content = await acreate_chat_completion(use_cache=use_cache, **overall_feedback_request(questions_analysis, interview_level))
+        return json.loads(content).get("overall_feedback", "")
+    except Exception as e:
+        return llm_error_message(e, "generate personalized feedback")
+
+def generate_feedback_from_grades(questions, responses, grades, interview_level=None):
+    """Build the full analysis from graded SessionItems, grading any answers that are missing one.
+
+    Returns the same structure as generate_personalized_feedback, or an error string.
+    """
+    new_grades = {}
+    for idx, (question, answer) in enumerate(zip(questions, responses)):
+        if idx not in grades:
+            new_grades[idx] = grade_answer(question, answer, interview_level=interview_level)
+            if not isinstance(new_grades[idx], dict):
+                return new_grades[idx]
+    questions_analysis = analysis_from_grades(questions, responses, grades, new_grades)
+
+    overall_feedback = generate_overall_feedback(questions_analysis, interview_level=interview_level)
+    if overall_feedback.startswith("Unable"):
+        return overall_feedback
+    return {"overall_feedback": overall_feedback, "questions_analysis": questions_analysis}
+
+def analysis_from_grades(questions, responses, grades, new_grades):
+    """questions_analysis from stored SessionItem grades plus freshly requested ones, or the first error string"""
+    questions_analysis = []
+    for idx, (question, answer) in enumerate(zip(questions, responses)):
+        if idx in grades:
+            grade = {"status": grades[idx].status, "score": grades[idx].score, "feedback": grades[idx].feedback}
+        else:
+            grade = new_grades[idx]
+            if not isinstance(grade, dict):
+                return grade
+        questions_analysis.append({"question": question, "candidate_answer": answer, **grade})
+    return questions_analysis
+
+async def agenerate_feedback_from_grades(questions, responses, grades, interview_level=None):
+    """Async version of generate_feedback_from_grades; missing grades are requested concurrently"""
+    missing = [idx for idx in range(len(responses)) if idx not in grades]
+    results = await asyncio.gather(*(agrade_answer(questions[idx], responses[idx], interview_level=interview_level)
+                                     for idx in missing))
+    questions_analysis = analysis_from_grades(questions, responses, grades, dict(zip(missing, results)))
+    if not isinstance(questions_analysis, list):
+        return questions_analysis
+
+    overall_feedback = await agenerate_overall_feedback(questions_analysis, interview_level=interview_level)
+    if overall_feedback.startswith("Unable"):
+        return overall_feedback
+    return {"overall_feedback": overall_feedback, "questions_analysis": questions_analysis}
+
+def stream_personalized_feedback(responses, questions, use_cache=True, interview_level=None):
+    """Streaming counterpart of generate_personalized_feedback.
+
+    Yields one dict per JSON line as soon as it is complete: 'question_analysis'
+    entries first, then 'overall_section' entries. API errors are raised to the caller.
+    """
+    def parse_line(line):
+        line = line.strip()
+        if not line:
+            return None
         try:
-            return json.loads(content)
+            item = json.loads(line)
         except json.JSONDecodeError:
-            logging.error(f"Failed to decode AI JSON feedback: {content}")
-            return {
-                "overall_feedback": "Error parsing detailed feedback. " + content,
-                "questions_analysis": []
-            }
-    except openai.APIError as e:
-        logging.error(f"OpenAI API error generating feedback: {e}")
-        return "Unable to generate feedback at this time. Please check your OpenAI API key and try again later."
-    except openai.APIConnectionError as e:
-        logging.error(f"OpenAI connection error generating feedback: {e}")
-        return "Unable to connect to OpenAI service. Please check your internet connection and try again."
-    except Exception as e:
-        logging.error(f"Error generating feedback: {type(e).__name__}: {e}")
-        return "Unable to generate personalized feedback at this time. Please try again later."
+            logging.error(f"Failed to decode streamed feedback line: {line}")
+            return None
+        return item if isinstance(item, dict) else None
+
+    buffer = ""
+    for delta in stream_chat_completion(use_cache=use_cache, **streaming_feedback_request(responses, questions, interview_level)):
+        buffer += delta
+        while '\n' in buffer:
+            line, buffer = buffer.split('\n', 1)
+            item = parse_line(line)
+            if item:
+                yield item
+
+    item = parse_line(buffer)
+    if item:
+        yield item
 
 # API Routes
 
@@ -196,6 +890,15 @@ def debug_token():
         logging.error(f"Token debug error: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/debug/cache', methods=['GET'])
+@jwt_required()
+def debug_cache():
+    """Hit/miss counters for this worker's caches"""
+    return jsonify({
+        "cv_text": cv_text_cache.stats(),
+        "llm_response": llm_cache.stats()
+    }), 200
+
 @app.route('/api/register', methods=['POST'])
 def register():
     try:
@@ -266,6 +969,9 @@ def login():
         logging.error(f"Login error: {e}")
         return jsonify({"error": "Login failed"}), 500
 
+CV_FIELDS = ['id', 'company_name', 'job_role', 'job_description', 'interview_level', 'user_id']
+CV_DEFAULT_FIELDS = [f for f in CV_FIELDS if f != 'job_description']
+
 @app.route('/api/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
@@ -277,121 +983,315 @@ def get_profile():
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        # Get user's CVs
-        cvs = [cv.to_dict() for cv in user.cvs]
+        # Get user's CVs, newest first, one page at a time
+        limit = get_limit_arg()
+        fields = get_fields_arg(CV_FIELDS, CV_DEFAULT_FIELDS)
+        query = db.select(CV).where(CV.user_id == user.id)
+        if request.args.get('cursor'):
+            (last_id,) = decode_cursor(request.args['cursor'], int)
+            query = query.where(CV.id < last_id)
+        page = db.session.execute(query.order_by(CV.id.desc()).limit(limit + 1)).scalars().all()
+
+        cvs = [select_fields(cv.to_dict(), fields) for cv in page[:limit]]
+        next_cursor = encode_cursor(page[limit - 1].id) if len(page) > limit else None
         
         return jsonify({
             "user": user.to_dict(),
-            "cvs": cvs
+            "cvs": cvs,
+            "next_cursor": next_cursor
         }), 200
 
+    except QueryParamError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logging.error(f"Profile error: {e}")
         return jsonify({"error": "Failed to fetch profile"}), 500
 
+def check_llm_capacity(*interview_levels):
+    """Raise LLMBusy if the endpoint that would generate questions for any of these levels has a full queue"""
+    for endpoint in {model_router.route("questions", level).endpoint for level in interview_levels}:
+        llm_endpoints[endpoint].limiter.check(job_queue.pending)
+
+def llm_busy_response(e):
+    """429 with Retry-After, for routes that would only add to a full LLM call queue"""
+    response = jsonify({"error": "The interview service is busy. Please try again shortly.", "retry_after": e.retry_after})
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response, 429
+
+class UploadError(Exception):
+    """A rejected upload-cv request; carries the message and HTTP status for the client"""
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+def read_cv_upload():
+    """Validate the uploaded cv_file and extract its text, compacted for prompting.
+
+    Returns (cv_text, cv_tokens); raises UploadError for a missing, invalid or unreadable file.
+    """
+    if 'cv_file' not in request.files:
+        raise UploadError("No file provided")
+
+    file = request.files['cv_file']
+    if file.filename == '':
+        raise UploadError("No file selected")
+
+    if not allowed_file(file.filename):
+        raise UploadError("Invalid file type. Please upload PDF or DOCX")
+
+    # Extract text from CV (cached by file hash), straight from the upload. The file itself isn't kept.
+    try:
+        with spooled_upload(file) as source:
+            cv_text = get_cv_text(source, file.filename.rsplit('.', 1)[1].lower())
+    except CVParseTimeout:
+        raise UploadError("Your CV took too long to process. Please upload a shorter or simpler file.")
+    if not cv_text.strip():
+        raise UploadError("Could not extract text from CV. Please upload a valid file.")
+
+    # Only the useful parts of the CV go into the prompt; report how much that saved
+    return compact_text(cv_text, app.config['CV_TOKEN_BUDGET'])
+
+def add_upload_session(user_id, company_name, job_role, interview_level, job_description=None):
+    """Add a CV row and its InterviewSession, in the 'generating' state with no questions. Not committed."""
+    # Save CV to database (convert user_id to int)
+    new_cv = CV(
+        company_name=company_name,
+        job_role=job_role,
+        job_description=job_description,
+        interview_level=interview_level,
+        user_id=int(user_id)
+    )
+    db.session.add(new_cv)
+    db.session.flush()
+
+    # Create interview session in Database; questions are filled in afterwards
+    new_session = InterviewSession(
+        id=str(uuid.uuid4()),
+        user_id=int(user_id),
+        cv_id=new_cv.id,
+        current_question_index=0,
+        status='generating'
+    )
+    db.session.add(new_session)
+    return new_cv, new_session
+
+def create_upload_session(user_id):
+    """Validate an upload-cv request, extract the CV text and create the CV and session rows.
+
+    The session is created in the 'generating' state with no questions. Returns
+    (cv, session, cv_text, fresh_questions, input_tokens), with cv_text already
+    compacted for prompting; raises UploadError for bad input.
+    """
+    company_name = request.form.get('company_name')
+    job_role = request.form.get('job_role')
+    job_description = request.form.get('job_description') # Optional
+    interview_level = request.form.get('interview_level')
+    # Optional: ask for a fresh set of questions instead of a cached one for the same CV/role
+    fresh_questions = request.form.get('fresh_questions', '').lower() in ('1', 'true', 'yes')
+
+    if not company_name or not job_role or not interview_level:
+        raise UploadError("Company name, job role, and interview level are required")
+
+    cv_text, cv_tokens = read_cv_upload()
+    _, jd_tokens = compact_text(job_description, app.config['JD_TOKEN_BUDGET'])
+    input_tokens = {"cv": cv_tokens, "job_description": jd_tokens}
+    logging.info(f"Prompt input compacted: CV {cv_tokens['original_tokens']} -> {cv_tokens['compacted_tokens']} tokens, "
+                 f"JD {jd_tokens['original_tokens']} -> {jd_tokens['compacted_tokens']} tokens")
+
+    new_cv, new_session = add_upload_session(user_id, company_name, job_role, interview_level, job_description)
+    db.session.commit()
+
+    return new_cv, new_session, cv_text, fresh_questions, input_tokens
+
 @app.route('/api/upload-cv', methods=['POST'])
 @jwt_required()
 def upload_cv():
     try:
         user_id = get_jwt_identity()
-        
-        if 'cv_file' not in request.files:
-            return jsonify({"error": "No file provided"}), 400
+        check_llm_capacity(request.form.get('interview_level'))
+        new_cv, new_session, cv_text, fresh_questions, input_tokens = create_upload_session(user_id)
 
-        file = request.files['cv_file']
-        company_name = request.form.get('company_name')
-        job_role = request.form.get('job_role')
-        job_description = request.form.get('job_description') # Optional
-        interview_level = request.form.get('interview_level')
+        # Generate interview questions (includes CV text and optional JD) off the request thread
+        submit_llm_job(run_question_generation, run_question_generation_async, new_session.id, cv_text,
+                       use_cache=not fresh_questions)
 
-        if not company_name or not job_role or not interview_level:
-            return jsonify({"error": "Company name, job role, and interview level are required"}), 400
-
-        if file.filename == '':
-            return jsonify({"error": "No file selected"}), 400
-
-        if not allowed_file(file.filename):
-            return jsonify({"error": "Invalid file type. Please upload PDF or DOCX"}), 400
+        return jsonify({
+            "message": "CV uploaded successfully, generating questions",
+            "session_id": new_session.id,
+            "status": new_session.status,
+            "cv": new_cv.to_dict(),
+            "input_tokens": input_tokens
+        }), 202
+
+    except LLMBusy as e:
+        return llm_busy_response(e)
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        logging.error(f"CV upload error: {e}")
+        db.session.rollback()
+        return jsonify({"error": "Failed to upload CV"}), 500
 
-        # Save file with unique name to prevent collisions
-        filename = f"{uuid.uuid4()}_{secure_filename(file.filename)}"
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+def parse_batch_targets(raw):
+    """The JSON list of {company_name, job_role, interview_level, job_description} targets of a batch upload"""
+    try:
+        targets = json.loads(raw or '')
+    except json.JSONDecodeError:
+        raise UploadError("targets must be a JSON list")
+    if not isinstance(targets, list) or not targets:
+        raise UploadError("targets must be a non-empty JSON list")
+    if len(targets) > app.config['BATCH_MAX_TARGETS']:
+        raise UploadError(f"At most {app.config['BATCH_MAX_TARGETS']} targets per batch")
+
+    parsed = []
+    for n, target in enumerate(targets, 1):
+        if not isinstance(target, dict) or not all(target.get(key) for key in ('company_name', 'job_role', 'interview_level')):
+            raise UploadError(f"Target {n}: company name, job role, and interview level are required")
+        parsed.append({key: target.get(key) for key in ('company_name', 'job_role', 'interview_level', 'job_description')})
+    return parsed
+
+@app.route('/api/upload-cv/batch', methods=['POST'])
+@jwt_required()
+def upload_cv_batch():
+    """Upload one CV for several companies/roles at once.
 
-        # Extract text from CV
-        cv_text = extract_text_from_cv(file_path)
-        if not cv_text.strip():
-            # Try to cleanup before returning error
-            try:
-                os.remove(file_path)
-            except: 
-                pass
-            return jsonify({"error": "Could not extract text from CV. Please upload a valid file."}), 400
-
-        # Generate interview questions (includes CV text and optional JD)
-        questions_text = generate_interview_questions(cv_text, company_name, job_role, interview_level, job_description)
-        if questions_text.startswith("Unable"):
-             # Try to cleanup on error
-            try:
-                os.remove(file_path)
-            except: 
-                pass
-            return jsonify({"error": questions_text}), 500
-
-        # Parse questions (split by newlines and filter empty lines)
-        questions = [q.strip() for q in questions_text.split('\n') if q.strip() and not q.strip().startswith('#')]
-        # Remove numbering if present
-        questions = [q.split('.', 1)[-1].strip() if '.' in q[:3] else q for q in questions]
-
-        # Save CV to database (convert user_id to int)
-        new_cv = CV(
-            file_path=file_path, # Note: We keep the path in DB even if file is deleted, or we could mark it as processed
-            company_name=company_name,
-            job_role=job_role,
-            job_description=job_description,
-            interview_level=interview_level,
-            user_id=int(user_id)
-        )
-        db.session.add(new_cv)
+    The CV is parsed once and one session is created per target, all in the
+    same transaction. Questions are generated in a single background job,
+    BATCH_CONCURRENCY targets at a time; poll /api/interview/status per session.
+    """
+    try:
+        user_id = get_jwt_identity()
+        targets = parse_batch_targets(request.form.get('targets'))
+        check_llm_capacity(*(target['interview_level'] for target in targets))
+        fresh_questions = request.form.get('fresh_questions', '').lower() in ('1', 'true', 'yes')
+        cv_text, cv_tokens = read_cv_upload()
+
+        created = []
+        jd_tokens = []
+        for target in targets:
+            created.append(add_upload_session(user_id, **target))
+            jd_tokens.append(compact_text(target['job_description'], app.config['JD_TOKEN_BUDGET'])[1])
         db.session.commit()
 
-        # Create interview session in Database
-        session_id = str(uuid.uuid4())
-        new_session = InterviewSession(
-            id=session_id,
-            user_id=int(user_id),
-            cv_id=new_cv.id,
-            questions=questions,
-            responses=[],
-            current_question_index=0
-        )
-        db.session.add(new_session)
-        db.session.commit()
-        
-        # Cleanup: Delete the file after processing to save space
-        try:
-             # Force garbage collection if needed or just wait. 
-             # sometimes PyPDF2 keeps file open.
-             import gc
-             gc.collect()
-             if os.path.exists(file_path):
-                 os.remove(file_path)
-        except Exception as e:
-            # Log but don't fail the request
-            logging.error(f"Warning: Could not delete file {file_path}: {e}")
+        session_ids = [new_session.id for _, new_session in created]
+        submit_llm_job(run_batch_question_generation, run_batch_question_generation_async, session_ids, cv_text,
+                       use_cache=not fresh_questions)
 
         return jsonify({
-            "message": "CV uploaded successfully",
-            "session_id": session_id,
-            "questions": questions,
-            "cv": new_cv.to_dict()
-        }), 200
+            "message": f"CV uploaded successfully, generating questions for {len(created)} interviews",
+            "sessions": [{"session_id": new_session.id, "status": new_session.status, "cv": new_cv.to_dict()}
+                         for new_cv, new_session in created],
+            "input_tokens": {"cv": cv_tokens, "job_descriptions": jd_tokens}
+        }), 202
+
+    except LLMBusy as e:
+        return llm_busy_response(e)
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status_code
+    except Exception as e:
+        logging.error(f"Batch CV upload error: {e}")
+        db.session.rollback()
+        return jsonify({"error": "Failed to upload CV"}), 500
 
+def sse_event(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route('/api/upload-cv/stream', methods=['POST'])
+@jwt_required()
+def upload_cv_stream():
+    """Same as upload_cv, but streams each question as a Server-Sent Event as soon as it is generated"""
+    try:
+        user_id = get_jwt_identity()
+        check_llm_capacity(request.form.get('interview_level'))
+        new_cv, new_session, cv_text, fresh_questions, input_tokens = create_upload_session(user_id)
+    except LLMBusy as e:
+        return llm_busy_response(e)
+    except UploadError as e:
+        return jsonify({"error": e.message}), e.status_code
     except Exception as e:
         logging.error(f"CV upload error: {e}")
         db.session.rollback()
         return jsonify({"error": "Failed to upload CV"}), 500
 
+    session_id = new_session.id
+    owner = (session_id, new_session.user_id)
+    cv_data = new_cv.to_dict()
+
+    def generate():
+        session = db.session.get(InterviewSession, session_id)
+        questions = []
+        try:
+            yield sse_event('session', {"session_id": session_id, "status": session.status, "cv": cv_data,
+                                        "input_tokens": input_tokens})
+
+            for question in stream_interview_questions(cv_text, cv_data['company_name'], cv_data['job_role'],
+                                                       cv_data['interview_level'], cv_data['job_description'],
+                                                       use_cache=not fresh_questions):
+                questions.append(question)
+                session.add_question(question)
+                db.session.commit()
+                yield sse_event('question', {"index": len(questions) - 1, "question": question})
+
+            if not questions:
+                raise ValueError("Model returned no questions")
+
+            session.status = 'active'
+            db.session.commit()
+            yield sse_event('done', {"session_id": session_id, "status": session.status, "total": len(questions)})
+        except GeneratorExit:
+            # Client went away mid-stream; don't leave the session stuck in 'generating'
+            session.status = 'failed'
+            session.error = "Question generation was interrupted"
+            db.session.commit()
+            raise
+        except Exception as e:
+            logging.error(f"Streaming question generation error: {type(e).__name__}: {e}")
+            db.session.rollback()
+            session.status = 'failed'
+            session.error = "Unable to generate interview questions at this time. Please try again later."
+            db.session.commit()
+            yield sse_event('error', {"session_id": session_id, "error": session.error})
+
+    return Response(stream_with_context(llm_owned_stream(generate(), *owner)), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no" # Stop proxies from buffering the stream
+    })
+
+@app.route('/api/interview/status', methods=['GET'])
+@jwt_required()
+def get_session_status():
+    """Poll endpoint for the question generation job started by upload_cv"""
+    try:
+        user_id = get_jwt_identity()
+        session_id = request.args.get('session_id')
+
+        session = db.session.get(InterviewSession, session_id)
+
+        if not session:
+            return jsonify({"error": "Invalid or expired session"}), 404
+
+        if session.user_id != int(user_id):
+            return jsonify({"error": "Unauthorized access to session"}), 403
+
+        status_data = {
+            "session_id": session.id,
+            "status": session.status
+        }
+        if session.status == 'failed':
+            status_data["error"] = session.error
+        elif session.status != 'generating':
+            status_data["questions"] = session.questions
+            if session.status == 'deferred':
+                status_data["message"] = session.error
+
+        return jsonify(status_data), 200
+
+    except Exception as e:
+        logging.error(f"Get session status error: {e}")
+        return jsonify({"error": "Failed to get session status"}), 500
+
 @app.route('/api/interview/question', methods=['GET'])
 @jwt_required()
 def get_current_question():
@@ -408,6 +1308,12 @@ def get_current_question():
         if session.user_id != int(user_id):
             return jsonify({"error": "Unauthorized access to session"}), 403
 
+        if session.status == 'generating':
+            return jsonify({"status": session.status, "message": "Questions are still being generated"}), 202
+
+        if session.status == 'failed':
+            return jsonify({"error": session.error or "Question generation failed"}), 500
+
         questions = session.questions
         current_index = session.current_question_index
 
@@ -446,21 +1352,34 @@ def submit_answer():
         if session.user_id != int(user_id):
             return jsonify({"error": "Unauthorized access to session"}), 403
 
+        if session.status in ('generating', 'failed'):
+            return jsonify({"error": "Interview questions are not ready"}), 409
+
+        if session.status in ('grading', 'deferred', 'completed'):
+            return jsonify({"error": "Interview has already been submitted for grading"}), 409
+
         if not answer or not answer.strip():
             return jsonify({"error": "Answer is required"}), 400
 
-        # Store answer in DB
-        current_responses = session.responses
-        current_responses.append(answer.strip())
-        session.responses = current_responses # Trigger setter
+        items = session.items
+        answered_index = session.current_question_index
+
+        if answered_index >= len(items):
+            return jsonify({"error": "All questions have already been answered"}), 409
+
+        # Store answer in DB: a single row update on the question's item
+        items[answered_index].answer = answer.strip()
         session.current_question_index += 1
         
         db.session.commit()
 
-        questions = session.questions
+        # Optionally grade this answer in the background so the final report only has to summarize
+        if data.get('grade', app.config['INCREMENTAL_GRADING']):
+            job_queue.submit(run_answer_grading, session_id, answered_index)
+
         current_index = session.current_question_index
 
-        if current_index >= len(questions):
+        if current_index >= len(items):
             return jsonify({
                 "completed": True,
                 "message": "All questions answered"
@@ -468,15 +1387,234 @@ def submit_answer():
 
         return jsonify({
             "message": "Answer submitted successfully",
-            "next_question": questions[current_index],
+            "next_question": items[current_index].question,
             "progress": current_index + 1,
-            "total": len(questions)
+            "total": len(items)
         }), 200
 
     except Exception as e:
         logging.error(f"Submit answer error: {e}")
         return jsonify({"error": "Failed to submit answer"}), 500
 
+def run_answer_grading(session_id, question_index):
+    """Background job: grade one answer as soon as it is submitted"""
+    session = db.session.get(InterviewSession, session_id)
+    if not session:
+        logging.error(f"Answer grading job: session {session_id} no longer exists")
+        return
+
+    item = SessionItem.query.filter_by(session_id=session_id, question_index=question_index).first()
+    if not item or item.answer is None or item.score is not None:
+        return
+
+    with llm_owner(session_id, session.user_id):
+        grade = grade_answer(item.question, item.answer, interview_level=session.cv.interview_level)
+    if not isinstance(grade, dict):
+        # Not fatal: the final report grades any answer that has no grade yet
+        logging.error(f"Answer grading job failed for {session_id}#{question_index}: {grade}")
+        return
+
+    item.status = grade["status"]
+    item.score = grade["score"]
+    item.feedback = grade["feedback"]
+    db.session.commit()
+
+@fails_sessions('grading', "generate personalized feedback")
+def run_report_generation(session_id):
+    """Background job: grade a finished interview and store the report"""
+    session = db.session.get(InterviewSession, session_id)
+    if not session:
+        logging.error(f"Report generation job: session {session_id} no longer exists")
+        return
+
+    questions = session.questions
+    responses = session.responses
+
+    # Generate feedback (Returns structured dict, or an error string). If answers were
+    # graded during the interview only the overall feedback is left to write.
+    grades = {item.question_index: item for item in session.items if item.score is not None}
+    interview_level = session.cv.interview_level
+    with llm_owner(session_id, session.user_id):
+        if grades:
+            ai_analysis = generate_feedback_from_grades(questions, responses, grades, interview_level)
+        else:
+            ai_analysis = generate_personalized_feedback(responses, questions, interview_level=interview_level)
+    save_report(session, ai_analysis)
+
+@fails_sessions('grading', "generate personalized feedback")
+async def run_report_generation_async(session_id):
+    """Async version of run_report_generation, run on the job queue's event loop when ASYNC_LLM is on"""
+    session = db.session.get(InterviewSession, session_id)
+    if not session:
+        logging.error(f"Report generation job: session {session_id} no longer exists")
+        return
+
+    questions = session.questions
+    responses = session.responses
+    grades = {item.question_index: SimpleNamespace(status=item.status, score=item.score, feedback=item.feedback)
+              for item in session.items if item.score is not None}
+    owner = (session_id, session.user_id)
+    interview_level = session.cv.interview_level
+    # Don't hold a pooled connection while waiting on the model, hundreds of these can be in flight
+    db.session.rollback()
+    with llm_owner(*owner):
+        if grades:
+            ai_analysis = await agenerate_feedback_from_grades(questions, responses, grades, interview_level)
+        else:
+            ai_analysis = await agenerate_personalized_feedback(responses, questions, interview_level=interview_level)
+
+    session = db.session.get(InterviewSession, session_id)
+    save_report(session, ai_analysis)
+
+DEFERRED_MESSAGE = "The AI service is unavailable right now. Your report will be generated automatically once it is back."
+
+def report_breaker(session):
+    """Circuit breaker of the endpoint this session's report is routed to (going by level; the prompt size isn't known yet)"""
+    return llm_endpoints[model_router.route("feedback", session.cv.interview_level).endpoint].breaker
+
+def defer_report(session):
+    """Park a report while the LLM is down; resume_deferred_reports picks it up when the circuit breaker closes"""
+    session.status = 'deferred'
+    session.error = DEFERRED_MESSAGE
+    db.session.commit()
+
+def save_report(session, ai_analysis):
+    """Complete the report, or mark the session failed with the "Unable..." message (deferred if the LLM is down)"""
+    if not isinstance(ai_analysis, dict):
+        if report_breaker(session).state != CLOSED:
+            defer_report(session)
+            return
+        session.status = 'failed'
+        session.error = ai_analysis
+        db.session.commit()
+        return
+
+    complete_report(session, ai_analysis)
+
+def resume_deferred_reports(limit=None):
+    """Background job: start grading the reports deferred during an LLM outage, oldest first.
+
+    Each session is claimed with a conditional update, so with several worker
+    processes only one of them grades it. Reports whose endpoint's breaker is
+    still open here are left for later.
+    """
+    sessions = db.session.execute(
+        db.select(InterviewSession).where(InterviewSession.status == 'deferred')
+        .order_by(InterviewSession.created_at).limit(limit)
+    ).scalars().all()
+    session_ids = [session.id for session in sessions if not report_breaker(session).is_open]
+    for session_id in session_ids:
+        claimed = db.session.execute(
+            db.update(InterviewSession)
+            .where(InterviewSession.id == session_id, InterviewSession.status == 'deferred')
+            .values(status='grading', error=None)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            submit_llm_job(run_report_generation, run_report_generation_async, session_id)
+    if session_ids:
+        logging.info(f"Resumed {len(session_ids)} deferred report(s)")
+
+def on_llm_breaker_change(state):
+    # Once the open period is over one deferred report doubles as the trial call; the rest follow when it closes
+    job_queue.submit(resume_deferred_reports, 1 if state == HALF_OPEN else None)
+
+for endpoint in llm_endpoints.values():
+    endpoint.breaker.add_listener(on_llm_breaker_change)
+
+if app.config['DEFERRED_REPORT_SWEEP'] > 0:
+    # Breaker state is per process, so a report deferred by a process that has since restarted or exited would
+    # otherwise wait for a breaker that never closes. The first sweep picks up whatever was deferred before we started.
+    job_queue.submit_every(app.config['DEFERRED_REPORT_SWEEP'], resume_deferred_reports)
+
+if app.config['LLM_CALL_RETENTION_DAYS'] > 0:
+    job_queue.submit_every(3600, prune_llm_calls, app.config['LLM_CALL_RETENTION_DAYS'])
+
+def score_metrics(total_score, question_count):
+    """Accuracy as a percentage, its display string and the confidence level for a graded session"""
+    accuracy = (total_score / question_count) * 100 if question_count else 0.0
+    confidence_level = "High" if total_score > (question_count * 0.7) else "Moderate"
+    return accuracy, f"{accuracy:.2f}%", confidence_level
+
+def analysis_score(analysis):
+    """A question analysis' score as a float between 0 and 1, or 0 if it isn't a number"""
+    try:
+        return min(1.0, max(0.0, float(analysis.get("score", 0))))
+    except (TypeError, ValueError):
+        logging.error(f"Invalid score in AI feedback: {analysis.get('score')!r}")
+        return 0.0
+
+def overall_sections(overall_feedback):
+    """Split overall_feedback markdown into the {"title", "content"} sections the report stream sends"""
+    sections = []
+    for block in re.split(r'^### ', overall_feedback, flags=re.MULTILINE):
+        if block.strip():
+            title, _, content = block.partition('\n')
+            sections.append({"title": title.strip(), "content": content.strip()})
+    return sections
+
+def complete_report(session, ai_analysis):
+    """Score the AI analysis, mark the session completed and create its PerformanceReport"""
+    questions = session.questions
+
+    # Handle potential error in AI response
+    if "questions_analysis" not in ai_analysis:
+        # Fallback if AI failed to return valid JSON
+        questions_analysis = []
+    else:
+        questions_analysis = ai_analysis["questions_analysis"]
+
+    # The model sometimes sends scores as strings; normalize them like parse_grade does
+    if not isinstance(questions_analysis, list):
+        questions_analysis = []
+    questions_analysis = [analysis for analysis in questions_analysis if isinstance(analysis, dict)]
+    for analysis in questions_analysis:
+        analysis["score"] = analysis_score(analysis)
+    ai_analysis["questions_analysis"] = questions_analysis
+
+    # Calculate metrics based on AI scores
+    # Stored as numbers on the session and report so listings never have to reparse the JSON
+    total_score = sum(q["score"] for q in questions_analysis)
+    accuracy, accuracy_level, confidence_level = score_metrics(total_score, len(questions))
+
+    # Keep the per-question grades on the session items so they can be queried directly
+    for item, analysis in zip(session.items, questions_analysis):
+        item.status = analysis.get("status")
+        item.score = analysis["score"]
+        item.feedback = analysis.get("feedback")
+
+    # Update Session with results
+    # Store the FULL JSON analysis in the feedback column for retrieval
+    session.feedback = json.dumps(ai_analysis)
+    session.total_score = total_score
+    session.accuracy = accuracy
+    session.question_count = len(questions)
+    session.status = 'completed'
+    session.error = None
+    session.completed_at = datetime.utcnow()
+
+    # Create performance report
+    new_report = PerformanceReport(
+        session_id=session.id,
+        completed_at=session.completed_at,
+        accuracy_level=accuracy_level,
+        accuracy=accuracy,
+        total_score=total_score,
+        confidence_level=confidence_level,
+        total_questions=len(questions),
+        correct_answers=int(total_score), # Approximate integer score
+        feedback=json.dumps(ai_analysis), # Store full JSON
+        cv_id=session.cv_id
+    )
+    db.session.add(new_report)
+    # Keep the analytics summaries in step, in the same transaction
+    record_graded_session(session)
+
+    # REMOVED: db.session.delete(session) - We keep it for history!
+
+    db.session.commit()
+    return new_report
+
 @app.route('/api/report/generate', methods=['POST'])
 @jwt_required()
 def generate_report():
@@ -494,79 +1632,175 @@ def generate_report():
         if session.user_id != int(user_id):
             return jsonify({"error": "Unauthorized access to session"}), 403
 
+        # Already graded or being graded: point the client at the poll endpoint
+        if session.status in ('grading', 'completed'):
+            return jsonify({
+                "message": "Report is already being generated" if session.status == 'grading' else "Report already generated",
+                "session_id": session_id,
+                "status": session.status
+            }), 202 if session.status == 'grading' else 200
+
         questions = session.questions
         responses = session.responses
-        cv_id = session.cv_id
 
-        if len(responses) != len(questions):
+        if not questions or len(responses) != len(questions):
             return jsonify({"error": "Not all questions have been answered"}), 400
 
-        # Generate feedback (Returns structured dict)
-        ai_analysis = generate_personalized_feedback(responses, questions)
-
-        # Handle potential error in AI response
-        if "questions_analysis" not in ai_analysis:
-            # Fallback if AI failed to return valid JSON
-            questions_analysis = []
-            overall_feedback = ai_analysis.get("overall_feedback", "Feedback generation unavailable.")
-        else:
-            questions_analysis = ai_analysis["questions_analysis"]
-            overall_feedback = ai_analysis["overall_feedback"]
-
-        # Calculate metrics based on AI scores
-        total_score = sum(q.get("score", 0) for q in questions_analysis)
-        accuracy_level = f"{(total_score / len(questions)) * 100:.2f}%"
-        confidence_level = "High" if total_score > (len(questions) * 0.7) else "Moderate"
-
-        # Update Session with results
-        # Store the FULL JSON analysis in the feedback column for retrieval
-        session.feedback = json.dumps(ai_analysis)
-        session.status = 'completed'
-        session.completed_at = datetime.utcnow()
-        
-        # Create performance report
-        new_report = PerformanceReport(
-            accuracy_level=accuracy_level,
-            confidence_level=confidence_level,
-            total_questions=len(questions),
-            correct_answers=int(total_score), # Approximate integer score
-            feedback=json.dumps(ai_analysis), # Store full JSON
-            cv_id=cv_id
-        )
-        db.session.add(new_report)
-        
-        # REMOVED: db.session.delete(session) - We keep it for history!
-        
+        # LLM down: don't start a job that can only fail, grade it once the API is back
+        if report_breaker(session).is_open:
+            defer_report(session)
+            return jsonify({
+                "message": session.error,
+                "session_id": session_id,
+                "status": session.status
+            }), 202
+
+        # Grading can take up to a minute, so hand it to a background worker
+        session.status = 'grading'
+        session.error = None
         db.session.commit()
-
-        # Prepare report data using the rich analysis
-        # Merge questions info with AI analysis if needed, but AI analysis has it.
-        # However, to be safe, we map by index or trust AI order.
-        # AI prompt iterates indices, so order maintains.
-        
-        detailed_responses = questions_analysis if questions_analysis else \
-            [{"question": q, "answer": r, "status": "Unknown", "score": 0, "feedback": "No detailed analysis."} for q, r in zip(questions, responses)]
-        
-        report_data = {
-            "total_questions": len(questions),
-            "answers_received": len(responses),
-            "accuracy_level": accuracy_level,
-            "confidence_level": confidence_level,
-            "detailed_responses": detailed_responses,
-            "feedback": overall_feedback
-        }
+        submit_llm_job(run_report_generation, run_report_generation_async, session_id)
 
         return jsonify({
-            "message": "Report generated successfully",
-            "report": report_data,
-            "report_id": new_report.id
-        }), 200
+            "message": "Report generation started",
+            "session_id": session_id,
+            "status": session.status
+        }), 202
 
     except Exception as e:
         logging.error(f"Generate report error: {e}")
         db.session.rollback()
         return jsonify({"error": "Failed to generate report"}), 500
 
+@app.route('/api/report/stream', methods=['POST'])
+@jwt_required()
+def generate_report_stream():
+    """Grade the interview while streaming each question analysis and overall feedback section as SSE.
+
+    Each question's grade is saved to its SessionItem as it arrives, so a timeout
+    part way through keeps everything graded up to that point and a retry (or a
+    session whose answers were graded during the interview) only grades the rest.
+    """
+    try:
+        user_id = get_jwt_identity()
+        data = request.get_json()
+        session_id = data.get('session_id')
+
+        session = db.session.get(InterviewSession, session_id)
+
+        if not session:
+            return jsonify({"error": "Invalid or expired session"}), 404
+
+        if session.user_id != int(user_id):
+            return jsonify({"error": "Unauthorized access to session"}), 403
+
+        if session.status in ('grading', 'completed'):
+            return jsonify({"error": "Report is already being generated" if session.status == 'grading' else "Report already generated"}), 409
+
+        questions = session.questions
+        responses = session.responses
+
+        if not questions or len(responses) != len(questions):
+            return jsonify({"error": "Not all questions have been answered"}), 400
+
+        if report_breaker(session).is_open:
+            defer_report(session)
+            return Response(sse_event('deferred', {"session_id": session_id, "status": session.status, "message": session.error}),
+                            mimetype='text/event-stream', headers={"Cache-Control": "no-cache"})
+
+        session.status = 'grading'
+        session.error = None
+        db.session.commit()
+        owner = (session.id, session.user_id)
+        interview_level = session.cv.interview_level
+        breaker = report_breaker(session)
+
+    except Exception as e:
+        logging.error(f"Generate report error: {e}")
+        db.session.rollback()
+        return jsonify({"error": "Failed to generate report"}), 500
+
+    def generate():
+        session = db.session.get(InterviewSession, session_id)
+        grades = {item.question_index: item for item in session.items if item.score is not None}
+        analysis = {"overall_feedback": "", "questions_analysis": []}
+        sections = []
+        try:
+            if grades:
+                # Answers graded during the interview or by an earlier, interrupted stream: only grade the rest
+                ai_analysis = generate_feedback_from_grades(questions, responses, grades, interview_level)
+                if not isinstance(ai_analysis, dict):
+                    save_report(session, ai_analysis)
+                    if session.status == 'deferred':
+                        yield sse_event('deferred', {"session_id": session_id, "status": session.status, "message": session.error})
+                    else:
+                        yield sse_event('error', {"session_id": session_id, "error": session.error})
+                    return
+                report = complete_report(session, ai_analysis)
+                for item in ai_analysis["questions_analysis"]:
+                    yield sse_event('question_analysis', item)
+                for section in overall_sections(ai_analysis["overall_feedback"]):
+                    yield sse_event('overall_section', section)
+            else:
+                for item in stream_personalized_feedback(responses, questions, interview_level=interview_level):
+                    event = item.pop('type', 'question_analysis')
+                    if event == 'overall_section':
+                        sections.append(f"### {item.get('title', '')}\n{item.get('content', '')}")
+                        analysis["overall_feedback"] = "\n\n".join(sections)
+                    else:
+                        event = 'question_analysis'
+                        analysis["questions_analysis"].append(item)
+                        # Grade the matching SessionItem too, so a retry doesn't ask for this answer again
+                        index = len(analysis["questions_analysis"]) - 1
+                        if index < len(session.items):
+                            graded = session.items[index]
+                            graded.status = item.get("status")
+                            graded.score = analysis_score(item)
+                            graded.feedback = item.get("feedback")
+
+                    # Persist the partial report so far
+                    session.feedback = json.dumps(analysis)
+                    db.session.commit()
+                    yield sse_event(event, item)
+
+                report = complete_report(session, analysis)
+            yield sse_event('done', {
+                "session_id": session_id,
+                "status": session.status,
+                "report_id": report.id,
+                "accuracy_level": report.accuracy_level,
+                "confidence_level": report.confidence_level
+            })
+        except GeneratorExit:
+            # Client went away; keep what was graded but let the user generate again
+            if session.status == 'grading':
+                session.status = 'failed'
+                session.error = "Report generation was interrupted"
+                db.session.commit()
+            raise
+        except Exception as e:
+            logging.error(f"Streaming report generation error: {type(e).__name__}: {e}")
+            db.session.rollback()
+            if is_outage(e) and breaker.state != CLOSED:
+                # What was graded is on the session items; the rest is graded in the background once the LLM is back
+                defer_report(session)
+                yield sse_event('deferred', {"session_id": session_id, "status": session.status, "message": session.error})
+                return
+            session.status = 'failed'
+            session.error = "Unable to generate personalized feedback at this time. Please try again later."
+            db.session.commit()
+            yield sse_event('error', {"session_id": session_id, "error": session.error})
+
+    return Response(stream_with_context(llm_owned_stream(generate(), *owner)), mimetype='text/event-stream', headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+REPORT_FIELDS = ['id', 'session_id', 'accuracy_level', 'accuracy', 'total_score', 'confidence_level', 'total_questions',
+                 'correct_answers', 'completed_at', 'feedback', 'cv_id']
+# The feedback blob is only sent when explicitly asked for with ?fields=
+REPORT_DEFAULT_FIELDS = [f for f in REPORT_FIELDS if f != 'feedback']
+
 @app.route('/api/reports', methods=['GET'])
 @jwt_required()
 def get_reports():
@@ -578,62 +1812,157 @@ def get_reports():
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        # Get all CVs and their reports
-        reports_data = []
-        for cv in user.cvs:
-            for report in cv.performance_reports:
-                reports_data.append({
-                    "report": report.to_dict(),
-                    "cv": cv.to_dict()
-                })
+        limit = get_limit_arg()
+        fields = get_fields_arg(REPORT_FIELDS, REPORT_DEFAULT_FIELDS)
 
-        return jsonify({"reports": reports_data}), 200
+        # Get one page of the user's reports with their CVs in one joined query, newest first
+        query = (
+            db.select(PerformanceReport, CV)
+            .join(CV, PerformanceReport.cv_id == CV.id)
+            .where(CV.user_id == user.id)
+        )
+        if 'feedback' not in fields:
+            query = query.options(defer(PerformanceReport.feedback))
+        if request.args.get('cursor'):
+            last_completed_at, last_id = decode_cursor(request.args['cursor'], datetime, int)
+            query = query.where(db.or_(
+                PerformanceReport.completed_at < last_completed_at,
+                db.and_(PerformanceReport.completed_at == last_completed_at, PerformanceReport.id < last_id)
+            ))
+        rows = db.session.execute(
+            query.order_by(PerformanceReport.completed_at.desc(), PerformanceReport.id.desc()).limit(limit + 1)
+        ).all()
+
+        reports_data = [
+            {
+                "report": select_fields(report.to_dict(include_feedback='feedback' in fields), fields),
+                "cv": select_fields(cv.to_dict(), CV_DEFAULT_FIELDS)
+            }
+            for report, cv in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1][0]
+            next_cursor = encode_cursor(last.completed_at, last.id)
+
+        return jsonify({"reports": reports_data, "next_cursor": next_cursor}), 200
 
+    except QueryParamError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logging.error(f"Get reports error: {e}")
         return jsonify({"error": "Failed to fetch reports"}), 500
+
+PAST_REPORT_FIELDS = ['session_id', 'cv_company', 'cv_role', 'interview_level', 'completed_at', 'score']
+
 @app.route('/api/profile/reports', methods=['GET'])
 @jwt_required()
 def get_past_reports():
     try:
         user_id = get_jwt_identity()
-        # Fetch completed sessions (reports)
-        # Ordered by completed_at desc
-        sessions = InterviewSession.query.filter_by(
-            user_id=int(user_id), 
-            status='completed'
-        ).order_by(InterviewSession.completed_at.desc()).all()
+        limit = get_limit_arg()
+        fields = get_fields_arg(PAST_REPORT_FIELDS, PAST_REPORT_FIELDS)
+
+        # Answer count is only needed for old sessions graded before AI scores existed
+        answer_count = (
+            db.select(db.func.count(SessionItem.id))
+            .where(SessionItem.session_id == InterviewSession.id, SessionItem.answer.isnot(None))
+            .scalar_subquery()
+        )
+
+        # Fetch one page of completed sessions (reports) with their CV in a single query
+        # Ordered by completed_at desc, with the session id as tie-breaker for the cursor
+        query = (
+            db.select(
+                InterviewSession.id,
+                InterviewSession.completed_at,
+                InterviewSession.total_score,
+                InterviewSession.question_count,
+                CV.company_name,
+                CV.job_role,
+                CV.interview_level,
+                db.case((InterviewSession.total_score.is_(None), answer_count)).label('answer_count')
+            )
+            .join(CV, InterviewSession.cv_id == CV.id)
+            .where(InterviewSession.user_id == int(user_id), InterviewSession.status == 'completed')
+        )
+        if request.args.get('cursor'):
+            last_completed_at, last_id = decode_cursor(request.args['cursor'], datetime, str)
+            query = query.where(db.or_(
+                InterviewSession.completed_at < last_completed_at,
+                db.and_(InterviewSession.completed_at == last_completed_at, InterviewSession.id < last_id)
+            ))
+        rows = db.session.execute(
+            query.order_by(InterviewSession.completed_at.desc(), InterviewSession.id.desc()).limit(limit + 1)
+        ).all()
         
         reports_list = []
-        for s in sessions:
-            cv = CV.query.get(s.cv_id)
-            # Calculate actual score from AI analysis if available
-            score_display = f"{len(s.responses)}/{len(s.questions)}" # Default
-            try:
-                if s.feedback and (s.feedback.startswith('{') or s.feedback.startswith('[')):
-                    analysis = json.loads(s.feedback)
-                    if isinstance(analysis, dict) and "questions_analysis" in analysis:
-                        total_score = sum(q.get("score", 0) for q in analysis["questions_analysis"])
-                        # Format score to 2 decimal places if float, or int if whole number
-                        formatted_score = f"{total_score:.2f}".rstrip('0').rstrip('.')
-                        score_display = f"{formatted_score}/{len(s.questions)}"
-            except Exception:
-                pass # Fallback to count
-
-            reports_list.append({
-                'session_id': s.id,
-                'cv_company': cv.company_name if cv else "Unknown",
-                'cv_role': cv.job_role if cv else "Unknown",
-                'interview_level': cv.interview_level if cv else "",
-                'completed_at': s.completed_at.strftime('%Y-%m-%d %H:%M') if s.completed_at else "",
+        for row in rows[:limit]:
+            if row.total_score is not None:
+                # Format score to 2 decimal places if float, or int if whole number
+                formatted_score = f"{row.total_score:.2f}".rstrip('0').rstrip('.')
+                score_display = f"{formatted_score}/{row.question_count}"
+            else:
+                score_display = f"{row.answer_count}/{row.question_count}" # Fallback for sessions without AI scores
+
+            reports_list.append(select_fields({
+                'session_id': row.id,
+                'cv_company': row.company_name,
+                'cv_role': row.job_role,
+                'interview_level': row.interview_level,
+                'completed_at': row.completed_at.strftime('%Y-%m-%d %H:%M') if row.completed_at else "",
                 'score': score_display
-            })
+            }, fields))
+
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_cursor(last.completed_at, last.id)
             
-        return jsonify(reports_list), 200
+        return jsonify({"reports": reports_list, "next_cursor": next_cursor}), 200
+    except QueryParamError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         logging.error(f"Get reports error: {e}")
         return jsonify({"error": "Failed to load reports"}), 500
 
+@app.route('/api/analytics', methods=['GET'])
+@jwt_required()
+def get_analytics():
+    try:
+        user_id = get_jwt_identity()
+        analytics = get_user_analytics(
+            int(user_id),
+            job_role=request.args.get('job_role'),
+            interview_level=request.args.get('interview_level'),
+            days=get_int_arg('days', 90, 3650),
+            window=get_int_arg('window', 7, 90)
+        )
+        return jsonify(analytics), 200
+    except QueryParamError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        logging.error(f"Get analytics error: {e}")
+        return jsonify({"error": "Failed to load analytics"}), 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """LLM call counts, tokens, retries and latency, and this process's request timings, in Prometheus text format"""
+    token = app.config.get('METRICS_TOKEN')
+    if not token:
+        # Off unless a scraper token is configured
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}"):
+        return jsonify({"error": "Unauthorized"}), 401
+    try:
+        endpoints = llm_endpoints.values()
+        return Response(prometheus_metrics() + request_timer.prometheus_metrics()
+                        + limiter_metrics([endpoint.limiter for endpoint in endpoints])
+                        + breaker_metrics([endpoint.breaker for endpoint in endpoints]), mimetype='text/plain; version=0.0.4')
+    except Exception as e:
+        logging.error(f"Get metrics error: {e}")
+        return jsonify({"error": "Failed to load metrics"}), 500
+
 @app.route('/api/report/<session_id>', methods=['GET'])
 @jwt_required()
 def get_report_detail(session_id):
@@ -647,6 +1976,16 @@ def get_report_detail(session_id):
         if session.user_id != int(user_id):
             return jsonify({"error": "Unauthorized"}), 403
             
+        # Report is still being graded by a background job; the client polls this endpoint
+        if session.status == 'grading':
+            return jsonify({"status": session.status, "message": "Report is being generated"}), 202
+
+        if session.status == 'deferred':
+            return jsonify({"status": session.status, "message": session.error}), 202
+
+        if session.status == 'failed':
+            return jsonify({"status": session.status, "error": session.error or "Report generation failed"}), 500
+
         if session.status != 'completed':
             return jsonify({"error": "Interview not completed yet"}), 400
 
@@ -676,12 +2015,13 @@ def get_report_detail(session_id):
         # If we have structured analysis, use it. Otherwise fallback to simple pairing
         if questions_analysis:
              detailed_responses = questions_analysis
-             # Recalculate score from analysis data for consistency
-             total_score = sum(q.get("score", 0) for q in questions_analysis)
-             accuracy_level = f"{(total_score / len(questions)) * 100:.2f}%"
-             confidence_level = "High" if total_score > (len(questions) * 0.7) else "Moderate"
         else:
              detailed_responses = [{"question": q, "answer": r, "status": "Unknown", "score": 0, "feedback": "Detailed analysis unavailable for this old session."} for q, r in zip(questions, responses)]
+
+        # Scores were stored when the session was graded
+        if session.accuracy is not None:
+             _, accuracy_level, confidence_level = score_metrics(session.total_score, session.question_count)
+        else:
              accuracy_level = f"{min(100, (len(responses) / len(questions)) * 100):.2f}%"
              confidence_level = "High" if len(responses) == len(questions) else "Moderate"
 
@@ -689,12 +2029,14 @@ def get_report_detail(session_id):
             "total_questions": len(questions),
             "answers_received": len(responses),
             "accuracy_level": accuracy_level,
+            "accuracy": session.accuracy,
+            "total_score": session.total_score,
             "confidence_level": confidence_level,
             "detailed_responses": detailed_responses,
             "feedback": overall_feedback
         }
         
-        return jsonify({"report": report_data}), 200
+        return jsonify({"status": session.status, "report": report_data}), 200
     except Exception as e:
         logging.error(f"Get report detail error: {e}")
         return jsonify({"error": "Failed to load report"}), 500
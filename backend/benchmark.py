@@ -0,0 +1,284 @@
+"""
+End-to-end benchmark of the interview flow over HTTP.
+Each virtual user registers, uploads a CV, waits for the questions, answers them
+all, generates the report, waits for it and reads it back, plus the history and
+analytics pages. --concurrency users run at once until --users flows are done.
+
+By default the app is started in-process against fake_openai.py (see there for
+the latency/token rate/failure injection options) with a fresh SQLite database;
+--url benchmarks an already running backend instead.
+
+Reports p50/p95/p99 latency, error count and throughput per route, and for the
+flow stages (flow:questions_ready, flow:report_ready, flow:total). Results are
+saved as JSON; pass an earlier results file as --baseline to fail (exit 1) when
+a route's p95 got more than --tolerance slower.
+Run this: python benchmark.py --users 50 --concurrency 10 --latency 1.0 --token-rate 80
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import httpx
+
+from fake_openai import add_arguments, server_options, start_server
+
+def percentile(values, p):
+    """p-th percentile of values (0-100), interpolated between the closest ranks"""
+    values = sorted(values)
+    if not values:
+        return None
+    rank = (len(values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (rank - low)
+
+def parse_events(lines):
+    """(event, data) for each Server-Sent Event in lines"""
+    event = None
+    for line in lines:
+        if line.startswith('event: '):
+            event = line[len('event: '):]
+        elif line.startswith('data: ') and event:
+            yield event, json.loads(line[len('data: '):])
+            event = None
+
+class Recorder:
+    """Latency and outcome of every request, by route"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)  # route -> [(seconds, ok)]
+        self._lock = threading.Lock()
+
+    def add(self, route, seconds, ok):
+        with self._lock:
+            self.samples[route].append((seconds, ok))
+
+    def stats(self, duration):
+        routes = {}
+        for route, samples in sorted(self.samples.items()):
+            latencies = [seconds * 1000 for seconds, _ in samples]
+            routes[route] = {
+                "count": len(samples),
+                "errors": sum(1 for _, ok in samples if not ok),
+                "throughput_rps": round(len(samples) / duration, 3),
+                "mean_ms": round(sum(latencies) / len(latencies), 1),
+                **{f"p{p}_ms": round(percentile(latencies, p), 1) for p in (50, 95, 99)},
+                "max_ms": round(max(latencies), 1),
+            }
+        return routes
+
+class VirtualUser:
+    """One pass through the interview flow against base_url"""
+
+    def __init__(self, base_url, recorder, cv_bytes, stream, poll_interval):
+        self.http = httpx.Client(base_url=base_url, timeout=300)
+        self.recorder = recorder
+        self.cv_bytes = cv_bytes
+        self.stream = stream
+        self.poll_interval = poll_interval
+
+    def request(self, method, url, route, **kwargs):
+        started = time.perf_counter()
+        try:
+            if self.stream and route.endswith('/stream'):
+                # Time the whole event stream, not just the headers
+                with self.http.stream(method, url, **kwargs) as response:
+                    events = dict(parse_events(response.iter_lines()))
+                ok = response.status_code < 400 and 'error' not in events
+                self.recorder.add(route, time.perf_counter() - started, ok)
+                return response, events
+            response = self.http.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.add(route, time.perf_counter() - started, False)
+            raise
+        self.recorder.add(route, time.perf_counter() - started, response.status_code < 400)
+        return response
+
+    def wait_for_status(self, session_id, busy_status):
+        while True:
+            status = self.request('GET', '/api/interview/status', '/api/interview/status',
+                                  params={'session_id': session_id}).json()
+            if status.get('status') != busy_status:
+                return status
+            time.sleep(self.poll_interval)
+
+    def run(self):
+        started = time.perf_counter()
+        name = f"bench-{uuid.uuid4().hex[:12]}"
+        token = self.request('POST', '/api/register', '/api/register',
+                             json={'username': name, 'email': f'{name}@example.com', 'password': 'benchmark'}).json()['access_token']
+        self.http.headers['Authorization'] = f'Bearer {token}'
+
+        stage = time.perf_counter()
+        form = {'company_name': 'Acme', 'job_role': 'Backend Developer', 'interview_level': 'Intermediate',
+                'job_description': 'Python, Flask, PostgreSQL. Build and run our payments APIs.'}
+        files = {'cv_file': ('cv.docx', self.cv_bytes)}
+        if self.stream:
+            _, events = self.request('POST', '/api/upload-cv/stream', '/api/upload-cv/stream', data=form, files=files)
+            if 'done' not in events:
+                return False
+            session_id = events['done']['session_id']
+        else:
+            session_id = self.request('POST', '/api/upload-cv', '/api/upload-cv', data=form, files=files).json()['session_id']
+            status = self.wait_for_status(session_id, 'generating')
+            if status['status'] != 'active':
+                return False
+        self.recorder.add('flow:questions_ready', time.perf_counter() - stage, True)
+
+        while True:
+            answer = self.request('POST', '/api/interview/answer', '/api/interview/answer',
+                                  json={'session_id': session_id, 'answer': 'I would start by measuring, then fix the hot path.'})
+            if answer.status_code != 200 or answer.json().get('completed'):
+                break
+
+        stage = time.perf_counter()
+        if self.stream:
+            _, events = self.request('POST', '/api/report/stream', '/api/report/stream', json={'session_id': session_id})
+            ok = 'done' in events
+        else:
+            self.request('POST', '/api/report/generate', '/api/report/generate', json={'session_id': session_id})
+            ok = self.wait_for_status(session_id, 'grading')['status'] == 'completed'
+        if not ok:
+            return False
+        self.recorder.add('flow:report_ready', time.perf_counter() - stage, True)
+
+        self.request('GET', f'/api/report/{session_id}', '/api/report/<session_id>')
+        self.request('GET', '/api/profile/reports', '/api/profile/reports')
+        self.request('GET', '/api/analytics', '/api/analytics')
+        self.recorder.add('flow:total', time.perf_counter() - started, True)
+        return True
+
+    def close(self):
+        self.http.close()
+
+def make_cv():
+    from docx import Document
+
+    document = Document()
+    document.add_paragraph("Jane Doe - Backend Developer")
+    document.add_paragraph("Skills")
+    document.add_paragraph("Python, Flask, PostgreSQL, Redis, Docker, AWS")
+    document.add_paragraph("Experience")
+    document.add_paragraph("Built and operated payment APIs handling 2M requests a day. Led the move to async job processing.")
+    cv = io.BytesIO()
+    document.save(cv)
+    return cv.getvalue()
+
+def start_app(args):
+    """Start the fake API and the app in this process. Returns (base_url, shutdown)"""
+    fake = start_server(**server_options(args))
+    workdir = tempfile.mkdtemp()
+    os.environ.update({
+        'OPENAI_BASE_URL': f'http://127.0.0.1:{fake.server_port}/v1',
+        'OPENAI_API_KEY': 'sk-benchmark',
+        'DATABASE_URL': args.database_url or f"sqlite:///{os.path.join(workdir, 'benchmark.db')}",
+        'CV_CACHE_FOLDER': os.path.join(workdir, 'cv_text'),
+        'LLM_CACHE_BACKEND': 'none',  # Every request has to reach the (fake) API
+    })
+
+    import logging
+    from werkzeug.serving import make_server
+    from app import app, db
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # No access log lines
+    with app.app_context():
+        db.create_all()
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def shutdown():
+        server.shutdown()
+        fake.shutdown()
+    return f'http://127.0.0.1:{server.server_port}', shutdown
+
+def compare(results, baseline, tolerance):
+    """Print the p95 change per route against baseline. Returns the routes that regressed."""
+    regressed = []
+    print(f"\nCompared with {baseline['timestamp']} (p95, tolerance {tolerance:.0%}):")
+    for route, stats in results['routes'].items():
+        before = baseline['routes'].get(route)
+        if not before or not before['p95_ms']:
+            continue
+        change = stats['p95_ms'] / before['p95_ms'] - 1
+        flag = 'REGRESSED' if change > tolerance else ''
+        print(f"  {route:32} {before['p95_ms']:9.1f} -> {stats['p95_ms']:9.1f} ms  {change:+7.1%}  {flag}")
+        if flag:
+            regressed.append(route)
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=20, help="interview flows to run in total")
+    parser.add_argument('--concurrency', type=int, default=5, help="flows running at the same time")
+    parser.add_argument('--stream', action='store_true', help="use the SSE upload and report routes")
+    parser.add_argument('--poll-interval', type=float, default=0.2, help="seconds between status polls")
+    parser.add_argument('--url', help="benchmark a running backend instead of starting one")
+    parser.add_argument('--database-url', help="database for the in-process app (default: a fresh SQLite file)")
+    parser.add_argument('--output', help="results file (default: benchmark-results/<time>.json)")
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed p95 slowdown against --baseline")
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    base_url, shutdown = (args.url, None) if args.url else start_app(args)
+    recorder = Recorder()
+    cv_bytes = make_cv()
+
+    def flow(_):
+        user = VirtualUser(base_url, recorder, cv_bytes, args.stream, args.poll_interval)
+        try:
+            return user.run()
+        except Exception as e:
+            print(f"Flow failed: {type(e).__name__}: {e}", file=sys.stderr)
+            return False
+        finally:
+            user.close()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        outcomes = list(executor.map(flow, range(args.users)))
+    duration = time.perf_counter() - started
+    if shutdown:
+        shutdown()
+
+    config = {key: value for key, value in vars(args).items() if key not in ('output', 'baseline', 'database_url')}
+    results = {
+        "timestamp": datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        "config": config,
+        "duration_seconds": round(duration, 2),
+        "flows": {"completed": sum(outcomes), "failed": len(outcomes) - sum(outcomes),
+                  "per_second": round(sum(outcomes) / duration, 3)},
+        "routes": recorder.stats(duration),
+    }
+
+    print(f"{args.users} flows, concurrency {args.concurrency}, {duration:.1f}s, "
+          f"{results['flows']['completed']} completed, {results['flows']['failed']} failed")
+    print(f"  {'route':32} {'count':>6} {'errors':>6} {'rps':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for route, stats in results['routes'].items():
+        print(f"  {route:32} {stats['count']:6} {stats['errors']:6} {stats['throughput_rps']:7.2f} "
+              f"{stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f}")
+
+    output = args.output or os.path.join('benchmark-results', f"{datetime.utcnow():%Y%m%dT%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved {output}")
+
+    regressed = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressed = compare(results, json.load(f), args.tolerance)
+    return 1 if regressed or results['flows']['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
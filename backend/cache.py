@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class CVTextCache:
+    """Content-addressed on-disk cache of extracted CV text.
+
+    Entries are keyed by the SHA-256 of the uploaded file bytes, so re-uploading the
+    same CV for another company/role skips PDF/DOCX parsing entirely. The total size
+    of the store is bounded; the least recently used entries are evicted first.
+    """
+
+    def __init__(self, app=None):
+        self.directory = None
+        self.max_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.directory = app.config['CV_CACHE_FOLDER']
+        self.max_bytes = app.config['CV_CACHE_MAX_BYTES']
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def key_for(data):
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def key_for_file(path):
+        """Same key as key_for, for a file too big to read into memory"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.txt")
+
+    def get(self, key):
+        """Return the cached text for key, or None on a miss"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            # Bump mtime so eviction is least-recently-used rather than oldest-written
+            os.utime(path)
+        except FileNotFoundError:
+            text = None
+        except OSError as e:
+            logging.error(f"CV text cache read error for {key}: {e}")
+            text = None
+
+        with self._lock:
+            if text is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return text
+
+    def set(self, key, text):
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            # Atomic so a concurrent reader never sees a half-written entry
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.error(f"CV text cache write error for {key}: {e}")
+            return
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.txt'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, name in sorted(entries):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self):
+        entries = self._entries()
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes
+        }
+
+
+class MemoryResponseBackend:
+    """Per-process LRU store for LLM responses"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.time() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteResponseBackend:
+    """SQLite-file LRU store for LLM responses, shared by all workers on a host"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_response "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_response_last_used ON llm_response (last_used)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def get(self, key):
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute("SELECT value, expires_at FROM llm_response WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                conn.execute("DELETE FROM llm_response WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_response SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key, value, ttl):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_response (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, now + ttl, now)
+            )
+            conn.execute("DELETE FROM llm_response WHERE expires_at < ?", (now,))
+            conn.execute(
+                "DELETE FROM llm_response WHERE key IN "
+                "(SELECT key FROM llm_response ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM llm_response").fetchone()[0]
+
+
+class ResponseCache:
+    """Cache of LLM completions keyed on model + normalized prompt + request parameters.
+
+    LLM_CACHE_BACKEND selects 'memory' (per process), 'sqlite' (shared file) or 'none'.
+    Entries expire after LLM_CACHE_TTL seconds and the store holds at most
+    LLM_CACHE_MAX_ENTRIES, evicting the least recently used.
+    """
+
+    # Request options that don't change the completion and so stay out of the key
+    IGNORED_PARAMS = {'timeout'}
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config['LLM_CACHE_BACKEND']
+        max_entries = app.config['LLM_CACHE_MAX_ENTRIES']
+        self.ttl = app.config['LLM_CACHE_TTL']
+        if backend == 'memory':
+            self.backend = MemoryResponseBackend(max_entries)
+        elif backend == 'sqlite':
+            self.backend = SQLiteResponseBackend(app.config['LLM_CACHE_PATH'], max_entries)
+        elif backend == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown LLM_CACHE_BACKEND: {backend}")
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    @staticmethod
+    def _normalize(text):
+        # Whitespace differences (e.g. CV extraction quirks) shouldn't defeat the cache
+        return ' '.join(text.split())
+
+    def key_for(self, model, messages, **params):
+        payload = {
+            'model': model,
+            'messages': [
+                {'role': m['role'], 'content': self._normalize(m['content'])} for m in messages
+            ],
+            'params': {k: v for k, v in params.items() if k not in self.IGNORED_PARAMS}
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            logging.error(f"LLM response cache read error: {e}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, value, self.ttl)
+        except Exception as e:
+            logging.error(f"LLM response cache write error: {e}")
+
+    def stats(self):
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__ if self.enabled else None,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'entries': len(self.backend) if self.enabled else 0,
+            'ttl': self.ttl
+        }
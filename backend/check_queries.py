@@ -0,0 +1,194 @@
+"""
+Query checks for the report history endpoints.
+Seeds a throwaway SQLite database with a large synthetic dataset and verifies that
+  1. /api/profile/reports, /api/reports, /api/profile and /api/analytics issue the same number of
+     queries regardless of how many sessions a user has (i.e. no N+1 queries), and
+  2. every query those endpoints run is served by an index (EXPLAIN QUERY PLAN shows
+     no full table scans), and
+  3. following next_cursor with a small page size walks the whole history: every page
+     returns 200 and no row shows up twice.
+Run this: python check_queries.py
+"""
+import os
+import re
+import sys
+import tempfile
+
+# Never point this at a real database: it creates and seeds its own
+_db_file = os.path.join(tempfile.mkdtemp(), 'check_queries.db')
+os.environ['DATABASE_URL'] = f'sqlite:///{_db_file}'
+
+import json
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import event, insert, text
+from flask_jwt_extended import create_access_token
+
+from app import app, db
+from model import User, CV, InterviewSession, SessionItem, PerformanceReport, ProgressSummary, CategorySummary
+
+HISTORY_SIZES = [1, 10, 100]
+BACKGROUND_USERS = 300              # Other users' rows, so the tables are big enough for plans to matter
+BACKGROUND_SESSIONS_PER_USER = 20
+QUESTIONS_PER_SESSION = 8
+
+ENDPOINTS = ['/api/profile/reports', '/api/reports', '/api/profile', '/api/analytics']
+# Paged endpoints: (list in the response, unique key of one of its items)
+PAGED = {
+    '/api/profile/reports': ('reports', lambda item: item['session_id']),
+    '/api/reports': ('reports', lambda item: item['report']['id']),
+    '/api/profile': ('cvs', lambda item: item['id']),
+}
+PAGE_LIMIT = 7  # well under the largest history, so the cursor is followed many times
+
+# "SCAN cv" / "SCAN TABLE cv" with no index is a full table scan
+FULL_SCAN = re.compile(r'^SCAN (TABLE )?(\w+)$')
+
+
+def seed_user(username, sessions):
+    user = User(username=username, password='x', email=f'{username}@example.com')
+    db.session.add(user)
+    db.session.flush()
+
+    now = datetime.utcnow()
+    analysis = json.dumps({
+        "overall_feedback": "Feedback",
+        "questions_analysis": [{"question": f"Question {q}?", "score": 0.5} for q in range(QUESTIONS_PER_SESSION)]
+    })
+    cv_rows, session_rows, item_rows, report_rows = [], [], [], []
+    first_cv_id = (db.session.execute(text('SELECT COALESCE(MAX(id), 0) FROM cv')).scalar()) + 1
+    for n in range(sessions):
+        cv_id = first_cv_id + n
+        session_id = str(uuid.uuid4())
+        completed_at = now - timedelta(hours=n)
+        cv_rows.append({'id': cv_id, 'company_name': f'Company {n}', 'job_role': 'Engineer',
+                        'interview_level': 'Intermediate', 'user_id': user.id})
+        # Mix in some sessions that are still in progress
+        status = 'completed' if n % 5 else 'active'
+        session_rows.append({'id': session_id, 'user_id': user.id, 'cv_id': cv_id, 'status': status,
+                             'current_question_index': QUESTIONS_PER_SESSION, 'feedback': analysis,
+                             'total_score': 0.5 * QUESTIONS_PER_SESSION, 'accuracy': 50.0,
+                             'question_count': QUESTIONS_PER_SESSION, 'created_at': completed_at,
+                             'completed_at': completed_at if status == 'completed' else None})
+        item_rows.extend({'session_id': session_id, 'question_index': q, 'question': f'Question {q}?',
+                          'answer': f'Answer {q}', 'status': 'Partial', 'score': 0.5, 'feedback': 'Feedback'}
+                         for q in range(QUESTIONS_PER_SESSION))
+        if status == 'completed':
+            report_rows.append({'accuracy_level': '50.00%', 'accuracy': 50.0, 'total_score': 0.5 * QUESTIONS_PER_SESSION,
+                                'confidence_level': 'Moderate',
+                                'total_questions': QUESTIONS_PER_SESSION, 'correct_answers': 4,
+                                'feedback': analysis, 'cv_id': cv_id, 'session_id': session_id,
+                                'completed_at': completed_at})
+
+    # Analytics summaries, as record_graded_session would have left them
+    progress = {}
+    for row in session_rows:
+        if row['status'] == 'completed':
+            totals = progress.setdefault(row['completed_at'].date(), {'session_count': 0, 'question_count': 0, 'total_score': 0.0})
+            totals['session_count'] += 1
+            totals['question_count'] += row['question_count']
+            totals['total_score'] += row['total_score']
+    progress_rows = [{'user_id': user.id, 'job_role': 'Engineer', 'interview_level': 'Intermediate', 'day': day, **totals}
+                     for day, totals in progress.items()]
+    category_rows = [{'user_id': user.id, 'category': 'General', 'question_count': len(report_rows) * QUESTIONS_PER_SESSION,
+                      'total_score': 0.5 * len(report_rows) * QUESTIONS_PER_SESSION, 'wrong_count': 0}]
+
+    for model, rows in [(CV, cv_rows), (InterviewSession, session_rows), (SessionItem, item_rows),
+                        (PerformanceReport, report_rows), (ProgressSummary, progress_rows), (CategorySummary, category_rows)]:
+        if rows:
+            db.session.execute(insert(model), rows)
+    db.session.commit()
+    return user.id
+
+
+def capture_queries(engine, client, url, token):
+    """Run a GET request and return the (statement, parameters) pairs it executed"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        response = client.get(url, headers={'Authorization': f'Bearer {token}'})
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+    assert response.status_code == 200, f'{url} returned {response.status_code}: {response.get_data(as_text=True)}'
+    return statements, response.get_json()
+
+
+def full_scans(engine, statement, parameters):
+    """Tables the SQLite planner would scan end to end for this statement"""
+    raw = engine.raw_connection()
+    try:
+        plan = raw.cursor().execute(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+    finally:
+        raw.close()
+    scans = []
+    for row in plan:
+        match = FULL_SCAN.match(row[-1])
+        # Scanning a subquery's (small) result is fine, only real tables count
+        if match and match.group(2) in db.metadata.tables:
+            scans.append(match.group(2))
+    return scans
+
+
+def main():
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        engine = db.engine
+        for n in range(BACKGROUND_USERS):
+            seed_user(f'background{n}', BACKGROUND_SESSIONS_PER_USER)
+        tokens = {size: create_access_token(identity=str(seed_user(f'user{size}', size))) for size in HISTORY_SIZES}
+        # Give the planner real statistics, as production databases have
+        db.session.execute(text('ANALYZE'))
+        db.session.commit()
+
+    client = app.test_client()
+    for endpoint in ENDPOINTS:
+        # Ask for the largest page so every seeded session is actually returned
+        url = f'{endpoint}?limit=100'
+        counts = {}
+        for size in HISTORY_SIZES:
+            statements, body = capture_queries(engine, client, url, tokens[size])
+            counts[size] = len(statements)
+
+            # Walk every page too: the keyset predicate must use the index as well, and the pages must add up
+            if endpoint in PAGED:
+                field, key = PAGED[endpoint]
+                seen, pages, cursor = [], 0, None
+                while True:
+                    page_url = f"{endpoint}?limit={PAGE_LIMIT}" + (f"&cursor={cursor}" if cursor else "")
+                    more, page = capture_queries(engine, client, page_url, tokens[size])
+                    statements += more
+                    seen += [key(item) for item in page[field]]
+                    pages += 1
+                    cursor = page.get('next_cursor')
+                    if not cursor:
+                        break
+                expected = [key(item) for item in body[field]]
+                if len(seen) != len(set(seen)) or seen != expected:
+                    failures += 1
+                    print(f"FAIL {endpoint}: {pages} pages of {PAGE_LIMIT} returned {len(seen)} rows "
+                          f"({len(seen) - len(set(seen))} repeated), expected {len(expected)}")
+
+            for statement, parameters in statements:
+                scans = full_scans(engine, statement, parameters)
+                if scans:
+                    failures += 1
+                    print(f"FAIL {endpoint}: full scan of {', '.join(scans)} in:\n     {' '.join(statement.split())}")
+
+        ok = len(set(counts.values())) == 1
+        failures += not ok
+        print(f"{'OK  ' if ok else 'FAIL'} {endpoint}: queries by history size {counts}")
+
+    if not failures:
+        print("OK   no full table scans")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Question bank check: a full bank must not crowd out the candidate's CV.
+Starts the fake OpenAI API (fake_openai.py), fills the question bank for one
+role/level well past QUESTION_BANK_MIN_POOL with general questions that match
+the CV, uploads that CV and verifies that
+  1. some questions came from the bank, at most QUESTION_BANK_MAX_REUSE of them, and
+  2. the model was still asked to write the rest, including its question about
+     the candidate's own CV.
+Run this: python check_question_bank.py
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+from fake_openai import QUESTIONS, start_server
+
+# Never point this at a real database: it creates its own
+_workdir = tempfile.mkdtemp()
+_fake = start_server(latency=0.01)
+os.environ.update({
+    'OPENAI_BASE_URL': f'http://127.0.0.1:{_fake.server_port}/v1',
+    'OPENAI_API_KEY': 'sk-check',
+    'DATABASE_URL': f"sqlite:///{os.path.join(_workdir, 'check_question_bank.db')}",
+    'CV_CACHE_FOLDER': os.path.join(_workdir, 'cv_text'),
+    'CV_PARSE_WORKERS': '0',
+    'LLM_CACHE_BACKEND': 'none',
+    'QUESTION_BANK': 'true',
+    'QUESTION_BANK_EMBEDDING_MODEL': 'tfidf',
+})
+
+from flask_jwt_extended import create_access_token
+
+from app import app, db
+from benchmark import make_cv
+from model import User, InterviewSession
+from question_bank import add_questions
+
+JOB_ROLE = 'Backend Developer'
+LEVEL = 'Intermediate'
+TOPICS = ['Python', 'Flask', 'PostgreSQL', 'Redis', 'Docker', 'AWS', 'payment APIs', 'async job processing']
+TEMPLATES = [
+    'How would you debug a slow {} deployment?',
+    'What are the trade-offs of {} for a backend developer?',
+    'How do you test code that depends on {}?',
+    'How would you secure {} in production?',
+]
+# The fake model's question about the candidate's own CV (it has no [GENERAL] tag)
+CV_QUESTION = next(q for q in QUESTIONS if not q.startswith('[GENERAL]'))
+
+
+def main():
+    failures = 0
+    with app.app_context():
+        db.create_all()
+        pool = [template.format(topic) for template in TEMPLATES for topic in TOPICS]
+        add_questions(pool, JOB_ROLE, LEVEL)
+        user = User(username='check', password='x', email='check@example.com')
+        db.session.add(user)
+        db.session.commit()
+        token = create_access_token(identity=str(user.id))
+        print(f"bank: {len(pool)} questions (QUESTION_BANK_MIN_POOL {app.config['QUESTION_BANK_MIN_POOL']}), "
+              f"target {app.config['QUESTION_BANK_TARGET']}, max reuse {app.config['QUESTION_BANK_MAX_REUSE']}")
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.post('/api/upload-cv', headers=headers, data={
+        'cv_file': (io.BytesIO(make_cv()), 'cv.docx'), 'company_name': 'Example', 'job_role': JOB_ROLE,
+        'interview_level': LEVEL, 'job_description': 'Python backend developer for payment APIs'
+    })
+    assert response.status_code == 202, response.get_data(as_text=True)
+    session_id = response.get_json()['session_id']
+    deadline = time.monotonic() + 30
+    while True:
+        status = client.get('/api/interview/status', headers=headers, query_string={'session_id': session_id}).get_json()
+        if status['status'] != 'generating' or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+
+    with app.app_context():
+        questions = db.session.get(InterviewSession, session_id).questions
+    reused = [q for q in questions if q in pool]
+    print(f"session: {status['status']}, {len(questions)} questions, {len(reused)} from the bank")
+
+    if status['status'] != 'active':
+        failures += 1
+        print(f"FAIL question generation ended {status['status']}: {status.get('error')}")
+    if not 0 < len(reused) <= app.config['QUESTION_BANK_MAX_REUSE']:
+        failures += 1
+        print(f"FAIL expected 1 to {app.config['QUESTION_BANK_MAX_REUSE']} bank questions, got {len(reused)}")
+    if CV_QUESTION not in questions:
+        failures += 1
+        print("FAIL the model wasn't asked for questions about the CV, every question came from the bank")
+
+    if not failures:
+        print("OK   a full bank still leaves room for questions about the CV")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
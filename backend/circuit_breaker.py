@@ -0,0 +1,192 @@
+import logging
+import threading
+import time
+from collections import deque
+
+import openai
+
+# What an outage looks like: no connection, timeouts and 5xx. 429s and 4xx mean the API is up.
+OUTAGE_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class LLMUnavailable(Exception):
+    """The circuit breaker is open: the LLM API is failing, so calls aren't even tried"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LLM API unavailable, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+def is_outage(error):
+    """True for errors that mean the LLM can't be used right now, as opposed to a bad request"""
+    return isinstance(error, (LLMUnavailable,) + OUTAGE_ERRORS)
+
+
+class CircuitBreaker:
+    """Stops calling the LLM API while it is down or too slow to be useful.
+
+    Calls are tracked over the last LLM_BREAKER_WINDOW seconds. Once there have
+    been LLM_BREAKER_MIN_CALLS, and LLM_BREAKER_FAILURE_RATE of them failed with
+    an outage error or took longer than LLM_BREAKER_SLOW_CALL seconds, the
+    breaker opens: for LLM_BREAKER_OPEN_SECONDS every call fails straight away
+    with LLMUnavailable instead of tying up a worker for a minute. After that a
+    single trial call is let through (half open); it closes the breaker if it
+    goes well and opens it again if not.
+
+    Listeners added with add_listener(fn) are called with HALF_OPEN when the
+    open period is over (a good time to send a trial call) and with CLOSED when
+    the API is back, e.g. to pick up work that was deferred in the meantime.
+    State is per process, with one breaker per LLM endpoint (see model_routing.py).
+    """
+
+    def __init__(self, app=None, name='openai'):
+        self.name = name
+        self.window = 60
+        self.min_calls = 10
+        self.failure_rate = 0.5
+        self.slow_call = 30
+        self.open_seconds = 30
+        self.state = CLOSED
+        self.trips = 0  # for /api/metrics
+        self._calls = deque()  # (finished at, bad)
+        self._opened_until = 0.0
+        self._trial = False
+        self._listeners = []
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.window = app.config.get('LLM_BREAKER_WINDOW', 60)
+        self.min_calls = app.config.get('LLM_BREAKER_MIN_CALLS', 10)
+        self.failure_rate = app.config.get('LLM_BREAKER_FAILURE_RATE', 0.5)
+        self.slow_call = app.config.get('LLM_BREAKER_SLOW_CALL', 30)
+        self.open_seconds = app.config.get('LLM_BREAKER_OPEN_SECONDS', 30)
+
+    def add_listener(self, fn):
+        self._listeners.append(fn)
+
+    @property
+    def is_open(self):
+        """True while calls would be turned away without trying, i.e. open and not yet due a trial"""
+        return self.state == OPEN and time.monotonic() < self._opened_until
+
+    def retry_after(self):
+        return max(1, int(self._opened_until - time.monotonic() + 0.999))
+
+    def check(self):
+        """Raise LLMUnavailable if the breaker is open, before queueing a call that would only be refused"""
+        if self.is_open:
+            raise LLMUnavailable(self.retry_after())
+
+    def _before(self):
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() < self._opened_until:
+                    raise LLMUnavailable(self.retry_after())
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                if self._trial:
+                    # Someone else's trial call is deciding; don't pile on
+                    raise LLMUnavailable(1)
+                self._trial = True
+
+    def _after(self, started, error=None):
+        now = time.monotonic()
+        bad = (error is not None and is_outage(error)) or now - started > self.slow_call
+        event = None
+        with self._lock:
+            if self.state == HALF_OPEN and self._trial:
+                self._trial = False
+                if bad:
+                    self._trip(now)
+                else:
+                    self.state = CLOSED
+                    self._calls.clear()
+                    event = CLOSED
+                    logging.warning(f"LLM API recovered ({self.name}), circuit breaker closed")
+            elif self.state == CLOSED:
+                self._calls.append((now, bad))
+                while self._calls and self._calls[0][0] < now - self.window:
+                    self._calls.popleft()
+                failures = sum(1 for _, failed in self._calls if failed)
+                if len(self._calls) >= self.min_calls and failures >= self.failure_rate * len(self._calls):
+                    self._trip(now)
+        if event:
+            self._notify(event)
+
+    def _abandon(self):
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial = False
+
+    def _trip(self, now):
+        """Open the breaker. Call with _lock held."""
+        self.state = OPEN
+        self.trips += 1
+        self._opened_until = now + self.open_seconds
+        logging.error(f"LLM API failing ({self.name}), circuit breaker open for {self.open_seconds}s")
+        timer = threading.Timer(self.open_seconds, self._open_elapsed, args=(self._opened_until,))
+        timer.daemon = True
+        timer.start()
+
+    def _open_elapsed(self, opened_until):
+        with self._lock:
+            # Skip timers of earlier trips
+            due = self.state == OPEN and self._opened_until == opened_until
+        if due:
+            self._notify(HALF_OPEN)
+
+    def _notify(self, state):
+        for fn in self._listeners:
+            try:
+                fn(state)
+            except Exception as e:
+                logging.error(f"Circuit breaker listener failed: {type(e).__name__}: {e}")
+
+    def call(self, fn):
+        """fn(), unless the breaker is open; its outcome and latency count towards tripping"""
+        self._before()
+        started = time.monotonic()
+        try:
+            result = fn()
+        except Exception as e:
+            self._after(started, e)
+            raise
+        except BaseException:
+            # Cancelled: says nothing about the API, but a trial call has to make way for another
+            self._abandon()
+            raise
+        self._after(started)
+        return result
+
+    async def acall(self, fn):
+        """Async version of call; fn() returns an awaitable"""
+        self._before()
+        started = time.monotonic()
+        try:
+            result = await fn()
+        except Exception as e:
+            self._after(started, e)
+            raise
+        except BaseException:
+            # Cancelled: says nothing about the API, but a trial call has to make way for another
+            self._abandon()
+            raise
+        self._after(started)
+        return result
+
+
+def prometheus_metrics(breakers):
+    """State of each endpoint's circuit breaker, in the Prometheus text format"""
+    lines = ['# HELP interviewnav_llm_circuit_open 1 while the LLM circuit breaker is open or half open, for this process.',
+             '# TYPE interviewnav_llm_circuit_open gauge']
+    lines += [f'interviewnav_llm_circuit_open{{endpoint="{breaker.name}"}} {int(breaker.state != CLOSED)}' for breaker in breakers]
+    lines += ['# HELP interviewnav_llm_circuit_trips_total Times the LLM circuit breaker opened.',
+              '# TYPE interviewnav_llm_circuit_trips_total counter']
+    lines += [f'interviewnav_llm_circuit_trips_total{{endpoint="{breaker.name}"}} {breaker.trips}' for breaker in breakers]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,112 @@
+import logging
+import re
+
+# Optional: exact counts with OpenAI's tokenizer. Without it tokens are estimated at ~4 characters each.
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+TOKENIZER_MODEL = 'gpt-4o-mini'
+
+# Section headings found in CVs and job descriptions, and how much we want to keep them
+# when the text is over budget (1 = keep first). Text before the first heading (name,
+# contact details, intro) gets PREAMBLE_PRIORITY.
+SECTION_PRIORITIES = [
+    (1, r'(technical |core |key )?skills|technologies|tech stack|competencies|expertise'),
+    (1, r'(work |professional |relevant )?experience|employment( history)?|work history|career history'),
+    (1, r'requirements|qualifications|what you.ll need|what we.re looking for|must have|nice to have'),
+    (1, r'responsibilities|what you.ll do|the role|role description|key duties'),
+    (2, r'(professional )?summary|profile|objective|about me|projects|personal projects'),
+    (3, r'education|certifications?|courses|training|awards|achievements|publications|languages'),
+    (4, r'about (us|the company)|who we are|our mission|company overview'),
+    (5, r'interests|hobbies|references|personal (details|information)|benefits|perks|what we offer|'
+        r'equal opportunit(y|ies)|how to apply'),
+]
+PREAMBLE_PRIORITY = 3
+
+# A heading is the keyword on its own line, optionally "& something" ("Skills & Tools")
+_HEADINGS = [(priority, re.compile(rf'^\W*({pattern})(\s*(&|and|/|,)\s*[\w ]{{1,25}})?\W*$', re.IGNORECASE))
+             for priority, pattern in SECTION_PRIORITIES]
+# Page furniture repeated by PDF extraction
+_NOISE = re.compile(r'^(page \d+( of \d+)?|\d+|curriculum vitae|resume|cv)$', re.IGNORECASE)
+
+_encoding = None
+
+def _get_encoding():
+    global _encoding, tiktoken
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.encoding_for_model(TOKENIZER_MODEL)
+        except Exception as e:
+            # e.g. no network to fetch the encoding file the first time
+            logging.error(f"tiktoken unavailable, estimating token counts: {e}")
+            tiktoken = None
+    return _encoding
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+def truncate_to_tokens(text, budget):
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:budget])
+    text = text[:budget * 4]
+    # Don't end on half a word
+    return text.rsplit(' ', 1)[0] if ' ' in text else text
+
+def normalize(text):
+    """Collapse whitespace inside lines, drop empty lines, page furniture and repeated lines"""
+    seen = set()
+    lines = []
+    for line in text.splitlines():
+        line = re.sub(r'\s+', ' ', line).strip()
+        key = line.lower()
+        if not line or _NOISE.match(line) or key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+def split_sections(lines):
+    """[(priority, [lines])] in document order, split at recognised headings"""
+    sections = [(PREAMBLE_PRIORITY, [])]
+    for line in lines:
+        priority = next((p for p, heading in _HEADINGS if len(line) <= 60 and heading.match(line)), None)
+        if priority is None:
+            sections[-1][1].append(line)
+        else:
+            sections.append((priority, [line]))
+    return [(priority, section) for priority, section in sections if section]
+
+def compact_text(text, budget):
+    """Normalize text and fit it into budget tokens, keeping the most useful sections.
+
+    Returns (compacted_text, {"original_tokens": ..., "compacted_tokens": ...}).
+    """
+    if not text:
+        return text, {"original_tokens": 0, "compacted_tokens": 0}
+
+    original_tokens = count_tokens(text)
+    sections = split_sections(normalize(text))
+
+    # Fill the budget in priority order, then put what we kept back in document order
+    kept = {}
+    remaining = budget
+    for index in sorted(range(len(sections)), key=lambda i: sections[i][0]):
+        section = "\n".join(sections[index][1])
+        tokens = count_tokens(section) + 1  # + the newline joining it to the next one
+        if tokens <= remaining:
+            kept[index] = section
+            remaining -= tokens
+        elif remaining > 20:
+            section = truncate_to_tokens(section, remaining - 1)
+            # Drop the cut-off last line unless it's all we have
+            kept[index] = section.rsplit('\n', 1)[0] if '\n' in section else section
+            remaining = 0
+    compacted = "\n".join(kept[index] for index in sorted(kept))
+
+    return compacted, {"original_tokens": original_tokens, "compacted_tokens": count_tokens(compacted)}
@@ -15,9 +15,85 @@ class Config:
         "pool_pre_ping": True,
         "pool_recycle": 300,
     }
-    UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
+    # Uploaded CVs up to this size are parsed from memory; bigger ones go through a temporary file
+    UPLOAD_SPOOL_MAX_BYTES = int(os.getenv('UPLOAD_SPOOL_MAX_BYTES', str(2 * 1024 * 1024)))
+    # Extracted CV text keyed by file hash, so repeat uploads skip parsing (see cache.py)
+    CV_CACHE_FOLDER = os.getenv('CV_CACHE_FOLDER', os.path.join(os.getcwd(), 'cache', 'cv_text'))
+    CV_CACHE_MAX_BYTES = int(os.getenv('CV_CACHE_MAX_BYTES', str(50 * 1024 * 1024)))
+    # OpenAI response cache: 'memory' (per process), 'sqlite' (shared file) or 'none'
+    LLM_CACHE_BACKEND = os.getenv('LLM_CACHE_BACKEND', 'memory')
+    LLM_CACHE_PATH = os.getenv('LLM_CACHE_PATH', os.path.join(os.getcwd(), 'cache', 'llm_responses.sqlite3'))
+    LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(24 * 60 * 60)))  # seconds
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '1000'))
     ALLOWED_EXTENSIONS = {'pdf', 'docx'}
+    # CV parsing runs on a process pool (see cv_parser.py); 0 workers parses in the request thread
+    CV_PARSE_WORKERS = int(os.getenv('CV_PARSE_WORKERS', '2'))
+    CV_PARSE_TIMEOUT = float(os.getenv('CV_PARSE_TIMEOUT', '10'))  # seconds per document
+    CV_PARSE_MAX_PAGES = int(os.getenv('CV_PARSE_MAX_PAGES', '20'))
+    # Token budgets for the CV text and job description pasted into prompts (see compaction.py)
+    CV_TOKEN_BUDGET = int(os.getenv('CV_TOKEN_BUDGET', '1500'))
+    JD_TOKEN_BUDGET = int(os.getenv('JD_TOKEN_BUDGET', '600'))
     JWT_ACCESS_TOKEN_EXPIRES = False  # Tokens don't expire (or set to timedelta(hours=24))
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '').strip()
+    # Point the OpenAI clients somewhere else, e.g. the local fake server used for load tests
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:5173,http://localhost:3000').split(',')
+    # Background workers per process for question generation (see jobs.py)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '4'))
+    # Question bank (see question_bank.py): generated questions are reused for later CVs with the same
+    # role and level, and the model only writes the rest of the QUESTION_BANK_TARGET questions
+    QUESTION_BANK = os.getenv('QUESTION_BANK', 'true').lower() in ('1', 'true', 'yes')
+    QUESTION_BANK_TARGET = int(os.getenv('QUESTION_BANK_TARGET', '8'))  # questions per session
+    # Bank questions are general, so at most QUESTION_BANK_TARGET - 1 are reused: the model always writes some about the CV
+    QUESTION_BANK_MAX_REUSE = int(os.getenv('QUESTION_BANK_MAX_REUSE', str(QUESTION_BANK_TARGET // 2)))
+    QUESTION_BANK_MIN_POOL = int(os.getenv('QUESTION_BANK_MIN_POOL', '20'))  # bank questions needed before any reuse
+    QUESTION_BANK_MIN_SCORE = float(os.getenv('QUESTION_BANK_MIN_SCORE', '0.05'))  # similarity to the CV/JD
+    QUESTION_BANK_DUPLICATE = float(os.getenv('QUESTION_BANK_DUPLICATE', '0.9'))  # similarity at which questions are the same
+    QUESTION_BANK_REFRESH = int(os.getenv('QUESTION_BANK_REFRESH', '300'))  # seconds before reloading from the database
+    # 'tfidf', or a sentence-transformers model name (needs the optional sentence-transformers package)
+    QUESTION_BANK_EMBEDDING_MODEL = os.getenv('QUESTION_BANK_EMBEDDING_MODEL', 'all-MiniLM-L6-v2')
+    # /api/upload-cv/batch: targets per request, and how many of them generate questions at once
+    BATCH_MAX_TARGETS = int(os.getenv('BATCH_MAX_TARGETS', '10'))
+    BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', '4'))
+    # Run question generation and report jobs as coroutines with AsyncOpenAI instead of on the
+    # worker threads, so one process can wait on hundreds of generations at once
+    ASYNC_LLM = os.getenv('ASYNC_LLM', 'false').lower() in ('1', 'true', 'yes')
+    ASYNC_JOB_CONCURRENCY = int(os.getenv('ASYNC_JOB_CONCURRENCY', '200'))  # max in-flight async jobs per process
+    # Outbound LLM call limits, per process (see llm_limiter.py); divide the account's limits by the
+    # number of worker processes. 0 turns a limit off.
+    LLM_RPM_LIMIT = int(os.getenv('LLM_RPM_LIMIT', '500'))  # requests per minute
+    LLM_TPM_LIMIT = int(os.getenv('LLM_TPM_LIMIT', '200000'))  # prompt + max_tokens per minute
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '32'))  # calls in flight
+    LLM_MAX_QUEUE = int(os.getenv('LLM_MAX_QUEUE', '200'))  # waiting calls before uploads get a 429
+    LLM_QUEUE_TIMEOUT = float(os.getenv('LLM_QUEUE_TIMEOUT', '30'))  # seconds a call may wait for its turn
+    LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))  # on 429s, 5xx and connection errors
+    # Model, max_tokens, timeout and endpoint per task, interview level and prompt size, and extra
+    # OpenAI-compatible endpoints (e.g. a local vLLM or Ollama server). JSON or a JSON file path;
+    # see model_routing.py. Unset: everything goes to gpt-4o-mini on OPENAI_BASE_URL.
+    LLM_ROUTES = os.getenv('LLM_ROUTES') or None
+    LLM_ENDPOINTS = os.getenv('LLM_ENDPOINTS') or None
+    # LLM circuit breaker (see circuit_breaker.py): open for LLM_BREAKER_OPEN_SECONDS when at least
+    # LLM_BREAKER_FAILURE_RATE of the calls in the last LLM_BREAKER_WINDOW seconds failed or were slow
+    LLM_BREAKER_WINDOW = float(os.getenv('LLM_BREAKER_WINDOW', '60'))
+    LLM_BREAKER_MIN_CALLS = int(os.getenv('LLM_BREAKER_MIN_CALLS', '10'))  # calls in the window before it can trip
+    LLM_BREAKER_FAILURE_RATE = float(os.getenv('LLM_BREAKER_FAILURE_RATE', '0.5'))
+    LLM_BREAKER_SLOW_CALL = float(os.getenv('LLM_BREAKER_SLOW_CALL', '30'))  # seconds; slower calls count as failures
+    LLM_BREAKER_OPEN_SECONDS = float(os.getenv('LLM_BREAKER_OPEN_SECONDS', '30'))
+    # With the LLM down, interviews use bank questions (however small the bank) if there are at least this many
+    QUESTION_BANK_FALLBACK_MIN = int(os.getenv('QUESTION_BANK_FALLBACK_MIN', '3'))
+    # Seconds between sweeps for deferred reports, which catch the ones a breaker in another (or a restarted)
+    # process deferred; 0 = only resume them when this process's breaker closes
+    DEFERRED_REPORT_SWEEP = float(os.getenv('DEFERRED_REPORT_SWEEP', '60'))
+    # Opt-in profiling: requests slower than this many seconds get their sampled stacks written to
+    # PROFILE_FOLDER (see timing.py). 0 turns the profiler off.
+    PROFILE_SLOW_REQUESTS = float(os.getenv('PROFILE_SLOW_REQUESTS', '0'))
+    PROFILE_SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.005'))  # seconds between stack samples
+    PROFILE_FOLDER = os.getenv('PROFILE_FOLDER', os.path.join(os.getcwd(), 'profiles'))
+    PROFILE_MAX_FILES = int(os.getenv('PROFILE_MAX_FILES', '100'))
+    # /api/metrics requires "Authorization: Bearer <METRICS_TOKEN>" (for the Prometheus scraper); unset = no metrics endpoint
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN') or None
+    # Days of per-call LLM records to keep (the metrics totals are kept separately); 0 = keep them all
+    LLM_CALL_RETENTION_DAYS = int(os.getenv('LLM_CALL_RETENTION_DAYS', '90'))
+    # Grade each answer in the background as it is submitted (clients can override per request)
+    INCREMENTAL_GRADING = os.getenv('INCREMENTAL_GRADING', 'false').lower() in ('1', 'true', 'yes')
 
@@ -0,0 +1,152 @@
+import io
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+import PyPDF2
+from docx import Document
+
+
+class CVParseTimeout(Exception):
+    """A CV took longer than CV_PARSE_TIMEOUT seconds to parse"""
+
+
+def extract_text(source, ext, max_pages=None):
+    """Extract the text of a PDF or DOCX CV from its bytes or a file path. Runs in the parser pool."""
+    text = ""
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    try:
+        if ext == 'pdf':
+            reader = PyPDF2.PdfReader(source)
+            for page in reader.pages[:max_pages]:
+                text += page.extract_text() + "\n"
+        elif ext == 'docx':
+            doc = Document(source)
+            for para in doc.paragraphs:
+                text += para.text + "\n"
+    except Exception as e:
+        logging.error(f"Error extracting text from CV: {e}")
+    return text
+
+
+# How often a parse still waiting for a free worker checks whether it has started
+QUEUE_POLL = 0.1
+
+_started = None  # in a pool worker: the queue parse start times are reported on
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+
+
+def _parse_task(task_id, source, ext, max_pages):
+    """Pool task: report when parsing starts, so the timeout doesn't count time queued behind other CVs"""
+    _started.put((task_id, time.monotonic()))
+    return extract_text(source, ext, max_pages)
+
+
+class CVParser:
+    """Parses CVs on a small process pool, so PyPDF2 doesn't hold the GIL of the request worker.
+
+    Each document gets CV_PARSE_TIMEOUT seconds from when a worker picks it up
+    (time spent queued behind other CVs doesn't count) and at most
+    CV_PARSE_MAX_PAGES pages. A document that times out can't be interrupted,
+    so the pool is killed (failing anything else it was parsing) and a fresh
+    one is started; CVs still queued on the old pool move to the new one.
+    CV_PARSE_WORKERS=0 parses on the calling thread instead (local development).
+    """
+
+    def __init__(self, app=None):
+        self.workers = 0
+        self.timeout = None
+        self.max_pages = None
+        self._pool = None
+        self._pool_pid = None
+        self._started = None
+        self._task_ids = itertools.count()
+        self._waiting = set()
+        self._start_times = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.workers = app.config.get('CV_PARSE_WORKERS', 2)
+        self.timeout = app.config.get('CV_PARSE_TIMEOUT', 10)
+        self.max_pages = app.config.get('CV_PARSE_MAX_PAGES', 20)
+
+    def parse(self, source, ext):
+        """Text of the CV in source (bytes or a file path); raises CVParseTimeout"""
+        if not self.workers:
+            return extract_text(source, ext, self.max_pages)
+
+        task_id = next(self._task_ids)
+        with self._lock:
+            self._waiting.add(task_id)
+        try:
+            return self._wait(task_id, source, ext)
+        finally:
+            with self._lock:
+                self._waiting.discard(task_id)
+                self._start_times.pop(task_id, None)
+
+    def _wait(self, task_id, source, ext):
+        pool, started = self._get_pool()
+        result = pool.apply_async(_parse_task, (task_id, source, ext, self.max_pages))
+        deadline = None
+        while True:
+            try:
+                return result.get(QUEUE_POLL if deadline is None else max(0, deadline - time.monotonic()))
+            except multiprocessing.TimeoutError:
+                pass
+            if deadline is None:
+                started_at = self._started_at(task_id, started)
+                if started_at is not None:
+                    deadline = started_at + self.timeout
+                elif self._pool is not pool:
+                    # Still queued on a pool that was killed for another CV's timeout, so it never ran
+                    pool, started = self._get_pool()
+                    result = pool.apply_async(_parse_task, (task_id, source, ext, self.max_pages))
+            elif time.monotonic() >= deadline:
+                logging.error(f"CV parsing timed out after {self.timeout}s")
+                self._terminate(pool)
+                raise CVParseTimeout(f"CV parsing took longer than {self.timeout}s")
+
+    def _started_at(self, task_id, started):
+        """When a worker started parsing task_id, or None while it is still queued"""
+        with self._lock:
+            while True:
+                try:
+                    started_id, started_at = started.get_nowait()
+                except queue.Empty:
+                    break
+                # Parses that already returned don't need theirs
+                if started_id in self._waiting:
+                    self._start_times[started_id] = started_at
+            return self._start_times.get(task_id)
+
+    def _get_pool(self):
+        with self._lock:
+            # Started on first use, and again in each forked server worker (pools don't survive fork)
+            if self._pool is None or self._pool_pid != os.getpid():
+                # spawn, not fork: the app has threads running by now
+                context = multiprocessing.get_context('spawn')
+                self._started = context.Queue()
+                self._pool = context.Pool(self.workers, initializer=_init_worker, initargs=(self._started,))
+                self._pool_pid = os.getpid()
+            return self._pool, self._started
+
+    def _terminate(self, pool):
+        with self._lock:
+            # Parses that were in flight on a pool that was already killed time out too; they mustn't
+            # take down its replacement, which healthy requests are using by now
+            if self._pool is pool:
+                logging.error("Restarting the CV parser pool")
+                self._pool.terminate()
+                self._pool = None
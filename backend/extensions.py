@@ -1,7 +1,22 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
+from jobs import JobQueue
+from cache import CVTextCache, ResponseCache
+from cv_parser import CVParser
+from timing import RequestTimer
+from llm_limiter import LLMLimiter
+from circuit_breaker import CircuitBreaker
+from model_routing import ModelRouter
 
-# Initialize database and JWT manager
+# Initialize database, JWT manager, background job queue, caches, CV parser pool, request timing,
+# and the LLM call limiter, circuit breaker and model router
 db = SQLAlchemy()
 jwt = JWTManager()
-
+job_queue = JobQueue()
+cv_text_cache = CVTextCache()
+llm_cache = ResponseCache()
+cv_parser = CVParser()
+request_timer = RequestTimer()
+llm_limiter = LLMLimiter()
+llm_breaker = CircuitBreaker()
+model_router = ModelRouter()
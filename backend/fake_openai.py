@@ -0,0 +1,203 @@
+"""
+Local stand-in for the OpenAI chat completions API, for load tests and benchmarks.
+Answers every request with canned content shaped like what the app asks for
+(numbered questions, feedback JSON or JSON Lines, grades), so the whole
+interview flow works against it without spending tokens.
+
+Timing: each response waits --latency seconds (time to first token), then
+generates the completion at --token-rate tokens per second (0 = instantly).
+"stream": true requests get Server-Sent Event chunks paced the same way, plus
+a usage chunk when stream_options.include_usage is set.
+
+Failure injection, each a fraction of requests (0 to 1):
+  --error-rate       500 server_error
+  --rate-limit-rate  429 rate_limit_exceeded with a Retry-After header
+  --timeout-rate     no answer for --hang seconds (longer than the app's 60s timeout)
+
+Run this: python fake_openai.py --port 8001 --latency 1.0 --token-rate 80 --error-rate 0.02
+Then start the app with OPENAI_BASE_URL=http://127.0.0.1:8001/v1
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+QUESTIONS = [
+    "[GENERAL] Tell me about a time you had to debug a difficult production issue.",
+    "[GENERAL] How would you design a rate limiter for a public API?",
+    "[GENERAL] Explain the difference between a process and a thread.",
+    "[GENERAL] Why do you want to work at this company?",
+    "Describe your role in the most complex project on your CV.",
+    "[GENERAL] What is database indexing and when does it not help?",
+]
+
+OVERALL_FEEDBACK = "### Communication Skills\n**1. Clarity:** Clear answers.\n   **Improvement**: Be more concise."
+OVERALL_SECTIONS = ['Communication Skills', 'Confidence', 'Areas for Improvement', 'General Advice for Success']
+FEEDBACK = "Reasonable, but add a concrete example."
+
+def completion_content(body):
+    prompt = body['messages'][-1]['content']
+    answers = prompt.count("Candidate's Answer:")
+    if prompt.startswith("Grade the candidate's answer"):
+        return json.dumps({"status": "Partial", "score": 0.5, "feedback": FEEDBACK})
+    if 'already been graded individually' in prompt:
+        return json.dumps({"overall_feedback": OVERALL_FEEDBACK})
+    if 'as JSON Lines' in prompt:
+        lines = [json.dumps({"type": "question_analysis", "question": f"Question {i}", "candidate_answer": "Answer",
+                             "status": "Partial", "score": 0.5, "feedback": FEEDBACK}) for i in range(1, answers + 1)]
+        lines += [json.dumps({"type": "overall_section", "title": title,
+                              "content": "**1. Clarity:** Clear answers.\n   **Improvement**: Be more concise."})
+                  for title in OVERALL_SECTIONS]
+        return "\n".join(lines)
+    if body.get('response_format'):
+        questions_analysis = [
+            {"question": f"Question {i}", "candidate_answer": "Answer", "status": "Partial", "score": 0.5, "feedback": FEEDBACK}
+            for i in range(1, answers + 1)
+        ]
+        return json.dumps({"overall_feedback": OVERALL_FEEDBACK, "questions_analysis": questions_analysis})
+    return "\n".join(f"{i}. {q}" for i, q in enumerate(QUESTIONS, 1))
+
+def count_tokens(text):
+    return max(1, len(text) // 4)
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    latency = 1.0
+    token_rate = 0.0  # completion tokens per second, 0 = no generation time
+    error_rate = 0.0
+    rate_limit_rate = 0.0
+    timeout_rate = 0.0
+    hang = 120.0
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if not self.path.endswith('/chat/completions'):
+            self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        roll = random.random()
+        if roll < self.timeout_rate:
+            time.sleep(self.hang)
+            self.send_json(504, {"error": {"message": "Injected timeout", "type": "timeout"}})
+            return
+        roll -= self.timeout_rate
+        if roll < self.error_rate:
+            time.sleep(self.latency)
+            self.send_json(500, {"error": {"message": "Injected server error", "type": "server_error"}})
+            return
+        roll -= self.error_rate
+        if roll < self.rate_limit_rate:
+            self.send_json(429, {"error": {"message": "Injected rate limit", "type": "rate_limit_exceeded"}},
+                           headers={'Retry-After': '1'})
+            return
+
+        time.sleep(self.latency)
+        content = completion_content(body)
+        usage = {"prompt_tokens": count_tokens(json.dumps(body['messages'])), "completion_tokens": count_tokens(content)}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        if body.get('stream'):
+            self.send_stream(body, content, usage)
+            return
+
+        if self.token_rate:
+            time.sleep(usage["completion_tokens"] / self.token_rate)
+        self.send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get('model', 'gpt-4o-mini'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage
+        })
+
+    def send_json(self, status, data, headers=None):
+        payload = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_stream(self, body, content, usage):
+        """Stream content as chat.completion.chunk events, about 4 tokens per chunk"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+        def chunk(choices, **extra):
+            return {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": body.get('model', 'gpt-4o-mini'), "choices": choices, **extra}
+
+        step = 16  # characters, ~4 tokens
+        for start in range(0, len(content), step):
+            if self.token_rate:
+                time.sleep(count_tokens(content[start:start + step]) / self.token_rate)
+            self.write_event(chunk([{"index": 0, "delta": {"content": content[start:start + step]}, "finish_reason": None}]))
+        self.write_event(chunk([{"index": 0, "delta": {}, "finish_reason": "stop"}]))
+        if (body.get('stream_options') or {}).get('include_usage'):
+            self.write_event(chunk([], usage=usage))
+        self.write_chunk(b"data: [DONE]\n\n")
+        self.write_chunk(b"")
+
+    def write_event(self, data):
+        self.write_chunk(f"data: {json.dumps(data)}\n\n".encode('utf-8'))
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode('ascii') + data + b"\r\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # Don't refuse connections when hundreds arrive at once
+
+    def handle_error(self, request, client_address):
+        # Clients drop keep-alive connections after errors and timeouts; that's not worth a traceback
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+def start_server(port=0, latency=1.0, token_rate=0.0, error_rate=0.0, rate_limit_rate=0.0, timeout_rate=0.0, hang=120.0):
+    """Start the fake server on a background thread. Returns the server; its port is server.server_port"""
+    handler = type('Handler', (FakeOpenAIHandler,), {
+        'latency': latency, 'token_rate': token_rate, 'error_rate': error_rate,
+        'rate_limit_rate': rate_limit_rate, 'timeout_rate': timeout_rate, 'hang': hang
+    })
+    server = FakeOpenAIServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def add_arguments(parser):
+    """The fake server options, shared with benchmark.py"""
+    parser.add_argument('--latency', type=float, default=1.0, help="seconds before the first token")
+    parser.add_argument('--token-rate', type=float, default=0.0, help="completion tokens per second (0 = instant)")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with a 500")
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help="fraction of requests answered with a 429")
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help="fraction of requests that hang for --hang seconds")
+    parser.add_argument('--hang', type=float, default=120.0, help="seconds a timed out request hangs")
+
+def server_options(args):
+    return {'latency': args.latency, 'token_rate': args.token_rate, 'error_rate': args.error_rate,
+            'rate_limit_rate': args.rate_limit_rate, 'timeout_rate': args.timeout_rate, 'hang': args.hang}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8001)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(args.port, **server_options(args))
+    print(f"Fake OpenAI API on http://127.0.0.1:{server.server_port}/v1 ({args.latency}s latency)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobQueue:
+    """In-process background job queue.
+
+    Jobs run on a bounded thread pool inside the Flask app context. Job state is
+    written to the database rows the jobs operate on (e.g. InterviewSession.status),
+    so any worker process can answer a status poll. Swap for RQ/Celery if we ever
+    need jobs to survive a process restart.
+
+    Coroutine jobs (submit_async) run on a single event loop thread instead, at
+    most ASYNC_JOB_CONCURRENCY at a time. Their database work is synchronous and
+    short; only the network waits are awaited.
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self.executor = None
+        self.loop = None
+        self._loop_lock = threading.Lock()
+        self._semaphore = None
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config.get('JOB_WORKERS', 4),
+            thread_name_prefix='job'
+        )
+
+    @property
+    def pending(self):
+        """Jobs submitted and not finished yet, queued or running"""
+        return self._pending
+
+    def _track(self, delta):
+        with self._pending_lock:
+            self._pending += delta
+
+    def submit(self, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) to run in the background. Returns a Future."""
+        self._track(1)
+        return self.executor.submit(self._run, fn, *args, **kwargs)
+
+    def _run(self, fn, *args, **kwargs):
+        # Imported here to avoid a circular import with extensions.py
+        from extensions import db
+
+        with self.app.app_context():
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                logging.error(f"Background job {fn.__name__} failed: {type(e).__name__}: {e}")
+                db.session.rollback()
+                raise
+            finally:
+                self._track(-1)
+
+    def submit_every(self, seconds, fn, *args, **kwargs):
+        """Queue fn(*args, **kwargs) every `seconds` seconds, the first time `seconds` from now"""
+        def run():
+            self.submit(fn, *args, **kwargs)
+            self.submit_every(seconds, fn, *args, **kwargs)
+        timer = threading.Timer(seconds, run)
+        timer.daemon = True
+        timer.start()
+
+    def submit_async(self, fn, *args, **kwargs):
+        """Queue the coroutine fn(*args, **kwargs) on the event loop. Returns a concurrent Future."""
+        self._track(1)
+        return asyncio.run_coroutine_threadsafe(self._run_async(fn, *args, **kwargs), self._get_loop())
+
+    def _get_loop(self):
+        # Started on first use so processes that never run async jobs don't get the thread
+        with self._loop_lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self._semaphore = asyncio.Semaphore(self.app.config.get('ASYNC_JOB_CONCURRENCY', 200))
+                threading.Thread(target=self.loop.run_forever, name='job-loop', daemon=True).start()
+        return self.loop
+
+    async def _run_async(self, fn, *args, **kwargs):
+        from extensions import db
+
+        async with self._semaphore:
+            # Each task gets its own app context, and with it its own database session
+            with self.app.app_context():
+                try:
+                    return await fn(*args, **kwargs)
+                except Exception as e:
+                    logging.error(f"Background job {fn.__name__} failed: {type(e).__name__}: {e}")
+                    db.session.rollback()
+                    raise
+                finally:
+                    self._track(-1)
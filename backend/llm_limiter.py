@@ -0,0 +1,340 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import openai
+
+# Lower runs first: answers and reports of interviews in progress, then question generation for new uploads
+PRIORITY_INTERVIEW = 0
+PRIORITY_NEW = 1
+
+# Worth retrying, but through the limiter rather than the SDK's own retry loop
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.InternalServerError)
+
+
+class LLMBusy(Exception):
+    """Too many LLM calls queued already; try again after retry_after seconds"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"LLM call queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, priority, tokens, wake):
+        self.priority = priority
+        self.tokens = tokens
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+class LLMLimiter:
+    """Shared limit on outbound LLM calls: requests/min and tokens/min token buckets plus a cap on calls in flight.
+
+    Callers that can't go yet wait in a priority queue (in-progress interviews
+    before new uploads, then first come first served). When LLM_MAX_QUEUE
+    calls are already waiting, or one has waited LLM_QUEUE_TIMEOUT seconds,
+    LLMBusy is raised with a Retry-After estimate so routes can fail fast.
+
+    The buckets back off when the API answers 429 anyway: the refill rate is
+    halved and paused for the Retry-After the API sent, then creeps back up
+    with each successful call. 429s and transient errors are retried here,
+    LLM_MAX_RETRIES times, going back through the queue each time; the clients'
+    own max_retries is 0 so a rate-limited burst isn't multiplied. A limit of 0
+    turns that limit off.
+
+    Buckets are per process; with several worker processes, divide the
+    account's limits between them. Each LLM endpoint gets its own limiter
+    (see model_routing.py); name is the endpoint's.
+    """
+
+    def __init__(self, app=None, name='openai', **limits):
+        self.name = name
+        self.rpm = 0
+        self.tpm = 0
+        self.max_concurrency = 0
+        self.max_queue = 0
+        self.queue_timeout = 0
+        self.max_retries = 0
+        self._lock = threading.Lock()
+        self._waiting = []  # heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+        self._timer = None
+        self.rejected = 0  # LLMBusy raised, for /api/metrics
+        self.rate_limits = 0  # 429s from the API
+        if app is not None:
+            self.init_app(app, **limits)
+
+    def init_app(self, app, rpm=None, tpm=None, max_concurrency=None):
+        """The limits default to the LLM_* settings; pass them for endpoints with other limits"""
+        self.rpm = app.config.get('LLM_RPM_LIMIT', 500) if rpm is None else rpm
+        self.tpm = app.config.get('LLM_TPM_LIMIT', 200000) if tpm is None else tpm
+        self.max_concurrency = app.config.get('LLM_MAX_CONCURRENCY', 32) if max_concurrency is None else max_concurrency
+        self.max_queue = app.config.get('LLM_MAX_QUEUE', 200)
+        self.queue_timeout = app.config.get('LLM_QUEUE_TIMEOUT', 30)
+        self.max_retries = app.config.get('LLM_MAX_RETRIES', 3)
+        self._requests = float(self.rpm)
+        self._tokens = float(self.tpm)
+        self._in_flight = 0
+        self._rate = 1.0            # fraction of rpm/tpm we currently refill at
+        self._paused_until = 0.0
+        self._refilled_at = time.monotonic()
+
+    # Bookkeeping, all with _lock held
+
+    def _refill(self, now):
+        elapsed = max(0.0, now - max(self._refilled_at, self._paused_until))
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm * self._rate / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm * self._rate / 60)
+        self._refilled_at = now
+
+    def _wait_time(self, tokens, now):
+        """Seconds until the buckets hold a request and tokens (ignoring the in-flight cap). A 0 limit is no limit."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        wait = 0.0
+        if self.rpm:
+            wait = max(0.0, 1 - self._requests) / (self.rpm * self._rate / 60)
+        if self.tpm:
+            wait = max(wait, max(0.0, tokens - self._tokens) / (self.tpm * self._rate / 60))
+        return wait
+
+    def _grant(self):
+        """Let waiters go, in priority order, for as long as the head of the queue fits"""
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiting:
+            _, _, waiter = self._waiting[0]
+            if waiter.cancelled:
+                heapq.heappop(self._waiting)
+                continue
+            if self.max_concurrency and self._in_flight >= self.max_concurrency:
+                return  # A release will call us again
+            delay = self._wait_time(waiter.tokens, now)
+            if delay > 0:
+                self._schedule(delay)
+                return
+            heapq.heappop(self._waiting)
+            self._take(waiter.tokens)
+            waiter.granted = True
+            waiter.wake()
+
+    def _take(self, tokens):
+        self._requests -= 1
+        self._tokens -= tokens
+        self._in_flight += 1
+
+    def _schedule(self, delay):
+        if self._timer is None:
+            self._timer = threading.Timer(delay, self._on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._grant()
+
+    def _retry_after(self, backlog=0):
+        """Rough wait for a new caller: the queue ahead of it drained at the current request rate"""
+        rate = (self.rpm or 60) * self._rate / 60
+        pause = max(0.0, self._paused_until - time.monotonic())
+        return max(1, int(pause + (len(self._waiting) + backlog) / rate + 0.999))
+
+    def _enqueue(self, priority, tokens, wake):
+        """Take a slot straight away if nobody is waiting and it fits, else queue. Returns the waiter."""
+        # A call bigger than the whole minute's budget would never fit; let it through on a full bucket
+        tokens = min(tokens, self.tpm) if self.tpm else 0
+        waiter = _Waiter(priority, tokens, wake)
+        # Only new work is turned away; calls for interviews under way always get in line
+        if priority > PRIORITY_INTERVIEW and self.max_queue and len(self._waiting) >= self.max_queue:
+            self.rejected += 1
+            raise LLMBusy(self._retry_after())
+        heapq.heappush(self._waiting, (priority, next(self._seq), waiter))
+        self._grant()
+        return waiter
+
+    def _cancel(self, waiter):
+        """Give up waiting. Returns True if the waiter had been granted in the meantime (and now holds a slot)."""
+        if waiter.granted:
+            return True
+        waiter.cancelled = True
+        return False
+
+    # Public API
+
+    def check(self, backlog=0):
+        """Raise LLMBusy if the queue is full, before a route accepts work that needs the LLM.
+
+        backlog counts work that will need the LLM but hasn't queued here yet (background jobs not started).
+        """
+        with self._lock:
+            if self.max_queue and len(self._waiting) + backlog >= self.max_queue:
+                self.rejected += 1
+                raise LLMBusy(self._retry_after(backlog))
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+            self._grant()
+
+    def rate_limited(self, retry_after=None):
+        """The API answered 429: slow down, and stop sending for retry_after seconds"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate_limits += 1
+            # A burst of calls sent before the pause all come back 429; that's one slowdown, not one each
+            if now >= self._paused_until:
+                self._rate = max(0.1, self._rate / 2)
+                logging.warning(f"LLM rate limited ({self.name}), refilling at {self._rate:.0%} of the configured limits")
+            self._paused_until = max(self._paused_until, now + (retry_after or 1.0))
+
+    def succeeded(self):
+        with self._lock:
+            if self._rate < 1.0:
+                self._refill(time.monotonic())
+                self._rate = min(1.0, self._rate + 0.05)
+
+    @contextmanager
+    def slot(self, priority=PRIORITY_INTERVIEW, tokens=0):
+        """Wait for a turn to make one LLM call, holding an in-flight slot for the block"""
+        event = threading.Event()
+        with self._lock:
+            waiter = self._enqueue(priority, tokens, event.set)
+        if not event.wait(self.queue_timeout):
+            with self._lock:
+                if not self._cancel(waiter):
+                    self.rejected += 1
+                    raise LLMBusy(self._retry_after())
+        try:
+            yield
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def aslot(self, priority=PRIORITY_INTERVIEW, tokens=0):
+        """Async version of slot"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        with self._lock:
+            waiter = self._enqueue(priority, tokens, wake)
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.queue_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if not self._cancel(waiter):
+                    self.rejected += 1
+                    raise LLMBusy(self._retry_after())
+        except BaseException:
+            # Job cancelled while queued; hand back the slot if it was granted in the meantime
+            with self._lock:
+                granted = self._cancel(waiter)
+            if granted:
+                self.release()
+            raise
+        try:
+            yield
+        finally:
+            self.release()
+
+    def _gauges(self):
+        with self._lock:
+            waiting = sum(1 for _, _, waiter in self._waiting if not waiter.cancelled)
+            return dict(waiting=waiting, in_flight=self._in_flight, rate=self._rate,
+                        rejected=self.rejected, rate_limits=self.rate_limits)
+
+    def _backoff(self, error, attempt):
+        """Seconds to wait before retrying after error, or None if it shouldn't be retried"""
+        if isinstance(error, openai.RateLimitError):
+            # Slow down even when giving up, the next caller would only get a 429 too
+            self.rate_limited(_retry_after_header(error))
+            if attempt >= self.max_retries:
+                return None
+            return 0  # The buckets are paused; waiting for a slot again is the backoff
+        if attempt >= self.max_retries:
+            return None
+        # A timeout already cost the full client timeout; another try would likely cost the same
+        if isinstance(error, RETRYABLE_ERRORS) and not isinstance(error, openai.APITimeoutError):
+            return min(8.0, 0.5 * 2 ** attempt) * random.uniform(0.75, 1.25)
+        return None
+
+    def call(self, fn, priority=PRIORITY_INTERVIEW, tokens=0):
+        """fn() inside a slot, retrying 429s and transient errors through the queue"""
+        for attempt in itertools.count():
+            try:
+                with self.slot(priority, tokens):
+                    result = fn()
+                self.succeeded()
+                return result
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+
+    @contextmanager
+    def holding(self, fn, priority=PRIORITY_INTERVIEW, tokens=0):
+        """Like call, but the slot is held for the whole with block, which gets fn()'s result (e.g. a stream being read)"""
+        for attempt in itertools.count():
+            with self.slot(priority, tokens):
+                try:
+                    result = fn()
+                except Exception as e:
+                    delay = self._backoff(e, attempt)
+                    if delay is None:
+                        raise
+                else:
+                    yield result
+                    self.succeeded()
+                    return
+            time.sleep(delay)
+
+    async def acall(self, fn, priority=PRIORITY_INTERVIEW, tokens=0):
+        """Async version of call; fn() returns an awaitable"""
+        for attempt in itertools.count():
+            try:
+                async with self.aslot(priority, tokens):
+                    result = await fn()
+                self.succeeded()
+                return result
+            except Exception as e:
+                delay = self._backoff(e, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+
+
+def _retry_after_header(error):
+    try:
+        return float(error.response.headers.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+METRICS = [
+    ('interviewnav_llm_queue_waiting', 'gauge', 'waiting', 'LLM calls waiting for a limiter slot, for this process.'),
+    ('interviewnav_llm_in_flight', 'gauge', 'in_flight', 'LLM calls in flight, for this process.'),
+    ('interviewnav_llm_rate_factor', 'gauge', 'rate', 'Fraction of the configured rpm/tpm limits in use after 429 backoff.'),
+    ('interviewnav_llm_rejected_total', 'counter', 'rejected', 'LLM calls and uploads turned away because the queue was full.'),
+    ('interviewnav_llm_rate_limited_total', 'counter', 'rate_limits', '429 responses from the LLM API.'),
+]
+
+def prometheus_metrics(limiters):
+    """Queue and backoff state of each endpoint's limiter, in the Prometheus text format"""
+    gauges = [(limiter.name, limiter._gauges()) for limiter in limiters]
+    lines = []
+    for metric, kind, key, help_text in METRICS:
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} {kind}']
+        lines += [f'{metric}{{endpoint="{name}"}} {values[key]}' for name, values in gauges]
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,161 @@
+import logging
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from model import LLMCall, LLMCallTotal
+
+# HTTP attempts made by the OpenAI client for the call in progress (retries = attempts - 1)
+_attempts = ContextVar('llm_attempts', default=None)
+# Interview session / user that LLM calls made in this context are billed to
+_owner = ContextVar('llm_owner', default=(None, None))
+
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 20, 30, 60]  # seconds
+
+def count_attempt(request):
+    """httpx request hook for the sync OpenAI client"""
+    attempts = _attempts.get()
+    if attempts is not None:
+        attempts[0] += 1
+
+async def acount_attempt(request):
+    """httpx request hook for the async OpenAI client"""
+    count_attempt(request)
+
+@contextmanager
+def counting_attempts():
+    """Count the HTTP requests (first try + retries) made inside the block; yields a one-item list"""
+    attempts = [0]
+    token = _attempts.set(attempts)
+    try:
+        yield attempts
+    finally:
+        _attempts.reset(token)
+
+@contextmanager
+def llm_owner(session_id=None, user_id=None):
+    """Attribute LLM calls made inside the block to an interview session and user"""
+    token = _owner.set((session_id, user_id))
+    try:
+        yield
+    finally:
+        _owner.reset(token)
+
+def llm_owned_stream(generator, session_id=None, user_id=None):
+    """Wrap a streaming response generator so the LLM calls it makes are attributed like llm_owner"""
+    with llm_owner(session_id, user_id):
+        yield from generator
+
+def _add_to_total(conn, keys, counts):
+    """INSERT the LLMCallTotal row, or add counts to it if it already exists (atomic, like analytics._increment)"""
+    dialect = conn.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        insert = postgresql.insert if dialect == 'postgresql' else sqlite.insert
+        stmt = insert(LLMCallTotal).values(**keys, **counts)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=list(keys),
+            set_={name: getattr(LLMCallTotal, name) + stmt.excluded[name] for name in counts}
+        ))
+        return
+
+    updated = conn.execute(
+        db.update(LLMCallTotal).filter_by(**keys)
+        .values({name: getattr(LLMCallTotal, name) + value for name, value in counts.items()})
+    ).rowcount
+    if not updated:
+        conn.execute(db.insert(LLMCallTotal).values(**keys, **counts))
+
+def record_llm_call(task, model, started, usage=None, attempts=None, error=None, cached=False, stream=False):
+    """Store one LLM call and add it to the totals. Written on its own connection, so it's kept even if the caller rolls back."""
+    session_id, user_id = _owner.get()
+    outcome = 'cached' if cached else 'error' if error is not None else 'ok'
+    call = dict(
+        task=task or 'other',
+        model=model,
+        outcome=outcome,
+        prompt_tokens=getattr(usage, 'prompt_tokens', None) or 0,
+        completion_tokens=getattr(usage, 'completion_tokens', None) or 0,
+        latency=time.perf_counter() - started,
+        retries=max(0, attempts[0] - 1) if attempts else 0
+    )
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(db.insert(LLMCall).values(
+                **call,
+                created_at=datetime.utcnow(),
+                stream=stream,
+                error_type=type(error).__name__ if error is not None else None,
+                session_id=session_id,
+                user_id=user_id
+            ))
+            _add_to_total(conn, {'task': call['task'], 'model': model or 'unknown', 'outcome': outcome,
+                                 'latency_bucket': bisect_left(LATENCY_BUCKETS, call['latency'])},
+                          {'calls': 1, **{name: call[name] for name in ('prompt_tokens', 'completion_tokens', 'retries', 'latency')}})
+    except Exception as e:
+        # Accounting must never break the call it is accounting for
+        logging.error(f"Failed to record LLM call: {type(e).__name__}: {e}")
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{str(value).replace(chr(34), "")}"' for name, value in labels.items()) + '}'
+
+def prune_llm_calls(days):
+    """Background job: delete llm_call rows older than days. The metrics come from LLMCallTotal, so they are unaffected."""
+    deleted = db.session.execute(
+        db.delete(LLMCall).where(LLMCall.created_at < datetime.utcnow() - timedelta(days=days))
+    ).rowcount
+    db.session.commit()
+    if deleted:
+        logging.info(f"Pruned {deleted} LLM call records older than {days} days")
+
+def prometheus_metrics():
+    """All recorded LLM calls as Prometheus text exposition format.
+
+    Read from the LLMCallTotal running totals, so every worker process reports the same
+    totals and a scrape costs the same however many calls have been made.
+    """
+    rows = {}
+    for total in db.session.execute(
+        db.select(LLMCallTotal).order_by(LLMCallTotal.task, LLMCallTotal.model, LLMCallTotal.outcome)
+    ).scalars():
+        row = rows.setdefault((total.task, total.model, total.outcome), {
+            'calls': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'retries': 0, 'latency': 0.0,
+            'buckets': [0] * len(LATENCY_BUCKETS)
+        })
+        for name in ('calls', 'prompt_tokens', 'completion_tokens', 'retries', 'latency'):
+            row[name] += getattr(total, name)
+        # Histogram buckets are cumulative: a call counts towards its own bound and every one above it
+        for index in range(total.latency_bucket, len(LATENCY_BUCKETS)):
+            row['buckets'][index] += total.calls
+
+    lines = [
+        '# HELP interviewnav_llm_calls_total LLM calls by task, model and outcome (ok, error, cached).',
+        '# TYPE interviewnav_llm_calls_total counter',
+    ]
+    lines += [f'interviewnav_llm_calls_total{_labels(task=key[0], model=key[1], outcome=key[2])} {row["calls"]}'
+              for key, row in rows.items()]
+
+    for metric, help_text in [
+        ('prompt_tokens', 'Prompt tokens reported by the API.'),
+        ('completion_tokens', 'Completion tokens reported by the API.'),
+        ('retries', 'HTTP retries made by the OpenAI client.'),
+    ]:
+        lines += [f'# HELP interviewnav_llm_{metric}_total {help_text}', f'# TYPE interviewnav_llm_{metric}_total counter']
+        lines += [f'interviewnav_llm_{metric}_total{_labels(task=key[0], model=key[1], outcome=key[2])} {row[metric]}'
+                  for key, row in rows.items()]
+
+    lines += ['# HELP interviewnav_llm_latency_seconds LLM call latency, including retries.',
+              '# TYPE interviewnav_llm_latency_seconds histogram']
+    for key, row in rows.items():
+        labels = dict(task=key[0], model=key[1], outcome=key[2])
+        for bound, count in zip(LATENCY_BUCKETS, row['buckets']):
+            lines.append(f'interviewnav_llm_latency_seconds_bucket{_labels(**labels, le=bound)} {count}')
+        lines.append(f'interviewnav_llm_latency_seconds_bucket{_labels(**labels, le="+Inf")} {row["calls"]}')
+        lines.append(f'interviewnav_llm_latency_seconds_sum{_labels(**labels)} {row["latency"]}')
+        lines.append(f'interviewnav_llm_latency_seconds_count{_labels(**labels)} {row["calls"]}')
+
+    return '\n'.join(lines) + '\n'
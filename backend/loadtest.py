@@ -0,0 +1,126 @@
+"""
+Load test for the LLM-bound jobs (upload-cv question generation and report generation).
+Starts fake_openai.py in-process, uploads --sessions CVs back to back, answers every question,
+requests every report, and times how long it takes until all jobs are done (question times
+include the upload requests themselves). Compares the default worker-thread jobs
+(ASYNC_LLM=false) with the AsyncOpenAI event loop (ASYNC_LLM=true).
+Run this: python loadtest.py --sessions 100 --latency 1.0
+"""
+import argparse
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+def run(mode, sessions, latency):
+    """Run the flow once in this process with ASYNC_LLM set for mode. Returns the timings."""
+    from fake_openai import start_server
+
+    server = start_server(latency=latency)
+    workdir = tempfile.mkdtemp()
+    os.environ.update({
+        'ASYNC_LLM': 'true' if mode == 'async' else 'false',
+        'OPENAI_BASE_URL': f'http://127.0.0.1:{server.server_port}/v1',
+        'OPENAI_API_KEY': 'sk-loadtest',
+        'DATABASE_URL': f"sqlite:///{os.path.join(workdir, 'loadtest.db')}",
+        'CV_CACHE_FOLDER': os.path.join(workdir, 'cv_text'),
+        'LLM_CACHE_BACKEND': 'none',  # Every request has to reach the (fake) API
+    })
+
+    import logging
+    from docx import Document
+    from app import app, db
+    from model import InterviewSession
+
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        db.create_all()
+
+    document = Document()
+    document.add_paragraph("Backend developer. Python, Flask, PostgreSQL, Redis, AWS. Built payment APIs.")
+    cv = io.BytesIO()
+    document.save(cv)
+
+    client = app.test_client()
+    token = client.post('/api/register', json={'username': 'load', 'email': 'load@example.com', 'password': 'load'}).get_json()['access_token']
+    headers = {'Authorization': f'Bearer {token}'}
+
+    def wait_for(session_ids, busy_status):
+        while True:
+            with app.app_context():
+                busy = db.session.execute(
+                    db.select(db.func.count()).select_from(InterviewSession)
+                    .where(InterviewSession.id.in_(session_ids), InterviewSession.status == busy_status)
+                ).scalar()
+            if not busy:
+                return
+            time.sleep(0.05)
+
+    start = time.perf_counter()
+    session_ids = []
+    for n in range(sessions):
+        response = client.post('/api/upload-cv', headers=headers, data={
+            'cv_file': (io.BytesIO(cv.getvalue()), 'cv.docx'),
+            'company_name': f'Company {n}', 'job_role': 'Backend Developer', 'interview_level': 'Intermediate'
+        })
+        assert response.status_code == 202, response.get_data(as_text=True)
+        session_ids.append(response.get_json()['session_id'])
+    upload_time = time.perf_counter() - start
+    wait_for(session_ids, 'generating')
+    questions_time = time.perf_counter() - start
+
+    for session_id in session_ids:
+        while client.post('/api/interview/answer', headers=headers,
+                          json={'session_id': session_id, 'answer': 'An answer', 'grade': False}).status_code == 200:
+            pass
+
+    start = time.perf_counter()
+    for session_id in session_ids:
+        response = client.post('/api/report/generate', headers=headers, json={'session_id': session_id})
+        assert response.status_code == 202, response.get_data(as_text=True)
+    wait_for(session_ids, 'grading')
+    report_time = time.perf_counter() - start
+
+    with app.app_context():
+        completed = db.session.execute(
+            db.select(db.func.count()).select_from(InterviewSession)
+            .where(InterviewSession.id.in_(session_ids), InterviewSession.status == 'completed')
+        ).scalar()
+    server.shutdown()
+    return {'mode': mode, 'sessions': sessions, 'completed': completed,
+            'upload_seconds': round(upload_time, 2), 'questions_seconds': round(questions_time, 2),
+            'reports_seconds': round(report_time, 2)}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=1.0, help="fake API latency in seconds")
+    parser.add_argument('--mode', choices=['sync', 'async', 'both'], default='both')
+    args = parser.parse_args()
+
+    if args.mode != 'both':
+        print(json.dumps(run(args.mode, args.sessions, args.latency)))
+        return 0
+
+    # Config is read at import time, so each mode gets a fresh process
+    results = []
+    for mode in ('sync', 'async'):
+        output = subprocess.run([sys.executable, __file__, '--mode', mode, '--sessions', str(args.sessions),
+                                 '--latency', str(args.latency)], capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{args.sessions} sessions, {args.latency}s fake API latency")
+    for r in results:
+        print(f"  {r['mode']:5}  uploads {r['upload_seconds']:7.2f}s   questions ready {r['questions_seconds']:7.2f}s   "
+              f"reports {r['reports_seconds']:7.2f}s   "
+              f"completed {r['completed']}/{r['sessions']}")
+    sync, async_ = results
+    print(f"  speedup: questions x{sync['questions_seconds'] / async_['questions_seconds']:.1f}, "
+          f"reports x{sync['reports_seconds'] / async_['reports_seconds']:.1f}")
+    return 0 if all(r['completed'] == r['sessions'] for r in results) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,30 @@
+"""Cleared the question bank of questions that may be CV-specific
+
+Revision ID: 2b7d9e4f6c18
+Revises: 8f3c5a1d7e26
+Create Date: 2026-10-19 10:42:16.508231
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b7d9e4f6c18'
+down_revision = '8f3c5a1d7e26'
+branch_labels = None
+depends_on = None
+
+
+bank_question = sa.table('bank_question', sa.column('id', sa.Integer))
+
+
+def upgrade():
+    # Questions banked so far were never checked for details from the candidate's CV, and there is
+    # no telling them apart now. The bank refills with general questions only.
+    op.execute(bank_question.delete())
+
+
+def downgrade():
+    # The deleted questions are gone; nothing to restore
+    pass
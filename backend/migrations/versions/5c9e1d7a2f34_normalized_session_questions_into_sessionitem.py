@@ -0,0 +1,166 @@
+"""Normalized session questions/responses into SessionItem
+
+Revision ID: 5c9e1d7a2f34
+Revises: b81e4c07d2a5
+Create Date: 2026-10-17 16:40:05.217743
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c9e1d7a2f34'
+down_revision = 'b81e4c07d2a5'
+branch_labels = None
+depends_on = None
+
+
+interview_session = sa.table('interview_session',
+    sa.column('id', sa.String),
+    sa.column('questions_json', sa.Text),
+    sa.column('responses_json', sa.Text),
+    sa.column('feedback', sa.Text)
+)
+
+session_item = sa.table('session_item',
+    sa.column('session_id', sa.String),
+    sa.column('question_index', sa.Integer),
+    sa.column('question', sa.Text),
+    sa.column('answer', sa.Text),
+    sa.column('status', sa.String),
+    sa.column('score', sa.Float),
+    sa.column('feedback', sa.Text)
+)
+
+question_grade = sa.table('question_grade',
+    sa.column('session_id', sa.String),
+    sa.column('question_index', sa.Integer),
+    sa.column('status', sa.String),
+    sa.column('score', sa.Float),
+    sa.column('feedback', sa.Text)
+)
+
+
+def _loads(value):
+    try:
+        return json.loads(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+def upgrade():
+    op.create_table('session_item',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('question_index', sa.Integer(), nullable=False),
+    sa.Column('question', sa.Text(), nullable=False),
+    sa.Column('answer', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=True),
+    sa.Column('score', sa.Float(), nullable=True),
+    sa.Column('feedback', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['interview_session.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id', 'question_index')
+    )
+
+    # Backfill one item per question from the JSON columns. Grades come from the
+    # per-answer grading table, or from the stored report analysis for graded sessions.
+    conn = op.get_bind()
+    grades = {}
+    for row in conn.execute(sa.select(question_grade)):
+        grades[(row.session_id, row.question_index)] = row
+
+    rows = []
+    for s in conn.execute(sa.select(interview_session)):
+        questions = _loads(s.questions_json) or []
+        responses = _loads(s.responses_json) or []
+        analysis = _loads(s.feedback)
+        analysis = analysis.get('questions_analysis') if isinstance(analysis, dict) else None
+        if not isinstance(analysis, list) or len(analysis) != len(questions):
+            analysis = None
+
+        for idx, question in enumerate(questions):
+            grade = {'status': None, 'score': None, 'feedback': None}
+            if analysis and isinstance(analysis[idx], dict):
+                grade = {
+                    'status': analysis[idx].get('status'),
+                    'score': analysis[idx].get('score'),
+                    'feedback': analysis[idx].get('feedback')
+                }
+            elif (s.id, idx) in grades:
+                g = grades[(s.id, idx)]
+                grade = {'status': g.status, 'score': g.score, 'feedback': g.feedback}
+
+            rows.append({
+                'session_id': s.id,
+                'question_index': idx,
+                'question': question,
+                'answer': responses[idx] if idx < len(responses) else None,
+                **grade
+            })
+
+    if rows:
+        op.bulk_insert(session_item, rows)
+
+    op.drop_table('question_grade')
+    with op.batch_alter_table('interview_session', schema=None) as batch_op:
+        batch_op.drop_column('responses_json')
+        batch_op.drop_column('questions_json')
+
+
+def downgrade():
+    with op.batch_alter_table('interview_session', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('questions_json', sa.Text(), nullable=True))
+        batch_op.add_column(sa.Column('responses_json', sa.Text(), nullable=True))
+
+    op.create_table('question_grade',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(length=36), nullable=False),
+    sa.Column('question_index', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('feedback', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['session_id'], ['interview_session.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('session_id', 'question_index')
+    )
+
+    conn = op.get_bind()
+    sessions = {}
+    grades = []
+    for item in conn.execute(sa.select(session_item).order_by(session_item.c.session_id, session_item.c.question_index)):
+        questions, responses = sessions.setdefault(item.session_id, ([], []))
+        questions.append(item.question)
+        if item.answer is not None:
+            responses.append(item.answer)
+        if item.score is not None:
+            grades.append({
+                'session_id': item.session_id,
+                'question_index': item.question_index,
+                'status': item.status or 'Unknown',
+                'score': item.score,
+                'feedback': item.feedback
+            })
+
+    for session_id, (questions, responses) in sessions.items():
+        conn.execute(
+            interview_session.update()
+            .where(interview_session.c.id == session_id)
+            .values(questions_json=json.dumps(questions), responses_json=json.dumps(responses))
+        )
+    conn.execute(
+        interview_session.update()
+        .where(interview_session.c.questions_json.is_(None))
+        .values(questions_json='[]', responses_json='[]')
+    )
+    if grades:
+        op.bulk_insert(question_grade, grades)
+
+    with op.batch_alter_table('interview_session', schema=None) as batch_op:
+        batch_op.alter_column('questions_json', existing_type=sa.Text(), nullable=False)
+
+    op.drop_table('session_item')
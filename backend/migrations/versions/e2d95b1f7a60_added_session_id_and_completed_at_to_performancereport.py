@@ -0,0 +1,71 @@
+"""Added session_id and completed_at to PerformanceReport
+
+Revision ID: e2d95b1f7a60
+Revises: a47f0e3b9c12
+Create Date: 2026-10-17 20:05:38.116902
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2d95b1f7a60'
+down_revision = 'a47f0e3b9c12'
+branch_labels = None
+depends_on = None
+
+
+performance_report = sa.table('performance_report',
+    sa.column('id', sa.Integer),
+    sa.column('cv_id', sa.Integer),
+    sa.column('session_id', sa.String),
+    sa.column('completed_at', sa.DateTime)
+)
+
+interview_session = sa.table('interview_session',
+    sa.column('id', sa.String),
+    sa.column('cv_id', sa.Integer),
+    sa.column('status', sa.String),
+    sa.column('created_at', sa.DateTime),
+    sa.column('completed_at', sa.DateTime)
+)
+
+
+def upgrade():
+    with op.batch_alter_table('performance_report', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('session_id', sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column('completed_at', sa.DateTime(), nullable=True))
+        batch_op.create_foreign_key('fk_performance_report_session_id', 'interview_session', ['session_id'], ['id'])
+
+    # Every upload creates its own CV, so a report belongs to the completed session of the same CV.
+    # Reports we can't match keep a sortable timestamp from the epoch.
+    conn = op.get_bind()
+    sessions = {}
+    for row in conn.execute(
+        sa.select(interview_session).where(interview_session.c.status == 'completed')
+        .order_by(interview_session.c.completed_at)
+    ):
+        sessions[row.cv_id] = row
+
+    for report in conn.execute(sa.select(performance_report.c.id, performance_report.c.cv_id)).all():
+        session = sessions.get(report.cv_id)
+        values = {'completed_at': datetime(1970, 1, 1)}
+        if session is not None:
+            values = {
+                'session_id': session.id,
+                'completed_at': session.completed_at or session.created_at or datetime(1970, 1, 1)
+            }
+        conn.execute(performance_report.update().where(performance_report.c.id == report.id).values(**values))
+
+    with op.batch_alter_table('performance_report', schema=None) as batch_op:
+        batch_op.alter_column('completed_at', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('performance_report', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_performance_report_session_id', type_='foreignkey')
+        batch_op.drop_column('completed_at')
+        batch_op.drop_column('session_id')
@@ -1,6 +1,5 @@
 from extensions import db
 from datetime import datetime
-import json
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -26,8 +25,13 @@ class User(db.Model):
         }
 
 class CV(db.Model):
+    __table_args__ = (
+        # A user's CVs, newest first (profile page)
+        db.Index('ix_cv_user_id_id', 'user_id', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    file_path = db.Column(db.String(255), nullable=False)
+    file_path = db.Column(db.String(255), nullable=True) # Uploads are parsed in memory and not kept
     company_name = db.Column(db.String(255), nullable=False)
     job_role = db.Column(db.String(255), nullable=False)
     job_description = db.Column(db.Text, nullable=True) # Optional Job Description
@@ -53,68 +57,210 @@ class CV(db.Model):
         }
 
 class InterviewSession(db.Model):
+    __table_args__ = (
+        # Report history: WHERE user_id = ? AND status = 'completed' ORDER BY completed_at DESC, id DESC
+        db.Index('ix_interview_session_user_id_status_completed_at', 'user_id', 'status', 'completed_at', 'id'),
+    )
+
     id = db.Column(db.String(36), primary_key=True)  # UUID string
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    cv_id = db.Column(db.Integer, db.ForeignKey('cv.id'), nullable=False)
-    questions_json = db.Column(db.Text, nullable=False) # Stored as JSON string
-    responses_json = db.Column(db.Text, default='[]')   # Stored as JSON string
+    cv_id = db.Column(db.Integer, db.ForeignKey('cv.id'), nullable=False, index=True)
     feedback = db.Column(db.Text, nullable=True)        # AI Feedback
-    status = db.Column(db.String(20), default='active') # active, completed
+    total_score = db.Column(db.Float, nullable=True)    # Sum of per-question scores, set at grading time
+    accuracy = db.Column(db.Float, nullable=True)       # total_score as a percentage of question_count
+    question_count = db.Column(db.Integer, nullable=True) # Number of questions graded
+    status = db.Column(db.String(20), default='active') # generating, active, grading, deferred, failed, completed
+    error = db.Column(db.Text, nullable=True)           # Set when a background job fails or grading is deferred
     current_question_index = db.Column(db.Integer, default=0)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     completed_at = db.Column(db.DateTime, nullable=True)
+
+    # One row per question, in the order they are asked
+    items = db.relationship('SessionItem', backref='session', lazy=True, cascade='all, delete-orphan',
+                            order_by='SessionItem.question_index')
     
-    # Helper to get/set questions as list
+    # Helpers to read questions/answers as lists
     @property
     def questions(self):
-        return json.loads(self.questions_json)
-    
-    @questions.setter
-    def questions(self, value):
-        self.questions_json = json.dumps(value)
+        return [item.question for item in self.items]
 
-    # Helper to get/set responses as list
     @property
     def responses(self):
-        return json.loads(self.responses_json)
-    
-    @responses.setter
-    def responses(self, value):
-        self.responses_json = json.dumps(value)
+        return [item.answer for item in self.items if item.answer is not None]
+
+    def add_question(self, question):
+        item = SessionItem(question_index=len(self.items), question=question)
+        self.items.append(item)
+        return item
 
     def to_dict(self):
+        total_questions = len(self.items)
         return {
             'session_id': self.id,
             'user_id': self.user_id,
             'cv_id': self.cv_id,
             'current_question': self.current_question_index,
-            'total_questions': len(self.questions),
-            'completed': self.current_question_index >= len(self.questions) or self.status == 'completed',
+            'total_questions': total_questions,
+            'completed': self.current_question_index >= total_questions or self.status == 'completed',
             'status': self.status,
+            'error': self.error,
+            'total_score': self.total_score,
+            'accuracy': self.accuracy,
             'feedback': self.feedback,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
 
+class SessionItem(db.Model):
+    """A single question of an interview session, with its answer and grade once available"""
+    __table_args__ = (db.UniqueConstraint('session_id', 'question_index'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.String(36), db.ForeignKey('interview_session.id'), nullable=False)
+    question_index = db.Column(db.Integer, nullable=False)
+    question = db.Column(db.Text, nullable=False)
+    answer = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=True)    # Correct, Partial, Wrong (set once graded)
+    score = db.Column(db.Float, nullable=True)          # 0.0 to 1.0
+    feedback = db.Column(db.Text, nullable=True)
+
+    def __repr__(self):
+        return f'<SessionItem {self.session_id}#{self.question_index}>'
+
+    def to_dict(self):
+        return {
+            'index': self.question_index,
+            'question': self.question,
+            'answer': self.answer,
+            'status': self.status,
+            'score': self.score,
+            'feedback': self.feedback
+        }
+
 class PerformanceReport(db.Model):
+    __table_args__ = (
+        # Reports per CV, newest first
+        db.Index('ix_performance_report_cv_id_completed_at', 'cv_id', 'completed_at', 'id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    accuracy_level = db.Column(db.String(50), nullable=False)
+    accuracy_level = db.Column(db.String(50), nullable=False) # Display string, e.g. "73.33%"
+    accuracy = db.Column(db.Float, nullable=True)             # Same as accuracy_level, as a number
+    total_score = db.Column(db.Float, nullable=True)
     confidence_level = db.Column(db.String(50), nullable=False)
     total_questions = db.Column(db.Integer, nullable=False)
     correct_answers = db.Column(db.Integer, nullable=False)
     feedback = db.Column(db.Text, nullable=True)
     cv_id = db.Column(db.Integer, db.ForeignKey('cv.id'), nullable=False)
+    session_id = db.Column(db.String(36), db.ForeignKey('interview_session.id'), nullable=True, index=True)
+    completed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
 
     def __repr__(self):
         return f'<PerformanceReport {self.accuracy_level} - {self.confidence_level}>'
     
-    def to_dict(self):
-        return {
+    def to_dict(self, include_feedback=True):
+        data = {
             'id': self.id,
             'accuracy_level': self.accuracy_level,
+            'accuracy': self.accuracy,
+            'total_score': self.total_score,
             'confidence_level': self.confidence_level,
             'total_questions': self.total_questions,
             'correct_answers': self.correct_answers,
-            'feedback': self.feedback,
-            'cv_id': self.cv_id
+            'cv_id': self.cv_id,
+            'session_id': self.session_id,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
         }
+        # Skipped on request so list views don't load (or ship) the full feedback blob
+        if include_feedback:
+            data['feedback'] = self.feedback
+        return data
+
+class ProgressSummary(db.Model):
+    """Running totals of a user's graded sessions per job role, interview level and day.
+    Updated as each session is graded (see analytics.py) so analytics never scan the full history."""
+    __table_args__ = (db.UniqueConstraint('user_id', 'job_role', 'interview_level', 'day'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    job_role = db.Column(db.String(255), nullable=False)
+    interview_level = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+    question_count = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f'<ProgressSummary {self.user_id} {self.job_role} {self.interview_level} {self.day}>'
+
+class CategorySummary(db.Model):
+    """Running totals of a user's graded answers per question category (see analytics.categorize_question)"""
+    __table_args__ = (db.UniqueConstraint('user_id', 'category'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    question_count = db.Column(db.Integer, nullable=False, default=0)
+    total_score = db.Column(db.Float, nullable=False, default=0.0)
+    wrong_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CategorySummary {self.user_id} {self.category}>'
+
+class LLMCall(db.Model):
+    """One chat completions call, for token and latency accounting (see llm_metrics.py).
+    Rows older than LLM_CALL_RETENTION_DAYS are pruned; LLMCallTotal keeps the totals."""
+    id = db.Column(db.Integer, primary_key=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    task = db.Column(db.String(50), nullable=False)     # questions, feedback, grading, overall_feedback
+    model = db.Column(db.String(100), nullable=True)
+    stream = db.Column(db.Boolean, nullable=False, default=False)
+    outcome = db.Column(db.String(20), nullable=False)  # ok, error, cached
+    error_type = db.Column(db.String(100), nullable=True)
+    prompt_tokens = db.Column(db.Integer, nullable=False, default=0)
+    completion_tokens = db.Column(db.Integer, nullable=False, default=0)
+    latency = db.Column(db.Float, nullable=False)       # seconds, including retries
+    retries = db.Column(db.Integer, nullable=False, default=0)
+    session_id = db.Column(db.String(36), db.ForeignKey('interview_session.id'), nullable=True, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True, index=True)
+
+    def __repr__(self):
+        return f'<LLMCall {self.task} {self.model} {self.outcome}>'
+
+class LLMCallTotal(db.Model):
+    """Running totals of LLMCall rows per task, model, outcome and latency bucket. Updated as each call is
+    recorded (see llm_metrics.py) so /api/metrics reads a handful of rows however long llm_call gets."""
+    __table_args__ = (db.UniqueConstraint('task', 'model', 'outcome', 'latency_bucket'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    task = db.Column(db.String(50), nullable=False)
+    model = db.Column(db.String(100), nullable=False)
+    outcome = db.Column(db.String(20), nullable=False)
+    latency_bucket = db.Column(db.Integer, nullable=False)  # index into llm_metrics.LATENCY_BUCKETS; past the end = slower
+    calls = db.Column(db.Integer, nullable=False, default=0)
+    prompt_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    completion_tokens = db.Column(db.BigInteger, nullable=False, default=0)
+    retries = db.Column(db.Integer, nullable=False, default=0)
+    latency = db.Column(db.Float, nullable=False, default=0.0)  # seconds, summed
+
+    def __repr__(self):
+        return f'<LLMCallTotal {self.task} {self.model} {self.outcome} {self.latency_bucket}>'
+
+class BankQuestion(db.Model):
+    """A generated interview question, kept so later sessions for the same role and level can reuse it
+    instead of asking the model again (see question_bank.py). Only questions that don't depend on the
+    candidate's CV are kept; the rest would leak one candidate's details into another's interview."""
+    __table_args__ = (db.Index('ix_bank_question_role_level', 'job_role', 'interview_level'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    question = db.Column(db.Text, nullable=False)
+    job_role = db.Column(db.String(255), nullable=False)        # normalized, see question_bank.normalize_role
+    interview_level = db.Column(db.String(50), nullable=False)
+    category = db.Column(db.String(50), nullable=False)
+    embedding = db.Column(db.Text, nullable=True)               # JSON vector; NULL for TF-IDF, which is rebuilt on load
+    embedding_model = db.Column(db.String(100), nullable=False)
+    use_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BankQuestion {self.job_role} {self.interview_level} {self.category}>'
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+from collections import namedtuple
+
+DEFAULT_ENDPOINT = 'openai'
+
+# What each kind of call used before routing existed; rules are applied on top
+DEFAULT_ROUTES = {
+    'questions': dict(model='gpt-4o-mini', max_tokens=800, timeout=60.0),
+    'feedback': dict(model='gpt-4o-mini', max_tokens=2500, timeout=60.0),
+    'grading': dict(model='gpt-4o-mini', max_tokens=400, timeout=60.0),
+    'overall_feedback': dict(model='gpt-4o-mini', max_tokens=1500, timeout=60.0),
+}
+
+ROUTE_FIELDS = ('model', 'max_tokens', 'timeout', 'endpoint')
+MATCH_FIELDS = ('task', 'interview_level', 'min_input_tokens', 'max_input_tokens')
+
+Route = namedtuple('Route', ROUTE_FIELDS)
+
+
+def _load_json(value, name):
+    """A JSON setting, given inline or as the path of a .json file"""
+    if not value:
+        return None
+    if not value.lstrip().startswith(('[', '{')) and os.path.isfile(value):
+        with open(value) as f:
+            return json.load(f)
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{name} is not valid JSON: {e}")
+
+
+class ModelRouter:
+    """Picks the model, max_tokens, timeout and endpoint of each LLM call.
+
+    LLM_ROUTES is a list of rules, tried in order; the first one that matches
+    the call overrides the task's default route (DEFAULT_ROUTES). A rule
+    matches on any of task, interview_level, min_input_tokens and
+    max_input_tokens (prompt tokens), and sets any of model, max_tokens,
+    timeout and endpoint, e.g.
+
+        [{"task": "questions", "interview_level": "Beginner", "model": "gpt-4.1-nano", "timeout": 20},
+         {"task": "feedback", "min_input_tokens": 6000, "model": "gpt-4o", "max_tokens": 4000, "timeout": 120},
+         {"task": "grading", "endpoint": "local", "model": "llama3.1:8b"}]
+
+    Endpoints other than the default OpenAI one are defined in LLM_ENDPOINTS
+    as {name: {"base_url": ..., "api_key": ..., "rpm": ..., "tpm": ...,
+    "max_concurrency": ...}}, for any OpenAI-compatible server (vLLM, Ollama,
+    llama.cpp). Only base_url is required; rpm/tpm default to no limit.
+    Both settings take inline JSON or the path of a JSON file.
+    """
+
+    def __init__(self, app=None):
+        self.rules = []
+        self.endpoints = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.endpoints = _load_json(app.config.get('LLM_ENDPOINTS'), 'LLM_ENDPOINTS') or {}
+        for name, settings in self.endpoints.items():
+            if not isinstance(settings, dict) or not settings.get('base_url'):
+                raise ValueError(f"LLM_ENDPOINTS: endpoint {name!r} needs a base_url")
+
+        self.rules = _load_json(app.config.get('LLM_ROUTES'), 'LLM_ROUTES') or []
+        for n, rule in enumerate(self.rules, 1):
+            unknown = set(rule) - set(ROUTE_FIELDS) - set(MATCH_FIELDS)
+            if unknown:
+                raise ValueError(f"LLM_ROUTES rule {n}: unknown fields {', '.join(sorted(unknown))}")
+            endpoint = rule.get('endpoint', DEFAULT_ENDPOINT)
+            if endpoint != DEFAULT_ENDPOINT and endpoint not in self.endpoints:
+                raise ValueError(f"LLM_ROUTES rule {n}: endpoint {endpoint!r} is not in LLM_ENDPOINTS")
+        if self.rules:
+            logging.info(f"LLM routing: {len(self.rules)} rules, endpoints: {', '.join([DEFAULT_ENDPOINT, *self.endpoints])}")
+
+    @staticmethod
+    def _matches(rule, task, interview_level, input_tokens):
+        return (rule.get('task', task) == task
+                and rule.get('interview_level', interview_level) == interview_level
+                and input_tokens >= rule.get('min_input_tokens', 0)
+                and input_tokens <= rule.get('max_input_tokens', input_tokens))
+
+    def route(self, task, interview_level=None, input_tokens=0):
+        """The Route for a call of this task, interview level and prompt size"""
+        route = dict(DEFAULT_ROUTES[task], endpoint=DEFAULT_ENDPOINT)
+        for rule in self.rules:
+            if self._matches(rule, task, interview_level, input_tokens):
+                route.update({field: rule[field] for field in ROUTE_FIELDS if field in rule})
+                break
+        return Route(**route)
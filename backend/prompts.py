@@ -1,21 +1,38 @@
 
-def get_interview_questions_prompt(cv_text, job_role, company_name, level_prompt, job_description=None):
+# Marks questions that don't depend on the candidate's CV; only those go into the shared question bank
+GENERAL_TAG = "[GENERAL]"
+
+def get_interview_questions_prompt(cv_text, job_role, company_name, level_prompt, job_description=None,
+                                   count=None, existing_questions=None):
+    """count and existing_questions ask for just the questions missing from a set taken from the question bank"""
     jd_section = ""
     if job_description:
         jd_section = f"JOB DESCRIPTION:\n{job_description}\n\n"
 
+    existing_section = ""
+    if existing_questions:
+        existing_section = (
+            "The candidate will also be asked the questions below. Do not repeat or rephrase them; "
+            "cover what they miss from the CV and role instead:\n"
+            + "\n".join(f"- {question}" for question in existing_questions) + "\n\n"
+        )
+
     return (
         f"Based on the following CV/resume text"
         f"{' and Job Description' if job_description else ''}, "
-        f"generate a list of 6 to 10 personalized interview questions "
+        f"generate {f'exactly {count}' if count else 'a list of 6 to 10'} personalized interview questions "
         f"for a {job_role} position at {company_name}. "
         f"The questions should be tailored to the candidate's specific skills, experience, and background mentioned in their CV"
         f"{', while also aligning with the requirements in the Job Description' if job_description else ''}.\n\n"
         f"CV/RESUME TEXT:\n{cv_text}\n\n"
         f"{jd_section}"
+        f"{existing_section}"
         f"Generate interview questions that focus on the candidate's skills, experience, and industry knowledge.\n\n"
         f"{level_prompt}\n\n"
-        "Format the questions as a numbered list, one question per line."
+        "Format the questions as a numbered list, one question per line. "
+        f"Start a question with {GENERAL_TAG} when it doesn't depend on this candidate's CV, i.e. it could be asked of "
+        f"any {job_role} candidate at this level; questions about the candidate's own employers, projects or experience "
+        "get no tag."
     )
 
 def get_feedback_prompt(questions, responses):
@@ -41,3 +58,58 @@ def get_feedback_prompt(questions, responses):
         feedback_prompt += f"Question {idx}: {question}\nCandidate's Answer: {response}\n\n"
         
     return feedback_prompt
+
+def get_streaming_feedback_prompt(questions, responses):
+    """Same analysis as get_feedback_prompt, but as JSON Lines so it can be consumed while streaming"""
+    feedback_prompt = (
+        "Based on the following interview questions and the candidate's responses, provide a detailed performance analysis "
+        "as JSON Lines: one raw JSON object per line, with no markdown formatting, no surrounding array and no blank lines. "
+        "Escape any newlines inside strings as \\n so that every object stays on a single line.\n"
+        "First output one line per question, in the order the questions were asked:\n"
+        "{\"type\": \"question_analysis\", \"question\": \"Question text\", \"candidate_answer\": \"Answer text\", "
+        "\"status\": \"Correct\" | \"Partial\" | \"Wrong\", \"score\": 0.0 to 1.0 (float), \"feedback\": \"Specific advice for this question\"}\n"
+        "Then output one line for each of these overall feedback sections, in this order: "
+        "'Communication Skills', 'Confidence', 'Areas for Improvement', 'General Advice for Success':\n"
+        "{\"type\": \"overall_section\", \"title\": \"Section title\", \"content\": \"Markdown content\"}\n"
+        "For EACH section, provide at least 2-3 numbered points. Each point must have a bold title (e.g., '**1. Clarity:**') "
+        "followed by an observation, and then a dedicated Improvement subsection (e.g. '\\n   **Improvement**: ...'). "
+        "The content must be thorough and educational.\n\n"
+    )
+
+    for idx, (question, response) in enumerate(zip(questions, responses), 1):
+        feedback_prompt += f"Question {idx}: {question}\nCandidate's Answer: {response}\n\n"
+
+    return feedback_prompt
+
+def get_answer_grading_prompt(question, answer):
+    return (
+        "Grade the candidate's answer to the following interview question. "
+        "Do NOT output any markdown formatting like ```json ... ```. Output raw JSON only.\n"
+        "The JSON structure must be:\n"
+        "{\n"
+        "  \"status\": \"Correct\" | \"Partial\" | \"Wrong\",\n"
+        "  \"score\": 0.0 to 1.0 (float),\n"
+        "  \"feedback\": \"Specific advice for this question\"\n"
+        "}\n\n"
+        f"Question: {question}\nCandidate's Answer: {answer}\n"
+    )
+
+def get_overall_feedback_prompt(questions_analysis):
+    """Overall feedback for an interview whose answers have already been graded one by one"""
+    feedback_prompt = (
+        "The following interview answers have already been graded individually. Based on the questions, answers, "
+        "scores and per-question feedback, write the overall performance analysis in structured JSON format. "
+        "Do NOT output any markdown formatting like ```json ... ```. Output raw JSON only.\n"
+        "The JSON structure must be:\n"
+        "{\n"
+        "  \"overall_feedback\": \"A comprehensive, detailed markdown report. It MUST be long and structured. Include these sections with '###' headers: '### Communication Skills', '### Confidence', '### Areas for Improvement', and '### General Advice for Success'. For EACH section, provide at least 2-3 numbered points. Each point must have a bold title (e.g., '**1. Clarity:**') followed by an observation, and then a dedicated Improvement subsection (e.g. '\\n   **Improvement**: ...'). The content must be thorough and educational.\"\n"
+        "}\n\n"
+    )
+
+    for idx, item in enumerate(questions_analysis, 1):
+        feedback_prompt += (
+            f"Question {idx}: {item['question']}\nCandidate's Answer: {item['candidate_answer']}\n"
+            f"Grade: {item['status']} ({item['score']})\nFeedback: {item['feedback']}\n\n"
+        )
+
+    return feedback_prompt
@@ -0,0 +1,256 @@
+import json
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app
+
+from analytics import categorize_question
+from extensions import db
+from model import BankQuestion
+
+# Optional: dense embeddings from a small CPU model. Without it questions are matched by TF-IDF.
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+TFIDF = 'tfidf'
+
+_STOPWORDS = set("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers him his how i
+if in into is it its itself just me more most my no nor not now of off on once only or other our ours out over own same
+she should so some such than that the their them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours yourself
+""".split())
+
+_model = None
+
+def _get_model():
+    """The sentence-transformers model, or None to use TF-IDF"""
+    global _model, SentenceTransformer
+    name = current_app.config.get('QUESTION_BANK_EMBEDDING_MODEL')
+    if _model is None and SentenceTransformer is not None and name and name != TFIDF:
+        try:
+            _model = SentenceTransformer(name, device='cpu')
+        except Exception as e:
+            # e.g. no network to download the model the first time
+            logging.error(f"Embedding model unavailable, using TF-IDF for the question bank: {e}")
+            SentenceTransformer = None
+    return _model
+
+def _embedding_name():
+    return current_app.config['QUESTION_BANK_EMBEDDING_MODEL'] if _get_model() is not None else TFIDF
+
+def normalize_role(job_role):
+    """'Senior  Backend-Developer ' -> 'senior backend developer', so near-identical roles share a bank"""
+    return ' '.join(re.findall(r'[a-z0-9+#]+', (job_role or '').lower()))
+
+def terms(text):
+    """Term counts for TF-IDF: words (keeping c++, c#, node.js) and adjacent word pairs, without stopwords"""
+    words = [w.strip('.') for w in re.findall(r'[a-z0-9][a-z0-9+#.]*', text.lower())]
+    words = [w for w in words if w and w not in _STOPWORDS]
+    return Counter(words + [f'{a} {b}' for a, b in zip(words, words[1:])])
+
+
+class _Partition:
+    """In-memory vector index over the bank questions of one (role, level).
+
+    TF-IDF vectors live in an inverted index (term -> questions containing it),
+    so a search only touches questions sharing a term with the query. Dense
+    embeddings are normalized and compared by dot product.
+    """
+
+    def __init__(self, embedding):
+        self.embedding = embedding
+        self.ids = []
+        self.questions = []
+        self.vectors = []          # term Counter (TF-IDF) or list of floats (dense)
+        self.df = Counter()
+        self.postings = {}         # term -> [index]
+        self._weighted = None      # TF-IDF weights and norms per question, recomputed when the idf changes
+        self.loaded_at = time.monotonic()
+
+    def add(self, id, question, vector):
+        index = len(self.ids)
+        self.ids.append(id)
+        self.questions.append(question)
+        self.vectors.append(vector)
+        if self.embedding == TFIDF:
+            for term in vector:
+                self.df[term] += 1
+                self.postings.setdefault(term, []).append(index)
+            self._weighted = None
+
+    def _idf(self, term):
+        return math.log((len(self.ids) + 1) / (self.df.get(term, 0) + 1)) + 1
+
+    def _weights(self, counts, known_only=True):
+        return {term: (1 + math.log(count)) * self._idf(term) for term, count in counts.items()
+                if term in self.df or not known_only}
+
+    def _doc(self, index):
+        """(weights, norm) of a question in the partition"""
+        if self._weighted is None:
+            self._weighted = []
+            for vector in self.vectors:
+                weights = self._weights(vector)
+                self._weighted.append((weights, math.sqrt(sum(w * w for w in weights.values())) or 1.0))
+        return self._weighted[index]
+
+    def search(self, query, known_only=True):
+        """{index: cosine similarity} for every question that has anything in common with query.
+
+        By default the query's TF-IDF norm only counts terms the partition knows,
+        which suits a long CV against short questions; known_only=False compares
+        like with like (question against question).
+        """
+        if self.embedding != TFIDF:
+            return {i: sum(a * b for a, b in zip(query, vector)) for i, vector in enumerate(self.vectors)}
+
+        weights = self._weights(query, known_only)
+        query_norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        scores = Counter()
+        for term, weight in weights.items():
+            for index in self.postings.get(term, []):
+                scores[index] += weight * self._doc(index)[0][term]
+        return {index: score / (query_norm * self._doc(index)[1]) for index, score in scores.items()}
+
+    def similarity(self, a, b):
+        """Cosine similarity between two questions in the partition"""
+        if self.embedding != TFIDF:
+            return sum(x * y for x, y in zip(self.vectors[a], self.vectors[b]))
+        (wa, norm_a), (wb, norm_b) = self._doc(a), self._doc(b)
+        return sum(w * wb[t] for t, w in wa.items() if t in wb) / (norm_a * norm_b)
+
+
+_partitions = {}
+_lock = threading.Lock()
+
+def _embed(texts):
+    model = _get_model()
+    if model is None:
+        return [terms(text) for text in texts]
+    return [vector.tolist() for vector in model.encode(texts, normalize_embeddings=True)]
+
+def _partition(job_role, interview_level):
+    """The index for a role/level, loaded from the database on first use and every QUESTION_BANK_REFRESH seconds
+    so questions added by other worker processes show up. Call with _lock held."""
+    key = (normalize_role(job_role), interview_level)
+    embedding = _embedding_name()
+    partition = _partitions.get(key)
+    if (partition is not None and partition.embedding == embedding
+            and time.monotonic() - partition.loaded_at < current_app.config['QUESTION_BANK_REFRESH']):
+        return partition
+
+    # Own connection, so this never touches (or commits) the caller's session
+    with db.engine.connect() as conn:
+        rows = conn.execute(
+            db.select(BankQuestion.id, BankQuestion.question, BankQuestion.embedding, BankQuestion.embedding_model)
+            .where(BankQuestion.job_role == key[0], BankQuestion.interview_level == interview_level)
+            .order_by(BankQuestion.id)
+        ).all()
+
+    partition = _Partition(embedding)
+    # Stored dense vectors are reused when they came from the same model; anything else is embedded again
+    stale = [row for row in rows if embedding == TFIDF or row.embedding_model != embedding]
+    fresh = dict(zip((row.id for row in stale), _embed([row.question for row in stale])))
+    for row in rows:
+        partition.add(row.id, row.question, fresh[row.id] if row.id in fresh else json.loads(row.embedding))
+    _partitions[key] = partition
+    return partition
+
+def pick_questions(query_text, job_role, interview_level, count, min_pool=None, min_score=None):
+    """Up to count bank questions for this role/level, most relevant to query_text (CV + JD) first.
+
+    Nothing is returned until the bank holds min_pool (default QUESTION_BANK_MIN_POOL)
+    questions for the role/level. Questions scoring under min_score (default
+    QUESTION_BANK_MIN_SCORE) are skipped; with min_score 0 every question is a candidate,
+    and picks are spread out (maximal marginal relevance) so the set doesn't
+    repeat one topic.
+    """
+    if count <= 0:
+        return []
+    config = current_app.config
+    with _lock:
+        partition = _partition(job_role, interview_level)
+        if len(partition.ids) < (config['QUESTION_BANK_MIN_POOL'] if min_pool is None else min_pool):
+            return []
+        min_score = config['QUESTION_BANK_MIN_SCORE'] if min_score is None else min_score
+        query = _embed([query_text])[0]
+        scores = partition.search(query)
+        if min_score <= 0:
+            # Include the questions that have nothing in common with the query too
+            scores = {i: scores.get(i, 0.0) for i in range(len(partition.ids))}
+        scores = {i: s for i, s in scores.items() if s >= min_score}
+        # Diversify among the best matches only; the rest of a big bank won't make the cut anyway
+        scores = dict(sorted(scores.items(), key=lambda item: -item[1])[:count * 10])
+
+        picked = []
+        categories = Counter()
+        while scores and len(picked) < count:
+            def value(i):
+                overlap = max((partition.similarity(i, j) for j in picked), default=0.0)
+                # Mild push towards categories we don't have yet
+                spread = 0.05 * categories[categorize_question(partition.questions[i])]
+                return 0.7 * scores[i] - 0.3 * overlap - spread
+            best = max(scores, key=value)
+            del scores[best]
+            if any(partition.similarity(best, j) >= config['QUESTION_BANK_DUPLICATE'] for j in picked):
+                continue
+            picked.append(best)
+            categories[categorize_question(partition.questions[best])] += 1
+        ids = [partition.ids[i] for i in picked if partition.ids[i] is not None]
+        questions = [partition.questions[i] for i in picked]
+
+    if ids:
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(db.update(BankQuestion).where(BankQuestion.id.in_(ids))
+                             .values(use_count=BankQuestion.use_count + 1))
+        except Exception as e:
+            logging.error(f"Failed to update question bank use counts: {e}")
+    return questions
+
+def add_questions(questions, job_role, interview_level):
+    """Store newly generated questions in the bank, skipping near-duplicates of ones it already has.
+
+    Every user with the same role and level can be served these, so only pass questions that
+    don't depend on the candidate's CV (see parse_tagged_questions in app.py)."""
+    if not questions:
+        return
+    key = (normalize_role(job_role), interview_level)
+    duplicate = current_app.config['QUESTION_BANK_DUPLICATE']
+    with _lock:
+        try:
+            partition = _partition(job_role, interview_level)
+            new = []
+            for question, vector in zip(questions, _embed(questions)):
+                if max(partition.search(vector, known_only=False).values(), default=0.0) >= duplicate:
+                    continue
+                # Indexed straight away, so the rest of the batch is checked against it too
+                partition.add(None, question, vector)
+                new.append((len(partition.ids) - 1, question, vector))
+
+            with db.engine.begin() as conn:
+                for index, question, vector in new:
+                    result = conn.execute(db.insert(BankQuestion).values(
+                        question=question,
+                        job_role=key[0],
+                        interview_level=interview_level,
+                        category=categorize_question(question),
+                        embedding=None if partition.embedding == TFIDF else json.dumps(vector),
+                        embedding_model=partition.embedding,
+                        use_count=0,
+                        created_at=datetime.utcnow()
+                    ))
+                    partition.ids[index] = result.inserted_primary_key[0]
+        except Exception as e:
+            # The index may now hold questions that never made it to the database; reload it next time
+            _partitions.pop(key, None)
+            logging.error(f"Failed to add questions to the bank: {type(e).__name__}: {e}")
@@ -0,0 +1,248 @@
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+REQUEST_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]  # seconds
+
+
+class RequestTiming:
+    """Wall time of one request, split into named spans (db, extraction, llm, serialization, ...)"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = Counter()
+        self.active = None  # Nested spans count towards the outer one, so spans never add up to more than the request
+
+    def add(self, name, seconds):
+        self.spans[name] += seconds
+
+
+def _current():
+    return getattr(g, '_request_timing', None) if has_request_context() else None
+
+@contextmanager
+def timed(name):
+    """Count the time spent in the block towards span name of the current request. No-op outside a request."""
+    timing = _current()
+    if timing is None or timing.active is not None:
+        yield
+        return
+
+    timing.active = name
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.active = None
+        timing.add(name, time.perf_counter() - started)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    timing = _current()
+    if timing is not None and timing.active is None:
+        conn.info['_query_started'] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.pop('_query_started', None)
+    timing = _current()
+    if started is not None and timing is not None:
+        timing.add('db', time.perf_counter() - started)
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    """Flask's JSON provider, counting jsonify() towards the serialization span"""
+
+    def response(self, *args, **kwargs):
+        with timed('serialization'):
+            return super().response(*args, **kwargs)
+
+
+class Histograms:
+    """Per-process Prometheus-style histograms, keyed by a tuple of label values"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._data = {}  # key -> ([count per bucket, then over the last bucket], sum)
+        self._lock = threading.Lock()
+
+    def observe(self, key, value):
+        with self._lock:
+            counts, total = self._data.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))] += 1
+            self._data[key] = (counts, total + value)
+
+    def lines(self, name, label_names):
+        with self._lock:
+            data = sorted((key, list(counts), total) for key, (counts, total) in self._data.items())
+
+        lines = []
+        for key, counts, total in data:
+            labels = ','.join(f'{label}="{value}"' for label, value in zip(label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {sum(counts)}')
+            lines.append(f'{name}_sum{{{labels}}} {total}')
+            lines.append(f'{name}_count{{{labels}}} {sum(counts)}')
+        return lines
+
+
+class SamplingProfiler:
+    """Samples the Python stack of registered threads every interval seconds, in the background.
+
+    Stacks are aggregated in collapsed ("folded") form, one "root;...;leaf count"
+    line per distinct stack, which flamegraph.pl and speedscope read directly.
+    Unlike cProfile nothing is traced; the cost is one stack walk per interval.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._samples = {}  # thread id -> Counter of folded stacks
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._samples[thread_id] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._samples.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            with self._lock:
+                thread_ids = list(self._samples)
+                if not thread_ids:
+                    self._wakeup.clear()
+            if not thread_ids:
+                self._wakeup.wait()
+                continue
+
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id in thread_ids:
+                    frame = frames.get(thread_id)
+                    if frame is not None and thread_id in self._samples:
+                        self._samples[thread_id][self._fold(frame)] += 1
+            time.sleep(self.interval)
+
+    @staticmethod
+    def _fold(frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+
+class RequestTimer:
+    """Per-route latency histograms with db/extraction/llm/serialization sub-spans, and slow-request profiles.
+
+    Histograms are kept per process and exported with prometheus_metrics() on
+    /api/metrics. With PROFILE_SLOW_REQUESTS set (seconds), every request is
+    sampled by SamplingProfiler and the stacks of those slower than that are
+    written to PROFILE_FOLDER as <time>-<route>-<ms>ms.folded files.
+    Streamed responses (SSE) are timed until the stream is closed.
+    """
+
+    def __init__(self, app=None):
+        self.requests = Histograms(REQUEST_BUCKETS)
+        self.spans = Histograms(REQUEST_BUCKETS)
+        self.profiler = None
+        self.slow_threshold = 0
+        self.profile_folder = None
+        self.max_profiles = 100
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_threshold = app.config.get('PROFILE_SLOW_REQUESTS', 0)
+        self.profile_folder = app.config.get('PROFILE_FOLDER')
+        self.max_profiles = app.config.get('PROFILE_MAX_FILES', 100)
+        if self.slow_threshold:
+            self.profiler = SamplingProfiler(app.config.get('PROFILE_SAMPLE_INTERVAL', 0.005))
+            os.makedirs(self.profile_folder, exist_ok=True)
+
+        app.json = TimedJSONProvider(app)
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    def _before_request(self):
+        g._request_timing = RequestTiming()
+        if self.profiler:
+            self.profiler.start(threading.get_ident())
+
+    def _after_request(self, response):
+        timing = getattr(g, '_request_timing', None)
+        if timing is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        method = request.method
+        thread_id = threading.get_ident()
+        if response.is_streamed:
+            # The body is generated while it is sent, so time it until the stream is closed
+            response.call_on_close(lambda: self._finish(timing, method, route, response.status_code, thread_id))
+        else:
+            self._finish(timing, method, route, response.status_code, thread_id)
+        return response
+
+    def _finish(self, timing, method, route, status, thread_id):
+        try:
+            elapsed = time.perf_counter() - timing.started
+            self.requests.observe((method, route), elapsed)
+            for name, seconds in timing.spans.items():
+                self.spans.observe((method, route, name), seconds)
+            self.spans.observe((method, route, 'other'), max(0.0, elapsed - sum(timing.spans.values())))
+
+            if self.profiler:
+                samples = self.profiler.stop(thread_id)
+                if elapsed >= self.slow_threshold:
+                    self._dump_profile(method, route, status, elapsed, timing, samples)
+        except Exception as e:
+            logging.error(f"Request timing error: {type(e).__name__}: {e}")
+
+    def _dump_profile(self, method, route, status, elapsed, timing, samples):
+        name = re.sub(r'[^\w]+', '_', route).strip('_') or 'root'
+        path = os.path.join(self.profile_folder,
+                            f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{method}-{name}-{int(elapsed * 1000)}ms.folded")
+        with open(path, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+        spans = ', '.join(f"{span} {seconds:.3f}s" for span, seconds in timing.spans.most_common())
+        logging.warning(f"Slow request {method} {route} ({status}) took {elapsed:.3f}s [{spans}], profile: {path}")
+
+        # Keep the folder from growing without bound
+        profiles = sorted(entry for entry in os.listdir(self.profile_folder) if entry.endswith('.folded'))
+        for old in profiles[:-self.max_profiles]:
+            os.remove(os.path.join(self.profile_folder, old))
+
+    def prometheus_metrics(self):
+        lines = ['# HELP interviewnav_request_duration_seconds Request latency by route, for this process.',
+                 '# TYPE interviewnav_request_duration_seconds histogram']
+        lines += self.requests.lines('interviewnav_request_duration_seconds', ['method', 'route'])
+        lines += ['# HELP interviewnav_request_span_seconds Time per request spent in db, extraction, llm, '
+                  'serialization and other, by route, for this process.',
+                  '# TYPE interviewnav_request_span_seconds histogram']
+        lines += self.spans.lines('interviewnav_request_span_seconds', ['method', 'route', 'span'])
+        return '\n'.join(lines) + '\n'
@@ -5,6 +5,8 @@ import { interviewService } from '../services/interviewService';
 const Profile = () => {
   const [profile, setProfile] = useState(null);
   const [reports, setReports] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
 
@@ -19,7 +21,8 @@ const Profile = () => {
         interviewService.getPastReports()
       ]);
       setProfile(profileData);
-      setReports(reportsData);
+      setReports(reportsData.reports);
+      setNextCursor(reportsData.next_cursor);
     } catch (err) {
       setError(err.response?.data?.error || 'Failed to load profile data');
     } finally {
@@ -27,6 +30,19 @@ const Profile = () => {
     }
   };
 
+  const loadMoreReports = async () => {
+    setLoadingMore(true);
+    try {
+      const reportsData = await interviewService.getPastReports(nextCursor);
+      setReports((prev) => [...prev, ...reportsData.reports]);
+      setNextCursor(reportsData.next_cursor);
+    } catch (err) {
+      setError(err.response?.data?.error || 'Failed to load more reports');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) {
     return (
       <div className="min-h-screen bg-gray-50 flex items-center justify-center">
@@ -120,6 +136,17 @@ const Profile = () => {
                         ))}
                     </tbody>
                 </table>
+                {nextCursor && (
+                  <div className="text-center mt-4">
+                    <button
+                      onClick={loadMoreReports}
+                      disabled={loadingMore}
+                      className="text-primary-600 hover:text-primary-900 font-semibold disabled:opacity-50"
+                    >
+                      {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                  </div>
+                )}
             </div>
           ) : (
             <p className="text-gray-600">No interviews completed yet. Start your first one!</p>
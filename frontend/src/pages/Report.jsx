@@ -9,6 +9,7 @@ const Report = () => {
   const [report, setReport] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [notice, setNotice] = useState('');
 
   useEffect(() => {
     loadReport();
@@ -18,7 +19,14 @@ const Report = () => {
     try {
       if (paramSessionId) {
         // View historical report
-        const data = await interviewService.getReportDetail(paramSessionId);
+        let data = await interviewService.getReportDetail(paramSessionId);
+        if (data.status === 'grading' || data.status === 'deferred') {
+          // 202: the report isn't ready yet, wait for it like the generate path does
+          if (data.status === 'deferred') {
+            setNotice(data.message);
+          }
+          data = await interviewService.waitForReport(paramSessionId, 5000);
+        }
         setReport(data.report);
       } else {
         // Generate new report from current session
@@ -27,8 +35,46 @@ const Report = () => {
           navigate('/upload-cv');
           return;
         }
-        const response = await interviewService.generateReport(currentSessionId);
-        setReport(response.report);
+        // Stream the report so each question's analysis shows up as soon as it is graded
+        const questions = JSON.parse(sessionStorage.getItem('questions') || '[]');
+        const partial = {
+          total_questions: questions.length,
+          answers_received: questions.length,
+          accuracy_level: '...',
+          confidence_level: '...',
+          detailed_responses: [],
+          feedback: '',
+        };
+        const sections = [];
+        let streamError = null;
+        let deferred = false;
+        await interviewService.generateReportStream(currentSessionId, (event, data) => {
+          if (event === 'question_analysis') {
+            partial.detailed_responses = [...partial.detailed_responses, data];
+          } else if (event === 'overall_section') {
+            sections.push(`### ${data.title}\n${data.content}`);
+            partial.feedback = sections.join('\n\n');
+          } else if (event === 'done') {
+            partial.accuracy_level = data.accuracy_level;
+            partial.confidence_level = data.confidence_level;
+          } else if (event === 'error') {
+            streamError = data.error;
+          } else if (event === 'deferred') {
+            deferred = true;
+            setNotice(data.message);
+            return;
+          }
+          setReport({ ...partial });
+          setLoading(false);
+        });
+        if (streamError) {
+          throw new Error(streamError);
+        }
+        if (deferred) {
+          // Graded in the background once the AI service is back
+          const data = await interviewService.waitForReport(currentSessionId, 5000);
+          setReport(data.report);
+        }
         
         // Clear session data after generation
         sessionStorage.removeItem('sessionId');
@@ -37,7 +83,7 @@ const Report = () => {
         sessionStorage.removeItem('responses');
       }
     } catch (err) {
-      setError(err.response?.data?.error || 'Failed to load report');
+      setError(err.response?.data?.error || err.message || 'Failed to load report');
     } finally {
       setLoading(false);
     }
@@ -48,7 +94,7 @@ const Report = () => {
       <div className="min-h-screen bg-gray-50 flex items-center justify-center">
         <div className="text-center">
           <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-primary-600 mx-auto"></div>
-          <p className="mt-4 text-gray-600">Generating your performance report...</p>
+          <p className="mt-4 text-gray-600">{notice || 'Generating your performance report...'}</p>
         </div>
       </div>
     );
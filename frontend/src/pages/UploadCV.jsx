@@ -13,6 +13,7 @@ const UploadCV = () => {
   });
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
+  const [questions, setQuestions] = useState([]);
 
   const handleChange = (e) => {
     if (e.target.name === 'cv_file') {
@@ -39,6 +40,7 @@ const UploadCV = () => {
     }
 
     setLoading(true);
+    setQuestions([]);
 
     try {
       const uploadFormData = new FormData();
@@ -48,17 +50,35 @@ const UploadCV = () => {
       uploadFormData.append('job_description', formData.job_description);
       uploadFormData.append('interview_level', formData.interview_level);
 
-      const response = await interviewService.uploadCV(uploadFormData);
-      
+      // Questions are streamed one at a time as they are generated
+      let sessionId = null;
+      const received = [];
+      let streamError = null;
+      await interviewService.uploadCVStream(uploadFormData, (event, data) => {
+        if (event === 'session') {
+          sessionId = data.session_id;
+        } else if (event === 'question') {
+          received.push(data.question);
+          setQuestions([...received]);
+        } else if (event === 'error') {
+          streamError = data.error;
+        }
+      });
+
+      if (streamError || !sessionId || received.length === 0) {
+        setError(streamError || 'Failed to generate interview questions. Please try again.');
+        return;
+      }
+
       // Store session ID and questions in sessionStorage
-      sessionStorage.setItem('sessionId', response.session_id);
-      sessionStorage.setItem('questions', JSON.stringify(response.questions));
+      sessionStorage.setItem('sessionId', sessionId);
+      sessionStorage.setItem('questions', JSON.stringify(received));
       sessionStorage.setItem('currentQuestion', '0');
       sessionStorage.setItem('responses', JSON.stringify([]));
 
       navigate('/interview');
     } catch (err) {
-      setError(err.response?.data?.error || 'Failed to upload CV. Please try again.');
+      setError(err.response?.data?.error || err.message || 'Failed to upload CV. Please try again.');
     } finally {
       setLoading(false);
     }
@@ -185,6 +205,19 @@ const UploadCV = () => {
               {loading ? 'Uploading and Processing...' : 'Upload CV'}
             </button>
           </form>
+
+          {loading && questions.length > 0 && (
+            <div className="mt-6">
+              <p className="text-sm font-medium text-gray-700 mb-2">
+                Preparing your questions ({questions.length} so far)...
+              </p>
+              <ol className="list-decimal list-inside space-y-1 text-gray-600 text-sm">
+                {questions.map((question, index) => (
+                  <li key={index}>{question}</li>
+                ))}
+              </ol>
+            </div>
+          )}
         </div>
       </div>
     </div>
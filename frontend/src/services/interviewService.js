@@ -1,5 +1,48 @@
 import api from './api';
 
+// POST to an endpoint that answers with Server-Sent Events and call
+// onEvent(event, data) for each event as it arrives. axios can't stream
+// response bodies in the browser, so this uses fetch directly.
+const postEventStream = async (path, body, onEvent) => {
+  const token = localStorage.getItem('token');
+  const headers = token ? { Authorization: `Bearer ${token}` } : {};
+  if (!(body instanceof FormData)) {
+    headers['Content-Type'] = 'application/json';
+    body = JSON.stringify(body);
+  }
+
+  const response = await fetch(`${api.defaults.baseURL}${path}`, {
+    method: 'POST',
+    headers,
+    body,
+  });
+
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}));
+    throw new Error(data.error || 'Request failed. Please try again.');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    const events = buffer.split('\n\n');
+    buffer = events.pop();
+    for (const raw of events) {
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = raw.match(/^data: (.*)$/m)?.[1];
+      if (event && data) {
+        onEvent(event, JSON.parse(data));
+      }
+    }
+  }
+};
+
 export const interviewService = {
   uploadCV: async (formData) => {
     // Don't set Content-Type header - let browser set it automatically with boundary
@@ -7,6 +50,41 @@ export const interviewService = {
     return response.data;
   },
 
+  // Upload one CV for several interviews. formData holds cv_file and `targets`, a JSON list of
+  // { company_name, job_role, interview_level, job_description }. Returns one session per target.
+  uploadCVBatch: async (formData) => {
+    const response = await api.post('/api/upload-cv/batch', formData);
+    return response.data;
+  },
+
+  // Upload and receive questions as Server-Sent Events while they are generated.
+  // onEvent(event, data) is called for 'session', 'question', 'done' and 'error' events.
+  uploadCVStream: async (formData, onEvent) => {
+    await postEventStream('/api/upload-cv/stream', formData, onEvent);
+  },
+
+  getSessionStatus: async (sessionId) => {
+    const response = await api.get('/api/interview/status', {
+      params: { session_id: sessionId },
+    });
+    return response.data;
+  },
+
+  // Poll until the background question generation job has finished; gives up after maxWaitMs
+  waitForQuestions: async (sessionId, intervalMs = 1500, maxWaitMs = 3 * 60 * 1000) => {
+    const deadline = Date.now() + maxWaitMs;
+    for (;;) {
+      const status = await interviewService.getSessionStatus(sessionId);
+      if (status.status !== 'generating') {
+        return status;
+      }
+      if (Date.now() + intervalMs > deadline) {
+        throw new Error('Generating your questions is taking too long. Please try again later.');
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
+
   getCurrentQuestion: async (sessionId) => {
     const response = await api.get('/api/interview/question', {
       params: { session_id: sessionId },
@@ -29,6 +107,13 @@ export const interviewService = {
     return response.data;
   },
 
+  // Grade the interview, receiving each question analysis and overall feedback
+  // section as 'question_analysis' / 'overall_section' events, then 'done' or 'error'.
+  // 'deferred' means the AI service is down and the report will be graded later (see waitForReport).
+  generateReportStream: async (sessionId, onEvent) => {
+    await postEventStream('/api/report/stream', { session_id: sessionId }, onEvent);
+  },
+
   getReports: async () => {
     const response = await api.get('/api/reports');
     return response.data;
@@ -39,8 +124,17 @@ export const interviewService = {
     return response.data;
   },
 
-  getPastReports: async () => {
-    const response = await api.get('/api/profile/reports');
+  // One page of completed interviews; pass the previous page's next_cursor to continue
+  getPastReports: async (cursor = null, limit = 20) => {
+    const response = await api.get('/api/profile/reports', {
+      params: { limit, ...(cursor ? { cursor } : {}) },
+    });
+    return response.data;
+  },
+
+  // Aggregated progress: overall, per role/level, daily trend and weakest question categories
+  getAnalytics: async (filters = {}) => {
+    const response = await api.get('/api/analytics', { params: filters });
     return response.data;
   },
 
@@ -48,5 +142,21 @@ export const interviewService = {
     const response = await api.get(`/api/report/${sessionId}`);
     return response.data;
   },
+
+  // Poll until the background grading job has finished (202 while grading, or deferred until the AI service is back).
+  // Gives up after maxWaitMs; a deferred report is still graded later and shows up under past reports.
+  waitForReport: async (sessionId, intervalMs = 2000, maxWaitMs = 10 * 60 * 1000) => {
+    const deadline = Date.now() + maxWaitMs;
+    for (;;) {
+      const data = await interviewService.getReportDetail(sessionId);
+      if (data.status !== 'grading' && data.status !== 'deferred') {
+        return data;
+      }
+      if (Date.now() + intervalMs > deadline) {
+        throw new Error('Your report is taking too long to generate. Please check your past reports later.');
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+  },
 };
 